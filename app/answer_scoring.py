@@ -0,0 +1,217 @@
+"""
+Incremental evaluation: per-answer scores aggregated at the end of the interview.
+
+A one-shot evaluation over the whole transcript is the slowest model call of
+an interview, and it runs while the candidate waits for the report. Instead,
+each candidate answer is scored in the background as soon as it is submitted
+(ratings, strengths, areas for improvement and evidence quotes for that one
+question and answer). Finished scores are stored in the graph state on the
+following turn. When the interview ends, only the last answer's score is
+usually still running, and the DetailedEvaluation is an aggregation of the
+per-answer scores without another model call.
+"""
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from statistics import mean
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from app import telemetry
+from app.compaction import message_text
+from app.config import (
+    EVALUATION_HIRE_THRESHOLD,
+    EVALUATION_NO_HIRE_THRESHOLD,
+    SCORING_SESSIONS,
+    SCORING_WORKERS,
+)
+from app.model_tiers import invoke_model
+from app.models import AnswerScore, DetailedEvaluation
+from app.prompts import ANSWER_SCORING_PROMPT
+
+RATINGS = ("technical_rating", "communication_rating", "problem_solving_rating")
+# Strengths and areas for improvement kept in the aggregated evaluation
+MAX_POINTS = 5
+
+# An answer: (key, question number, question, answer)
+Answer = Tuple[str, int, str, str]
+
+
+def answer_key(question: str, answer: str) -> str:
+    """Key of an answer's score: hash of the question and the answer."""
+    return hashlib.sha256(f"{question}\0{answer}".encode("utf-8")).hexdigest()
+
+
+def candidate_answers(messages: List[BaseMessage]) -> List[Answer]:
+    """Every candidate message that answers an interviewer question, in order."""
+    answers = []
+    for previous, message in zip(messages, messages[1:]):
+        if isinstance(message, HumanMessage) and isinstance(previous, AIMessage):
+            question, answer = message_text(previous), message_text(message)
+            answers.append((answer_key(question, answer), len(answers) + 1, question, answer))
+    return answers
+
+
+def score_answer(role: str, number: int, question: str, answer: str) -> dict:
+    """
+    Score one answer.
+
+    Returns:
+        AnswerScore fields plus "question_number" and "question"
+    """
+    messages = [
+        SystemMessage(content=ANSWER_SCORING_PROMPT.format(role=role)),
+        HumanMessage(content=f"Question:\n{question}\n\nAnswer:\n{answer}"),
+    ]
+    score = invoke_model("scoring", messages, lambda llm: llm.with_structured_output(AnswerScore))
+    return {**score.model_dump(), "question_number": number, "question": question}
+
+
+def _unique(points: List[str]) -> List[str]:
+    seen = set()
+    unique = []
+    for point in points:
+        normalized = " ".join(point.lower().split())
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            unique.append(point.strip())
+    return unique[:MAX_POINTS]
+
+
+def _rating(value: float) -> int:
+    """Round a 1-10 average half up."""
+    return int(value + 0.5)
+
+
+def aggregate(scores: List[dict]) -> dict:
+    """
+    Combine per-answer scores into DetailedEvaluation fields.
+    Ratings are averages over the answers; the decision follows the (rounded) overall
+    rating and EVALUATION_HIRE_THRESHOLD / EVALUATION_NO_HIRE_THRESHOLD.
+    """
+    averages = {field: mean(min(10, max(1, s[field])) for s in scores) for field in RATINGS}
+    overall = mean(averages.values())
+    if _rating(overall) >= EVALUATION_HIRE_THRESHOLD:
+        decision = "HIRE"
+    elif _rating(overall) < EVALUATION_NO_HIRE_THRESHOLD:
+        decision = "NO HIRE"
+    else:
+        decision = "HOLD"
+    recommendations = "\n".join(
+        [
+            f"{decision}: overall {overall:.1f}/10 over {len(scores)} answers (technical {averages['technical_rating']:.1f}, "
+            f"communication {averages['communication_rating']:.1f}, problem solving {averages['problem_solving_rating']:.1f})."
+        ]
+        + [f"Q{s['question_number']}: {s['assessment']}" for s in scores]
+    )
+    return DetailedEvaluation(
+        overall_rating=_rating(overall),
+        technical_rating=_rating(averages["technical_rating"]),
+        communication_rating=_rating(averages["communication_rating"]),
+        problem_solving_rating=_rating(averages["problem_solving_rating"]),
+        strengths=_unique([p for s in scores for p in s["strengths"]]),
+        areas_for_improvement=_unique([p for s in scores for p in s["areas_for_improvement"]]),
+        recommendations=recommendations,
+        decision=decision,
+    ).model_dump()
+
+
+class AnswerScorer:
+    """
+    Background answer scoring per session, least recently used sessions dropped beyond `max_sessions`.
+
+    Args:
+        max_sessions: Sessions whose scores are kept
+        max_workers: Answers scored at the same time (all sessions)
+    """
+
+    def __init__(self, max_sessions: int, max_workers: int):
+        self.max_sessions = max_sessions
+        self.counts: Counter = Counter()
+        # session ID -> {answer key: future}
+        self._sessions: "OrderedDict[str, Dict[str, Future]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scoring")
+
+    def submit(self, session_id: Optional[str], role: str, answers: List[Answer]) -> None:
+        """Start scoring the answers that are not scored or being scored yet."""
+        with self._lock:
+            futures = self._sessions.pop(session_id, None) or {}
+            self._sessions[session_id] = futures
+            for key, number, question, answer in answers:
+                if key not in futures:
+                    futures[key] = self._executor.submit(
+                        self._run, session_id, lambda n=number, q=question, a=answer: score_answer(role, n, q, a)
+                    )
+                    self.counts["started"] += 1
+            while len(self._sessions) > self.max_sessions:
+                _, evicted = self._sessions.popitem(last=False)
+                for future in evicted.values():
+                    future.cancel()
+
+    @staticmethod
+    def _run(session_id: Optional[str], func: Callable[[], dict]) -> dict:
+        with telemetry.session(session_id), telemetry.span("scoring.answer", kind="scoring"):
+            return func()
+
+    def finished(self, session_id: Optional[str]) -> Dict[str, dict]:
+        """Scores of the session's answers that are done (without waiting)."""
+        with self._lock:
+            futures = dict(self._sessions.get(session_id) or {})
+        return {
+            key: future.result() for key, future in futures.items()
+            if future.done() and not future.cancelled() and future.exception() is None
+        }
+
+    def wait(self, session_id: Optional[str], role: str, answers: List[Answer]) -> Dict[str, dict]:
+        """
+        Scores of the given answers, waiting for running ones and scoring missing ones now (in parallel).
+
+        Returns:
+            {answer key: score}; answers whose scoring failed are missing
+        """
+        self.submit(session_id, role, answers)
+        with self._lock:
+            futures = dict(self._sessions.get(session_id) or {})
+        scores = {}
+        for key, _, _, _ in answers:
+            future = futures.get(key)
+            if future is None:
+                continue
+            waited = not future.done()
+            try:
+                scores[key] = future.result()
+            except Exception as e:
+                print(f"Answer scoring failed: {e}")
+                telemetry.current_span().add("scoring_failures")
+                telemetry.current_span().set(scoring_error=type(e).__name__)
+                with self._lock:
+                    self.counts["failed"] += 1
+                    # Scored again if asked for later
+                    self._sessions.get(session_id, {}).pop(key, None)
+                continue
+            with self._lock:
+                self.counts["waited" if waited else "ready"] += 1
+        return scores
+
+    def drop(self, session_id: str) -> None:
+        """Forget a session's scores (e.g. when the session is deleted)."""
+        with self._lock:
+            futures = self._sessions.pop(session_id, None) or {}
+        for future in futures.values():
+            future.cancel()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counts)
+            stats["sessions"] = len(self._sessions)
+        return stats
+
+
+@lru_cache(maxsize=None)
+def get_answer_scorer() -> AnswerScorer:
+    """Get the process-wide background answer scorer."""
+    return AnswerScorer(SCORING_SESSIONS, SCORING_WORKERS)
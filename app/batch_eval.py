@@ -0,0 +1,320 @@
+"""
+Offline batch re-evaluation of stored interview transcripts.
+
+`evaluation_agent` scores an interview once, at its end. After a change to
+EVALUATION_SYSTEM_PROMPT or the DetailedEvaluation model, this re-scores stored
+transcripts in bulk with the same prompt and structured output, i.e. the
+one-call evaluation over the whole transcript (EVALUATION_MODE "full"). Live
+interviews in the default "incremental" mode aggregate per-answer scores
+instead, so every row records its mode ("eval_mode", also part of
+"eval_version") to keep the two apart when comparing:
+
+- transcripts are read from JSON/JSONL files or directories of them, and
+  deduplicated by a hash of the transcript the model would see
+- evaluations run at bounded concurrency through the shared chat model (and
+  so through the rate-limit-aware client pool)
+- every finished evaluation is appended to a progress log; re-running the
+  same command resumes, skipping transcripts already scored with the current
+  prompt, schema and model
+- results are written as one Parquet file (one row per unique transcript),
+  and the run reports throughput, tokens and estimated cost
+
+A transcript record is a JSON object with "messages" ([{"role", "content"}], as
+returned by GET /sessions/{id}) and optionally "id", "conversation_summary" and
+"summary_cursor"; a bare list of messages is accepted too.
+
+Usage:
+    python -m app.batch_eval transcripts/ --output evals.parquet --concurrency 16
+    python -m app.batch_eval transcripts.jsonl --output evals.parquet --fake   # local stand-in model
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from app import telemetry
+from app.compaction import compacted_messages, message_text
+from app.config import CHAT_INPUT_USD_PER_MTOK, CHAT_OUTPUT_USD_PER_MTOK, EVALUATION_MODE
+from app.index_store import content_key
+from app.models import DetailedEvaluation
+from app.prompts import EVALUATION_SYSTEM_PROMPT
+from app.model_tiers import get_model_tiers
+from app.providers import model_name
+
+# The evaluation path batch rows are scored with (see EVALUATION_MODE)
+EVAL_MODE = "full"
+
+_MESSAGE_TYPES = {
+    "user": HumanMessage,
+    "human": HumanMessage,
+    "assistant": AIMessage,
+    "ai": AIMessage,
+    "system": SystemMessage,
+}
+
+
+def read_transcripts(paths: List[str], skip: Iterable[str] = ()) -> Iterator[Tuple[str, dict]]:
+    """
+    Read transcript records from JSON/JSONL files and directories of them (not recursive).
+
+    Args:
+        paths: Files and directories
+        skip: Files to leave out even if a directory contains them (e.g. this run's progress log)
+
+    Returns:
+        (source ID, record) pairs; the source ID is the record's "id" or "thread_id",
+        else "<file>:<line>" (JSONL) or the file name (JSON)
+    """
+    skipped = {os.path.abspath(p) for p in skip}
+    for path in paths:
+        if os.path.isdir(path):
+            files = [
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.endswith((".json", ".jsonl"))
+            ]
+        else:
+            files = [path]
+        for file in files:
+            if os.path.abspath(file) in skipped:
+                continue
+            with open(file) as f:
+                if file.endswith(".jsonl"):
+                    records = [
+                        (f"{file}:{i}", json.loads(line)) for i, line in enumerate(f, 1) if line.strip()
+                    ]
+                else:
+                    data = json.load(f)
+                    records = [(file, data)] if isinstance(data, dict) or _is_message_list(data) else [
+                        (f"{file}:{i}", record) for i, record in enumerate(data, 1)
+                    ]
+            for source, record in records:
+                if isinstance(record, list):
+                    record = {"messages": record}
+                yield str(record.get("id") or record.get("thread_id") or source), record
+
+
+def _is_message_list(data) -> bool:
+    return isinstance(data, list) and (not data or "content" in data[0])
+
+
+def prompt_transcript(record: dict) -> List[BaseMessage]:
+    """The transcript the evaluation sees for a record: compacted as in the live graph."""
+    messages = [
+        _MESSAGE_TYPES.get(m.get("role") or m.get("type"), HumanMessage)(content=m.get("content") or "")
+        for m in record.get("messages") or []
+    ]
+    return compacted_messages(messages, record.get("conversation_summary"), record.get("summary_cursor") or 0)
+
+
+def transcript_hash(messages: List[BaseMessage]) -> str:
+    digest = hashlib.sha256()
+    for m in messages:
+        digest.update(f"{m.type}\0{message_text(m)}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def evaluation_version() -> str:
+    """Key of everything besides the transcript that changes an evaluation: mode, prompt, schema and model."""
+    return content_key(
+        EVALUATION_SYSTEM_PROMPT.encode("utf-8"),
+        mode=EVAL_MODE,
+        schema=DetailedEvaluation.model_json_schema(),
+        model=model_name(get_model_tiers().model("evaluation")),
+    )[:16]
+
+
+def evaluate(transcript: List[BaseMessage]) -> Tuple[dict, dict]:
+    """
+    Score one transcript.
+
+    Returns:
+        (DetailedEvaluation fields, {"input_tokens", "output_tokens"})
+    """
+    # Imported here: app.nodes pulls in the retrieval stack, which the readers above don't need
+    from app.nodes import evaluation_messages
+
+    # The evaluation tier's model, without the live path's timeout fallback: every row is scored by one model
+    structured_llm = get_model_tiers().model("evaluation").with_structured_output(DetailedEvaluation, include_raw=True)
+    result = structured_llm.invoke(evaluation_messages(transcript))
+    if result.get("parsed") is None:
+        raise ValueError(f"unparseable evaluation: {result.get('parsing_error')}")
+    usage = getattr(result["raw"], "usage_metadata", None) or {}
+    return result["parsed"].model_dump(), {
+        "input_tokens": usage.get("input_tokens", 0),
+        "output_tokens": usage.get("output_tokens", 0),
+    }
+
+
+class ProgressLog:
+    """
+    Append-only JSONL of finished evaluations, used to resume an interrupted run.
+    Rows from another evaluation version (prompt, schema or model changed) are ignored.
+    """
+
+    def __init__(self, path: str, version: str):
+        self.path = path
+        self.version = version
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, dict]:
+        rows = {}
+        try:
+            with open(self.path) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return rows
+        for line in lines:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by an interrupted run
+                continue
+            if row.get("eval_version") == self.version:
+                rows[row["transcript_hash"]] = row
+        if lines and not lines[-1].endswith("\n"):
+            # Keep new rows off the cut line
+            with open(self.path, "a") as f:
+                f.write("\n")
+        return rows
+
+    def append(self, row: dict) -> None:
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(row) + "\n")
+
+
+def write_parquet(rows: List[dict], path: str) -> None:
+    """Write result rows as a Parquet file (written to a temp file, then renamed into place)."""
+    # Optional dependency: pyarrow
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tmp_path = f"{path}.tmp"
+    pq.write_table(pa.Table.from_pylist(rows), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def run(paths: List[str], output: str, concurrency: int = 8, progress_path: str = None) -> dict:
+    """
+    Re-evaluate every unique transcript under `paths` that the progress log doesn't already cover.
+
+    Args:
+        paths: JSON/JSONL files or directories of them
+        output: Parquet file for the results
+        concurrency: Evaluations in flight at the same time
+        progress_path: Progress log; defaults to "<output>.progress.jsonl"
+
+    Returns:
+        Run report: counts, wall time, throughput, tokens and estimated cost
+    """
+    start = time.perf_counter()
+    progress_path = progress_path or f"{output}.progress.jsonl"
+    transcripts: Dict[str, List[BaseMessage]] = {}
+    sources: Dict[str, List[str]] = {}
+    records = 0
+    for source, record in read_transcripts(paths, skip=[progress_path]):
+        records += 1
+        transcript = prompt_transcript(record)
+        key = transcript_hash(transcript)
+        transcripts.setdefault(key, transcript)
+        sources.setdefault(key, []).append(source)
+
+    version = evaluation_version()
+    log = ProgressLog(progress_path, version)
+    done = log.load()
+    resumed = sum(1 for key in transcripts if key in done)
+    pending = [key for key in transcripts if key not in done]
+    report = {
+        "eval_mode": EVAL_MODE,
+        "live_eval_mode": EVALUATION_MODE,
+        "records": records,
+        "unique": len(transcripts),
+        "duplicates": records - len(transcripts),
+        "resumed": resumed,
+        "evaluated": 0,
+        "failed": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+    }
+
+    def score(key: str) -> dict:
+        with telemetry.span("batch.evaluate", kind="batch", messages=len(transcripts[key])):
+            evaluation, usage = evaluate(transcripts[key])
+        return {"transcript_hash": key, **evaluation, **usage, "eval_mode": EVAL_MODE, "eval_version": version}
+
+    interrupted = False
+    eval_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch-eval") as pool:
+        futures = {pool.submit(score, key): key for key in pending}
+        try:
+            for future in as_completed(futures):
+                try:
+                    row = future.result()
+                except Exception as e:
+                    print(f"Evaluation of transcript {futures[future][:12]} failed: {e}")
+                    report["failed"] += 1
+                    continue
+                log.append(row)
+                done[row["transcript_hash"]] = row
+                report["evaluated"] += 1
+                report["input_tokens"] += row["input_tokens"]
+                report["output_tokens"] += row["output_tokens"]
+        except KeyboardInterrupt:
+            # Finished rows are in the progress log; the next run picks up the rest
+            interrupted = True
+            for future in futures:
+                future.cancel()
+    eval_s = time.perf_counter() - eval_start
+
+    rows = [
+        {**done[key], "source_ids": sources[key], "messages": len(transcripts[key])}
+        for key in transcripts if key in done
+    ]
+    if rows:
+        write_parquet(rows, output)
+    report.update(
+        interrupted=interrupted,
+        remaining=len(transcripts) - len(rows),
+        wall_s=round(time.perf_counter() - start, 3),
+        transcripts_per_s=round(report["evaluated"] / eval_s, 3) if eval_s else 0.0,
+        cost_usd=round(
+            (report["input_tokens"] * CHAT_INPUT_USD_PER_MTOK + report["output_tokens"] * CHAT_OUTPUT_USD_PER_MTOK) / 1e6, 6
+        ),
+        output=output if rows else None,
+    )
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Re-evaluate stored interview transcripts in bulk.")
+    parser.add_argument("paths", nargs="+", help="JSON/JSONL transcript files or directories of them")
+    parser.add_argument("--output", required=True, help="Parquet file for the results")
+    parser.add_argument("--concurrency", type=int, default=8, help="Evaluations in flight at the same time")
+    parser.add_argument("--progress", help="Progress log for resuming (default: <output>.progress.jsonl)")
+    parser.add_argument("--fake", action="store_true", help="Use the local stand-in chat model from bench.fakes")
+    args = parser.parse_args(argv)
+
+    # Fail before any evaluation is paid for, not when the results are written
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        parser.error("writing Parquet needs pyarrow (pip install pyarrow)")
+    if args.fake:
+        from app.providers import use_providers
+        from bench.fakes import FakeChatModel
+
+        use_providers(chat_model=FakeChatModel(callbacks=[telemetry.TelemetryCallbackHandler()]))
+    report = run(args.paths, args.output, args.concurrency, args.progress)
+    print(json.dumps(report, indent=2))
+    return 1 if report["failed"] or report["remaining"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
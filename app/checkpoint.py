@@ -0,0 +1,63 @@
+"""
+Checkpointers for the interview graph.
+
+With a checkpointer, each interview is a LangGraph thread: the UI sends only the
+new human message per turn and the rest of the state is restored from the
+thread's latest checkpoint. The SQLite backend lets a restarted worker resume
+interviews that were in progress. The async service needs a saver that
+implements the async API (`create_async_checkpointer`).
+"""
+import os
+import sqlite3
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+
+from app.config import CHECKPOINTER, CHECKPOINT_DB
+
+
+def create_checkpointer(kind: str = CHECKPOINTER, path: str = CHECKPOINT_DB) -> BaseCheckpointSaver:
+    """
+    Create a graph checkpointer.
+
+    Args:
+        kind: "memory" (process-local) or "sqlite" (durable, shared by workers on one host)
+        path: SQLite database file, used when kind is "sqlite"
+
+    Returns:
+        LangGraph checkpoint saver
+    """
+    if kind == "memory":
+        return InMemorySaver()
+    if kind == "sqlite":
+        # Optional dependency: langgraph-checkpoint-sqlite
+        from langgraph.checkpoint.sqlite import SqliteSaver
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return SqliteSaver(conn)
+    raise ValueError(f"Unknown checkpointer: {kind!r} (expected 'memory' or 'sqlite')")
+
+
+async def create_async_checkpointer(kind: str = CHECKPOINTER, path: str = CHECKPOINT_DB) -> BaseCheckpointSaver:
+    """
+    Create a checkpointer usable from `astream`/`aget_state` (the service's event loop).
+
+    Args:
+        kind: "memory" or "sqlite", as for `create_checkpointer`
+        path: SQLite database file, used when kind is "sqlite"
+
+    Returns:
+        LangGraph checkpoint saver with async support
+    """
+    if kind == "memory":
+        return InMemorySaver()
+    if kind == "sqlite":
+        # Optional dependencies: langgraph-checkpoint-sqlite, aiosqlite
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = await aiosqlite.connect(path)
+        await conn.execute("PRAGMA journal_mode=WAL")
+        return AsyncSqliteSaver(conn)
+    raise ValueError(f"Unknown checkpointer: {kind!r} (expected 'memory' or 'sqlite')")
@@ -0,0 +1,76 @@
+"""
+Synchronous client for the interview service (see app/service.py), used by the Streamlit UI.
+"""
+import json
+from typing import Iterator, Optional
+
+import httpx
+
+
+class ServiceClient:
+    """Thin wrapper over the service's HTTP API with one pooled connection per host."""
+
+    def __init__(self, base_url: str, timeout: float = 300.0):
+        self.base_url = base_url.rstrip("/")
+        self.http = httpx.Client(base_url=self.base_url, timeout=timeout)
+
+    def _json(self, response: httpx.Response):
+        response.raise_for_status()
+        return response.json()
+
+    def health(self) -> bool:
+        try:
+            return self.http.get("/healthz", timeout=2.0).status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    def upload_pdf(self, data: bytes, base_index_id: Optional[str] = None) -> dict:
+        """Index a PDF, diffing against `base_index_id` (its previous version) if given; returns {"index_id", "ingest_stats"}."""
+        params = {"base": base_index_id} if base_index_id else None
+        response = self.http.post("/indexes", content=data, params=params, headers={"Content-Type": "application/pdf"})
+        if response.status_code >= 400:
+            raise RuntimeError(response.json().get("error", response.text))
+        return response.json()
+
+    def precompute_jd(self, job_description: str, jd_index_id: Optional[str] = None) -> str:
+        """Start routing and digesting a JD in the background; returns its precompute key."""
+        payload = {"job_description": job_description, "jd_index_id": jd_index_id}
+        return self._json(self.http.post("/jd/precompute", json=payload))["key"]
+
+    def stats(self) -> dict:
+        return self._json(self.http.get("/stats"))
+
+    def get_state(self, thread_id: str) -> dict:
+        return self._json(self.http.get(f"/sessions/{thread_id}"))
+
+    def delete_session(self, thread_id: str) -> None:
+        self.http.delete(f"/sessions/{thread_id}").raise_for_status()
+
+    def telemetry(self, thread_id: str) -> dict:
+        return self._json(self.http.get(f"/sessions/{thread_id}/telemetry"))
+
+    def metrics(self) -> str:
+        response = self.http.get("/metrics")
+        response.raise_for_status()
+        return response.text
+
+    def run_turn(self, thread_id: str, text: str, code: Optional[str] = None,
+                 context: Optional[dict] = None) -> Iterator[dict]:
+        """
+        Run one interview turn.
+
+        Args:
+            thread_id: Session ID
+            text: Candidate answer
+            code: Optional code submission
+            context: Job description, candidate details and index IDs for the first turn
+
+        Yields:
+            Turn events as they arrive (token, discard, update, error, done)
+        """
+        body = {"text": text, "code": code, "context": context}
+        with self.http.stream("POST", f"/sessions/{thread_id}/turns", json=body) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
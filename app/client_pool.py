@@ -0,0 +1,514 @@
+"""
+Rate-limit-aware pool for outbound model API calls.
+
+Every OpenAI request (chat, embeddings, audio) goes through `PooledTransport`,
+an httpx transport shared by the process-wide clients. Requests are grouped
+by endpoint kind, and each kind has its own `ClientPool` with:
+
+- adaptive concurrency (AIMD): the in-flight limit grows by ~1 per window
+  of successful requests, and is cut on 429s and on latency well above the
+  observed baseline
+- token buckets for requests/minute and (estimated) tokens/minute
+- retries of 429/5xx responses and connection failures with full-jitter
+  exponential backoff, honouring `Retry-After` (timeouts are not retried)
+- coalescing of identical in-flight non-streaming requests (same endpoint and
+  body) whose result does not depend on sampling: embeddings, audio, and chat
+  completions at temperature 0, so concurrent duplicates are sent once
+- waiting for admission bounded by the request's pool timeout (httpx.PoolTimeout)
+- queue depth, wait time, throttle and retry metrics, exported with `stats()`
+  and in Prometheus text format
+"""
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+# Status codes that are retried; 429 also shrinks the concurrency limit
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Transport errors retried: only failures to connect, where the request never reached the server.
+# Timeouts are left to the caller: a re-sent model call pays for the generation again, and
+# the caller's timeout is meant to bound the call (see app/model_tiers.py)
+RETRY_ERRORS = (httpx.ConnectError,)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute` tokens per minute."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are now)."""
+        self._refill(now)
+        # A single request larger than the bucket may go once the bucket is full
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+
+class AIMDLimiter:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit.
+
+    Args:
+        initial: Starting limit
+        minimum: Lower bound
+        maximum: Upper bound
+        backoff: Factor applied on a 429
+        latency_factor: A response slower than this multiple of the baseline
+            latency counts as congestion (gentler decrease)
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, backoff: float = 0.5, latency_factor: float = 3.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.baseline: Optional[float] = None
+
+    def on_success(self, latency: float) -> None:
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            # Let the baseline drift up slowly so it tracks the provider's current speed
+            self.baseline += 0.01 * (latency - self.baseline)
+        if latency > self.latency_factor * self.baseline:
+            self.limit = max(self.minimum, self.limit * 0.9)
+        else:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_throttle(self) -> None:
+        self.limit = max(self.minimum, self.limit * self.backoff)
+
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class ClientPool:
+    """Admission control and metrics for one kind of request (e.g. chat)."""
+
+    def __init__(self, name: str, rpm: float, tpm: Optional[float], limiter: AIMDLimiter):
+        self.name = name
+        self.limiter = limiter
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.counters = {
+            "requests": 0,
+            "throttled": 0,
+            "retries": 0,
+            "errors": 0,
+            "coalesced": 0,
+            "max_queue_depth": 0,
+        }
+        self.wait_s = deque(maxlen=2048)
+        self._lock = threading.Lock()
+        self._freed = threading.Condition(self._lock)
+
+    def _try_acquire(self, est_tokens: float) -> float:
+        """Take a slot and budget if available; otherwise return how long to wait. Caller holds the lock."""
+        if self.in_flight >= int(self.limiter.limit):
+            return -1.0  # wait for a slot to be released
+        now = time.monotonic()
+        wait = self.requests.wait_time(1, now)
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(est_tokens, now))
+        if wait > 0:
+            return wait
+        self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(est_tokens)
+        self.in_flight += 1
+        return 0.0
+
+    def _enter_queue(self) -> None:
+        self.queue_depth += 1
+        self.counters["max_queue_depth"] = max(self.counters["max_queue_depth"], self.queue_depth)
+
+    def _leave_queue(self, waited: float) -> None:
+        self.queue_depth -= 1
+        self.wait_s.append(waited)
+
+    def _timed_out(self, start: float, timeout: Optional[float]) -> None:
+        """Leave the queue and raise if the wait went past `timeout`. Caller holds the lock."""
+        if timeout is not None and time.monotonic() - start >= timeout:
+            self._leave_queue(time.monotonic() - start)
+            self.counters["errors"] += 1
+            raise httpx.PoolTimeout(f"no {self.name} pool slot within {timeout:.3g}s")
+
+    def acquire(self, est_tokens: float, timeout: Optional[float] = None) -> None:
+        """
+        Block until the request may be sent.
+
+        Raises:
+            httpx.PoolTimeout: When that takes longer than `timeout` seconds
+        """
+        start = time.monotonic()
+        with self._lock:
+            self._enter_queue()
+            while True:
+                wait = self._try_acquire(est_tokens)
+                if wait == 0.0:
+                    break
+                self._timed_out(start, timeout)
+                wait = wait if wait > 0 else 0.5
+                if timeout is not None:
+                    wait = min(wait, max(0.0, start + timeout - time.monotonic()))
+                self._freed.wait(timeout=wait)
+            self._leave_queue(time.monotonic() - start)
+
+    async def acquire_async(self, est_tokens: float, timeout: Optional[float] = None) -> None:
+        """Async counterpart of `acquire` (polls instead of blocking the event loop)."""
+        start = time.monotonic()
+        with self._lock:
+            self._enter_queue()
+        while True:
+            with self._lock:
+                wait = self._try_acquire(est_tokens)
+                if wait == 0.0:
+                    self._leave_queue(time.monotonic() - start)
+                    return
+                self._timed_out(start, timeout)
+            await asyncio.sleep(min(wait, 0.05) if wait > 0 else 0.01)
+
+    def release(self, latency: Optional[float] = None, throttled: bool = False, est_tokens: float = 0) -> None:
+        """
+        Give a slot back and feed the outcome to the limiter.
+        Latency is normalized per 1k estimated tokens so long completions are not
+        mistaken for congestion.
+        """
+        if latency is not None:
+            latency /= max(1.0, est_tokens / 1000.0)
+        with self._lock:
+            self.in_flight -= 1
+            if throttled:
+                self.limiter.on_throttle()
+            elif latency is not None:
+                self.limiter.on_success(latency)
+            self._freed.notify_all()
+
+    def count(self, key: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[key] += value
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = list(self.wait_s)
+            return {
+                "limit": round(self.limiter.limit, 2),
+                "in_flight": self.in_flight,
+                "queue_depth": self.queue_depth,
+                "wait_p50_s": round(_percentile(waits, 0.50), 4),
+                "wait_p95_s": round(_percentile(waits, 0.95), 4),
+                **self.counters,
+            }
+
+
+def request_kind(path: str) -> str:
+    """Pool name for an OpenAI API path."""
+    if path.endswith("/embeddings"):
+        return "embeddings"
+    if "/audio/" in path:
+        return "audio"
+    return "chat"
+
+
+def estimate_tokens(body: Optional[dict]) -> int:
+    """Rough token cost of a request (prompt ~4 chars/token plus the completion allowance)."""
+    if not body:
+        return 1
+    if "messages" in body:
+        prompt = sum(len(str(m.get("content") or "")) for m in body["messages"])
+        completion = body.get("max_completion_tokens") or body.get("max_tokens") or 512
+        return prompt // 4 + completion
+    text = body.get("input")
+    if isinstance(text, list):
+        return sum(len(str(t)) for t in text) // 4 + 1
+    return len(str(text or "")) // 4 + 1
+
+
+def pool_timeout(request: httpx.Request) -> Optional[float]:
+    """How long the request may wait for a connection (httpx's pool timeout), and so for admission."""
+    return (request.extensions.get("timeout") or {}).get("pool")
+
+
+def _backoff(attempt: int, base: float, cap: float, response: Optional[httpx.Response]) -> float:
+    """Full-jitter exponential backoff, or the server's Retry-After when it sends one."""
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(cap, float(retry_after)) + random.uniform(0, base)
+            except ValueError:
+                pass
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response body that gives the pool slot back once the stream is closed."""
+
+    def __init__(self, inner, on_close):
+        self.inner = inner
+        self.on_close = on_close
+
+    def __iter__(self):
+        yield from self.inner
+
+    def close(self) -> None:
+        try:
+            self.inner.close()
+        finally:
+            self.on_close()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, inner, on_close):
+        self.inner = inner
+        self.on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self.inner:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self.inner.aclose()
+        finally:
+            self.on_close()
+
+
+class PooledTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    httpx transport applying `ClientPool` admission, retries and coalescing to
+    every request before handing it to the real (connection-pooling) transport.
+
+
+    Args:
+        pools: Pool per request kind ("chat", "embeddings", "audio")
+        limits: Connection limits of the underlying transports
+        max_retries: Retries of a request after connection failures and RETRY_STATUSES
+        backoff_base: Base of the exponential backoff, in seconds
+        backoff_max: Longest backoff, in seconds
+        transport: Underlying sync transport (default: an httpx.HTTPTransport with `limits`)
+        async_transport: Underlying async transport (default: an httpx.AsyncHTTPTransport with `limits`)
+    """
+
+    def __init__(self, pools: Dict[str, ClientPool], limits: httpx.Limits, max_retries: int = 4,
+                 backoff_base: float = 0.5, backoff_max: float = 20.0, transport: httpx.BaseTransport = None,
+                 async_transport: httpx.AsyncBaseTransport = None):
+        self.pools = pools
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sync = transport or httpx.HTTPTransport(limits=limits)
+        self._async = async_transport or httpx.AsyncHTTPTransport(limits=limits)
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    @staticmethod
+    def _inspect(request: httpx.Request) -> Tuple[Optional[dict], bool]:
+        """Parsed JSON body (if any) and whether the request may be coalesced."""
+        content = request.content
+        body = None
+        if request.headers.get("content-type", "").startswith("application/json") and content:
+            try:
+                body = json.loads(content)
+            except ValueError:
+                body = None
+        # Sampled completions are not shared: identical prompts from two sessions get their own answers
+        deterministic = request_kind(request.url.path) != "chat" or (body or {}).get("temperature") == 0
+        coalescible = request.method == "POST" and not (body or {}).get("stream") and deterministic
+        return body, coalescible
+
+    @staticmethod
+    def _key(request: httpx.Request) -> str:
+        digest = hashlib.sha256(f"{request.method} {request.url}".encode("utf-8"))
+        digest.update(request.content)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _copy(response: httpx.Response, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            response.status_code, headers=response.headers, content=response.content, request=request
+        )
+
+    # --- sync ---
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        body, coalescible = self._inspect(request)
+        if not coalescible:
+            return self._send(request, body, buffered=False)
+        key = self._key(request)
+        with self._inflight_lock:
+            leader = self._inflight.get(key)
+            if leader is None:
+                future = self._inflight[key] = Future()
+        if leader is not None:
+            self.pools[request_kind(request.url.path)].count("coalesced")
+            return self._copy(leader.result(), request)
+        try:
+            response = self._send(request, body, buffered=True)
+            future.set_result(response)
+            return self._copy(response, request)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _send(self, request: httpx.Request, body: Optional[dict], buffered: bool) -> httpx.Response:
+        pool = self.pools[request_kind(request.url.path)]
+        est_tokens = estimate_tokens(body)
+        attempt = 0
+        while True:
+            pool.acquire(est_tokens, pool_timeout(request))
+            pool.count("requests")
+            start = time.monotonic()
+            try:
+                response = self._sync.handle_request(request)
+            except httpx.TransportError as e:
+                pool.release()
+                pool.count("errors")
+                if not isinstance(e, RETRY_ERRORS) or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                pool.count("retries")
+                time.sleep(_backoff(attempt, self.backoff_base, self.backoff_max, None))
+                continue
+            except BaseException:
+                # Any other failure still gives the slot back
+                pool.release()
+                raise
+            latency = time.monotonic() - start
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                throttled = response.status_code == 429
+                try:
+                    response.read()
+                    response.close()
+                finally:
+                    pool.release(throttled=throttled)
+                pool.count("throttled" if throttled else "errors")
+                attempt += 1
+                pool.count("retries")
+                time.sleep(_backoff(attempt, self.backoff_base, self.backoff_max, response))
+                continue
+            if buffered:
+                try:
+                    response.read()
+                finally:
+                    response.close()
+                    pool.release(latency, throttled=response.status_code == 429, est_tokens=est_tokens)
+                return response
+            released = []
+
+            def on_close():
+                if not released:
+                    released.append(True)
+                    pool.release(latency, throttled=response.status_code == 429, est_tokens=est_tokens)
+
+            return httpx.Response(
+                response.status_code,
+                headers=response.headers,
+                stream=_ReleasingStream(response.stream, on_close),
+                request=request,
+                extensions=response.extensions,
+            )
+
+    # --- async ---
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body, _ = self._inspect(request)
+        # Async requests are admitted and retried like sync ones but not coalesced
+        pool = self.pools[request_kind(request.url.path)]
+        est_tokens = estimate_tokens(body)
+        attempt = 0
+        while True:
+            await pool.acquire_async(est_tokens, pool_timeout(request))
+            pool.count("requests")
+            start = time.monotonic()
+            try:
+                response = await self._async.handle_async_request(request)
+            except httpx.TransportError as e:
+                pool.release()
+                pool.count("errors")
+                if not isinstance(e, RETRY_ERRORS) or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                pool.count("retries")
+                await asyncio.sleep(_backoff(attempt, self.backoff_base, self.backoff_max, None))
+                continue
+            except BaseException:
+                pool.release()
+                raise
+            latency = time.monotonic() - start
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                throttled = response.status_code == 429
+                try:
+                    await response.aread()
+                    await response.aclose()
+                finally:
+                    pool.release(throttled=throttled)
+                pool.count("throttled" if throttled else "errors")
+                attempt += 1
+                pool.count("retries")
+                await asyncio.sleep(_backoff(attempt, self.backoff_base, self.backoff_max, response))
+                continue
+            released = []
+
+            def on_close():
+                if not released:
+                    released.append(True)
+                    pool.release(latency, throttled=response.status_code == 429, est_tokens=est_tokens)
+
+            return httpx.Response(
+                response.status_code,
+                headers=response.headers,
+                stream=_AsyncReleasingStream(response.stream, on_close),
+                request=request,
+                extensions=response.extensions,
+            )
+
+    def close(self) -> None:
+        self._sync.close()
+
+    async def aclose(self) -> None:
+        await self._async.aclose()
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+    def prometheus_text(self) -> str:
+        """Pool gauges and counters in the Prometheus text exposition format."""
+        lines = []
+        stats = self.stats()
+        for metric in ("limit", "in_flight", "queue_depth", "wait_p50_s", "wait_p95_s",
+                       "requests", "throttled", "retries", "errors", "coalesced", "max_queue_depth"):
+            lines.append(f"# TYPE interview_client_pool_{metric} gauge")
+            for name, values in sorted(stats.items()):
+                lines.append(f'interview_client_pool_{metric}{{pool="{name}"}} {values[metric]}')
+        return "\n".join(lines) + "\n"
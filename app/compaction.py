@@ -0,0 +1,61 @@
+"""
+Token-budgeted transcript compaction.
+
+The full transcript stays in graph state; prompts are built from a rolling
+summary of older turns, any pinned messages (code submissions) and the most
+recent turns verbatim. The summary is updated incrementally: only messages
+that aged out since the last compaction are sent to the summarizer.
+"""
+from typing import List, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from app.token_utils import count_tokens
+
+CODE_SUBMISSION_MARKER = "### CANDIDATE CODE SUBMISSION"
+
+
+def message_text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def count_message_tokens(messages: List[BaseMessage]) -> int:
+    """Tokens in a list of messages, including a small per-message overhead."""
+    return sum(count_tokens(message_text(m)) + 4 for m in messages)
+
+
+def is_pinned(message: BaseMessage) -> bool:
+    """Messages that are never summarized away (candidate code submissions)."""
+    return isinstance(message, HumanMessage) and CODE_SUBMISSION_MARKER in message_text(message)
+
+
+def recent_turns_start(messages: List[BaseMessage], keep_turns: int) -> int:
+    """
+    Index of the first message of the last `keep_turns` turns,
+    where a turn starts at a human message.
+    """
+    human_indexes = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+    if len(human_indexes) <= keep_turns:
+        return 0
+    return human_indexes[-keep_turns] if keep_turns else len(messages)
+
+
+def compacted_messages(messages: List[BaseMessage], summary: Optional[str], cursor: int) -> List[BaseMessage]:
+    """
+    Build the prompt transcript: rolling summary, pinned messages from the
+    summarized part, then everything after the summary cursor verbatim.
+    """
+    if not summary or not cursor:
+        return list(messages)
+    pinned = [m for m in messages[:cursor] if is_pinned(m)]
+    header = SystemMessage(content=f"Summary of the earlier part of the interview:\n{summary}")
+    return [header] + pinned + list(messages[cursor:])
+
+
+def format_for_summary(messages: List[BaseMessage]) -> str:
+    """Render messages as a plain transcript for the summarizer."""
+    lines = []
+    for m in messages:
+        speaker = "Candidate" if isinstance(m, HumanMessage) else "Interviewer"
+        lines.append(f"{speaker}: {message_text(m)}")
+    return "\n".join(lines)
@@ -0,0 +1,188 @@
+"""
+Runtime configuration for the interview engine.
+All settings can be overridden through environment variables (or the .env file).
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- RAG / indexing ---
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+
+# Directory where FAISS indexes for uploaded PDFs are persisted
+INDEX_STORE_DIR = os.getenv("INDEX_STORE_DIR", os.path.join(".cache", "indexes"))
+# Disk budget for persisted indexes; least recently used indexes are evicted beyond it
+INDEX_STORE_MAX_BYTES = int(os.getenv("INDEX_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Memory budget for indexes shared across sessions; least recently used ones are
+# dropped from RAM beyond it and reloaded from the index store on demand
+RETRIEVER_REGISTRY_MAX_BYTES = int(os.getenv("RETRIEVER_REGISTRY_MAX_BYTES", str(1024 * 1024 * 1024)))
+# Sessions whose indexes are pinned in the registry and index store (least recently active released beyond it)
+RETRIEVER_PIN_SESSIONS = int(os.getenv("RETRIEVER_PIN_SESSIONS", "1024"))
+
+# Chunk-level embedding cache shared by all indexes
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(".cache", "embeddings"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+
+# PDF ingest pipeline (app/ingest.py)
+# Processes extracting page text in parallel; PDFs shorter than INGEST_PARALLEL_MIN_PAGES are parsed inline
+INGEST_PARSE_WORKERS = int(os.getenv("INGEST_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+INGEST_PARALLEL_MIN_PAGES = int(os.getenv("INGEST_PARALLEL_MIN_PAGES", "16"))
+INGEST_PAGES_PER_TASK = int(os.getenv("INGEST_PAGES_PER_TASK", "4"))
+# Chunks per embedding request while streaming, and embedding requests in flight per process
+INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "64"))
+INGEST_EMBED_CONCURRENCY = int(os.getenv("INGEST_EMBED_CONCURRENCY", "4"))
+
+# Retrieval: BM25 and vector rankings fused with reciprocal rank fusion (app/lexical_index.py)
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "true").lower() in ("1", "true", "yes")
+# Candidates taken from each ranking before fusion, and the RRF rank constant
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "10"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+# Queries of up to this many terms, all found in the best BM25 match, skip the vector search (0 disables)
+LEXICAL_FAST_PATH_MAX_TERMS = int(os.getenv("LEXICAL_FAST_PATH_MAX_TERMS", "3"))
+# Serve JD and resume from one combined index through a single cross-document tool
+# (one embedding and one search per query instead of one per document)
+UNIFIED_RETRIEVAL = os.getenv("UNIFIED_RETRIEVAL", "false").lower() in ("1", "true", "yes")
+# Per-session cache of retrieval results: exact hits on the normalized query, and
+# near-duplicate hits when the query embedding is this close (cosine) to a cached one
+RETRIEVAL_CACHE_ENABLED = os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "64"))
+RETRIEVAL_CACHE_SESSIONS = int(os.getenv("RETRIEVAL_CACHE_SESSIONS", "1024"))
+RETRIEVAL_CACHE_SIMILARITY = float(os.getenv("RETRIEVAL_CACHE_SIMILARITY", "0.92"))
+
+# --- Graph state ---
+# "memory" keeps interview threads in-process; "sqlite" persists them across restarts
+CHECKPOINTER = os.getenv("CHECKPOINTER", "memory")
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", os.path.join(".cache", "checkpoints.sqlite"))
+
+# --- Transcript store (app/transcript_store.py) ---
+# Append every turn and final evaluation to an indexed SQLite database for querying past interviews
+TRANSCRIPT_STORE_ENABLED = os.getenv("TRANSCRIPT_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+TRANSCRIPT_DB = os.getenv("TRANSCRIPT_DB", os.path.join(".cache", "transcripts.sqlite"))
+# Rows are written by a background thread, up to TRANSCRIPT_BATCH_SIZE per transaction and
+# at most TRANSCRIPT_FLUSH_MS after being queued; beyond TRANSCRIPT_QUEUE_SIZE waiting rows, new ones are dropped
+TRANSCRIPT_BATCH_SIZE = int(os.getenv("TRANSCRIPT_BATCH_SIZE", "256"))
+TRANSCRIPT_FLUSH_MS = float(os.getenv("TRANSCRIPT_FLUSH_MS", "200"))
+TRANSCRIPT_QUEUE_SIZE = int(os.getenv("TRANSCRIPT_QUEUE_SIZE", "10000"))
+
+# --- Interviewer ---
+# Stream interviewer tokens into the chat as they are generated
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() in ("1", "true", "yes")
+# "tools": the model decides when to call the retrieval tools (two LLM calls on tool turns)
+# "pre": JD and resume context is retrieved up front from the latest answer (one LLM call)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "tools")
+# Prompt token budget for the transcript; older turns beyond it are folded into a rolling summary
+COMPACTION_TOKEN_BUDGET = int(os.getenv("COMPACTION_TOKEN_BUDGET", "6000"))
+# Number of most recent turns always sent verbatim
+COMPACTION_KEEP_TURNS = int(os.getenv("COMPACTION_KEEP_TURNS", "2"))
+# Concurrent retrieval tool calls per process
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", "8"))
+
+# --- Job description precomputation (app/jd_precompute.py) ---
+# Role title, JD digest and seed questions are computed once per JD content and persisted
+JD_PRECOMPUTE_ENABLED = os.getenv("JD_PRECOMPUTE_ENABLED", "true").lower() in ("1", "true", "yes")
+JD_PRECOMPUTE_DIR = os.getenv("JD_PRECOMPUTE_DIR", os.path.join(".cache", "jd"))
+# Precomputed JDs kept in memory (least recently used dropped beyond it; still on disk)
+JD_PRECOMPUTE_MEMORY_SIZE = int(os.getenv("JD_PRECOMPUTE_MEMORY_SIZE", "1024"))
+# JD text (typed plus uploaded PDF) sent to the precompute calls
+JD_PRECOMPUTE_MAX_CHARS = int(os.getenv("JD_PRECOMPUTE_MAX_CHARS", "12000"))
+# JDs longer than this are replaced by a digest of about JD_DIGEST_MAX_WORDS words in interviewer prompts
+JD_DIGEST_MIN_CHARS = int(os.getenv("JD_DIGEST_MIN_CHARS", "1500"))
+JD_DIGEST_MAX_WORDS = int(os.getenv("JD_DIGEST_MAX_WORDS", "200"))
+# Opening question ideas generated per JD (0 disables)
+JD_SEED_QUESTIONS = int(os.getenv("JD_SEED_QUESTIONS", "0"))
+
+# --- Speculative prefetch (app/prefetch.py) ---
+# While the candidate answers, prefetch the parts of the next turn that don't depend on the answer
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() in ("1", "true", "yes")
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "8"))
+# Sessions whose prefetched results are kept
+PREFETCH_SESSIONS = int(os.getenv("PREFETCH_SESSIONS", "1024"))
+
+# --- Evaluation (app/answer_scoring.py) ---
+# "incremental": each answer is scored in the background when it is submitted and the final
+# evaluation aggregates the scores; "full": one evaluation call over the whole transcript
+EVALUATION_MODE = os.getenv("EVALUATION_MODE", "incremental")
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "8"))
+# Sessions whose in-flight and finished answer scores are kept in memory
+SCORING_SESSIONS = int(os.getenv("SCORING_SESSIONS", "1024"))
+# Average overall rating at or above which the aggregated decision is HIRE, and below which it is NO HIRE
+EVALUATION_HIRE_THRESHOLD = float(os.getenv("EVALUATION_HIRE_THRESHOLD", "7"))
+EVALUATION_NO_HIRE_THRESHOLD = float(os.getenv("EVALUATION_NO_HIRE_THRESHOLD", "5"))
+
+# --- Model tiers (app/model_tiers.py) ---
+# Chat model of each tier; every model call runs on one of them
+CHAT_MODEL_FAST = os.getenv("CHAT_MODEL_FAST", "gpt-5-nano")
+CHAT_MODEL_STANDARD = os.getenv("CHAT_MODEL_STANDARD", "gpt-5-nano")
+CHAT_MODEL_STRONG = os.getenv("CHAT_MODEL_STRONG", "gpt-5-mini")
+CHAT_TEMPERATURE = float(os.getenv("CHAT_TEMPERATURE", "0.7"))
+# Overrides of the per-call tier, latency budget and timeout, e.g. "evaluation=standard:20000:60000,router=fast"
+# (call=tier[:budget_ms[:timeout_ms]]; calls: router, tools, interviewer, summary, precompute, scoring,
+# feedback, evaluation)
+MODEL_CALLS = os.getenv("MODEL_CALLS", "")
+# How long a call stays on the next faster tier after its tier went over the latency budget
+MODEL_DEGRADE_COOLDOWN_S = float(os.getenv("MODEL_DEGRADE_COOLDOWN_S", "60"))
+
+# --- Batch re-evaluation (python -m app.batch_eval) ---
+# Chat model prices used for the run's cost estimate (USD per million tokens)
+CHAT_INPUT_USD_PER_MTOK = float(os.getenv("CHAT_INPUT_USD_PER_MTOK", "0.05"))
+CHAT_OUTPUT_USD_PER_MTOK = float(os.getenv("CHAT_OUTPUT_USD_PER_MTOK", "0.40"))
+
+# --- Audio ---
+TTS_MODEL = os.getenv("TTS_MODEL", "tts-1")
+TTS_VOICE = os.getenv("TTS_VOICE", "alloy")
+# Concurrent sentence synthesis requests per process
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "4"))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(".cache", "tts"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+STT_MODEL = os.getenv("STT_MODEL", "whisper-1")
+# Concurrent segment transcription requests per answer
+STT_WORKERS = int(os.getenv("STT_WORKERS", "4"))
+# Recordings are downmixed to mono and resampled to this rate before upload
+STT_SAMPLE_RATE = int(os.getenv("STT_SAMPLE_RATE", "16000"))
+# "mulaw" (8-bit G.711 WAV), "wav" (16-bit PCM) or "flac" (needs soundfile)
+STT_UPLOAD_FORMAT = os.getenv("STT_UPLOAD_FORMAT", "mulaw")
+# Recordings longer than this are split at pauses and the segments transcribed in parallel
+STT_SEGMENT_S = float(os.getenv("STT_SEGMENT_S", "15"))
+STT_MIN_SILENCE_MS = int(os.getenv("STT_MIN_SILENCE_MS", "400"))
+# Silence threshold, relative to the recording's loud speech level
+STT_SILENCE_DB = float(os.getenv("STT_SILENCE_DB", "-30"))
+# Transcripts of identical segments kept in memory
+STT_CACHE_SIZE = int(os.getenv("STT_CACHE_SIZE", "256"))
+
+# --- Telemetry ---
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "true").lower() in ("1", "true", "yes")
+# Append every finished span to this JSONL file (disabled when empty)
+TELEMETRY_JSONL = os.getenv("TELEMETRY_JSONL", "")
+# Finished spans kept in memory for session summaries and Prometheus export
+TELEMETRY_BUFFER_SIZE = int(os.getenv("TELEMETRY_BUFFER_SIZE", "20000"))
+
+# --- Service ---
+# Address of the interview service (python -m app.service); when SERVICE_URL is
+# empty the Streamlit UI starts an embedded service in its own process
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8765"))
+SERVICE_URL = os.getenv("SERVICE_URL", "")
+# Threads running graph nodes for all sessions multiplexed on the service's event loop
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", "64"))
+# Connection pool shared by the OpenAI chat and embeddings clients
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "200"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "50"))
+
+# --- Client pool (app/client_pool.py) ---
+# Admission control, retries and coalescing for every OpenAI request
+CLIENT_POOL_ENABLED = os.getenv("CLIENT_POOL_ENABLED", "true").lower() in ("1", "true", "yes")
+# Provider budgets per endpoint kind (requests and estimated tokens per minute)
+CHAT_RPM = float(os.getenv("CHAT_RPM", "500"))
+CHAT_TPM = float(os.getenv("CHAT_TPM", "200000"))
+EMBEDDING_RPM = float(os.getenv("EMBEDDING_RPM", "3000"))
+EMBEDDING_TPM = float(os.getenv("EMBEDDING_TPM", "1000000"))
+AUDIO_RPM = float(os.getenv("AUDIO_RPM", "100"))
+# Adaptive (AIMD) in-flight limit per endpoint kind
+POOL_INITIAL_CONCURRENCY = int(os.getenv("POOL_INITIAL_CONCURRENCY", "8"))
+POOL_MAX_CONCURRENCY = int(os.getenv("POOL_MAX_CONCURRENCY", "64"))
+POOL_MAX_RETRIES = int(os.getenv("POOL_MAX_RETRIES", "4"))
+POOL_BACKOFF_BASE_S = float(os.getenv("POOL_BACKOFF_BASE_S", "0.5"))
+POOL_BACKOFF_MAX_S = float(os.getenv("POOL_BACKOFF_MAX_S", "20"))
@@ -0,0 +1,232 @@
+"""
+Chunk-level embedding cache shared by every index built in the process.
+
+Vectors are keyed by hash(model, text) and stored per model as an append-only,
+memory-mapped float32 matrix (`vectors.f32`) plus an offset index (`keys.txt`,
+one key per row), so identical chunks across JDs, resumes and plain-text
+descriptions are only ever embedded once. Query vectors are cached in memory only.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.telemetry import span
+from app.token_utils import count_tokens
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no cross-process lock, so one process per cache directory
+    fcntl = None
+
+
+def embedding_key(model: str, text: str) -> str:
+    """Cache key for one text embedded with one model."""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    On-disk float32 matrix of embeddings for a single model.
+
+    Row N of `vectors.f32` belongs to line N of `keys.txt`. Appends take an
+    exclusive file lock (`flock`, so several processes can share the cache
+    directory), pick up rows other processes appended since, and cut off any
+    tail left by a crash between writing vectors and keys before appending:
+    new rows always start where the indexed rows end.
+
+    Query vectors are kept in a bounded in-memory LRU instead of on disk, so the
+    matrix only grows with document chunks.
+    """
+
+    def __init__(self, root: str, model: str, query_cache_size: int = 1024):
+        self.dir = os.path.join(root, hashlib.sha1(model.encode("utf-8")).hexdigest()[:16])
+        self.model = model
+        self.dim: Optional[int] = None
+        self.query_cache_size = query_cache_size
+        self._offsets: Dict[str, int] = {}
+        # Rows and bytes of keys.txt read into _offsets (a key written twice keeps its first row)
+        self._rows = 0
+        self._keys_read = 0
+        self._matrix: Optional[np.memmap] = None
+        self._queries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.dir, exist_ok=True)
+        self._vectors_path = os.path.join(self.dir, "vectors.f32")
+        self._keys_path = os.path.join(self.dir, "keys.txt")
+        self._meta_path = os.path.join(self.dir, "meta.json")
+        self._lock_path = os.path.join(self.dir, "lock")
+        with self._lock, self._file_lock():
+            self._sync()
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the cache directory, held across processes."""
+        with open(self._lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _sync(self) -> None:
+        """
+        Read rows appended since the last sync (by any process) and cut both files back
+        to the rows present in both. Called with the file lock held.
+        """
+        if self.dim is None:
+            if not os.path.exists(self._meta_path):
+                return
+            with open(self._meta_path) as f:
+                self.dim = json.load(f)["dim"]
+        row_bytes = 4 * self.dim
+        vector_rows = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        if os.path.exists(self._keys_path):
+            with open(self._keys_path, "rb") as f:
+                f.seek(self._keys_read)
+                for line in f:
+                    # A line without its newline was cut short by a crash
+                    if not line.endswith(b"\n") or self._rows >= vector_rows:
+                        break
+                    self._offsets.setdefault(line.decode("utf-8").strip(), self._rows)
+                    self._rows += 1
+                    self._keys_read += len(line)
+            if os.path.getsize(self._keys_path) > self._keys_read:
+                os.truncate(self._keys_path, self._keys_read)
+        if vector_rows > self._rows:
+            # Vectors whose keys were never written: cut so the next append starts at the right row
+            os.truncate(self._vectors_path, self._rows * row_bytes)
+        self._remap()
+
+    def _remap(self) -> None:
+        rows = self._rows
+        self._matrix = (
+            np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+            if rows else None
+        )
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Return cached vectors for whichever of `keys` are present."""
+        with self._lock:
+            found = [(k, self._offsets[k]) for k in keys if k in self._offsets]
+            if not found:
+                return {}
+            rows = np.asarray(self._matrix[[row for _, row in found]])
+        return {k: rows[i].tolist() for i, (k, _) in enumerate(found)}
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """Append new vectors to the matrix and the offset index."""
+        with self._lock:
+            if all(k in self._offsets for k in items):
+                return
+            matrix = np.asarray(list(items.values()), dtype=np.float32)
+            with self._file_lock():
+                if self.dim is None and not os.path.exists(self._meta_path):
+                    with open(self._meta_path, "w") as f:
+                        json.dump({"model": self.model, "dim": int(matrix.shape[1])}, f)
+                # Rows other processes appended, and the cut of a crashed append
+                self._sync()
+                new = {k: v for k, v in zip(items, matrix) if k not in self._offsets}
+                if not new:
+                    return
+                # Vectors first, then keys: a crash in between leaves a tail that the next sync cuts
+                with open(self._vectors_path, "ab") as f:
+                    f.write(np.asarray(list(new.values()), dtype=np.float32).tobytes())
+                with open(self._keys_path, "ab") as f:
+                    f.write("".join(f"{k}\n" for k in new).encode("utf-8"))
+                self._sync()
+
+    def get_query(self, key: str) -> Optional[List[float]]:
+        """A query vector from the in-memory LRU, or a vector persisted by an earlier version."""
+        with self._lock:
+            vector = self._queries.get(key)
+            if vector is not None:
+                self._queries.move_to_end(key)
+                return vector
+        return self.get_many([key]).get(key)
+
+    def put_query(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._queries[key] = vector
+            self._queries.move_to_end(key)
+            while len(self._queries) > self.query_cache_size:
+                self._queries.popitem(last=False)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves cached vectors and only sends misses to the
+    underlying embedder, in batches. Create one per ingest to get per-ingest stats.
+    """
+
+    def __init__(self, embedder: Embeddings, store: EmbeddingStore, batch_size: int = 256):
+        self.embedder = embedder
+        self.store = store
+        self.batch_size = batch_size
+        self.stats = {"hits": 0, "misses": 0, "saved_tokens": 0, "batches": 0}
+        # The ingest pipeline embeds batches of one document concurrently
+        self._stats_lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with span("embedding.documents", kind="embedding", texts=len(texts)) as s:
+            call_stats = {"hits": 0, "misses": 0, "saved_tokens": 0, "batches": 0}
+            vectors = self._embed_documents(texts, call_stats)
+            with self._stats_lock:
+                for key, value in call_stats.items():
+                    self.stats[key] += value
+            s.set(cache_hits=call_stats["hits"], cache_misses=call_stats["misses"], batches=call_stats["batches"])
+            return vectors
+
+    def _embed_documents(self, texts: List[str], stats: Dict[str, int]) -> List[List[float]]:
+        model = self.store.model
+        keys = [embedding_key(model, t) for t in texts]
+        vectors = self.store.get_many(keys)
+
+        # Deduplicate misses so repeated chunks inside one document are embedded once
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+        for key, text in zip(keys, texts):
+            if key in vectors:
+                stats["hits"] += 1
+                stats["saved_tokens"] += count_tokens(text, model)
+            else:
+                stats["misses"] += 1
+
+        missing_items = list(missing.items())
+        for i in range(0, len(missing_items), self.batch_size):
+            batch = missing_items[i:i + self.batch_size]
+            with span("embedding.batch", kind="embedding", texts=len(batch)):
+                embedded = self.embedder.embed_documents([text for _, text in batch])
+            stats["batches"] += 1
+            new = {key: vector for (key, _), vector in zip(batch, embedded)}
+            self.store.put_many(new)
+            vectors.update(new)
+
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        with span("embedding.query", kind="embedding") as s:
+            key = embedding_key(self.store.model, text)
+            cached = self.store.get_query(key)
+            if cached is not None:
+                s.set(cache_hits=1)
+                return cached
+            s.set(cache_misses=1)
+            vector = self.embedder.embed_query(text)
+            # Queries are not persisted: they are rarely repeated across processes and would grow the matrix
+            self.store.put_query(key, vector)
+            return vector
@@ -1,23 +1,33 @@
 from langgraph.graph import StateGraph, END
 from app.state import InterviewState
-from app.nodes import main_agent_router, interviewer_agent, evaluation_agent
-import streamlit as st
+from app.nodes import main_agent_router, answer_scoring_agent, compaction_agent, interviewer_agent, evaluation_agent
+from app.checkpoint import create_checkpointer
 
 def should_continue(state: InterviewState):
     if state["interview_status"] == "finished":
         return "evaluation_agent"
     return END 
 
-@st.cache_resource
-def build_graph():
-    """Build and compile the interview graph. Cached to avoid recompilation on every rerun."""
+def build_graph(checkpointer=None):
+    """
+    Build and compile the interview graph.
+    Compiled with a checkpointer, so each interview thread keeps its own state between turns.
+
+    Args:
+        checkpointer: Checkpoint saver; defaults to `create_checkpointer()`. The async
+            service passes one that supports `astream` (see `create_async_checkpointer`).
+    """
     workflow = StateGraph(InterviewState)
     workflow.add_node("main_agent", main_agent_router)
+    workflow.add_node("answer_scoring", answer_scoring_agent)
+    workflow.add_node("compaction_agent", compaction_agent)
     workflow.add_node("interviewer_agent", interviewer_agent)
     workflow.add_node("evaluation_agent", evaluation_agent)
 
     workflow.set_entry_point("main_agent")
-    workflow.add_edge("main_agent", "interviewer_agent")
+    workflow.add_edge("main_agent", "answer_scoring")
+    workflow.add_edge("answer_scoring", "compaction_agent")
+    workflow.add_edge("compaction_agent", "interviewer_agent")
     workflow.add_conditional_edges(
         "interviewer_agent",
         should_continue,
@@ -27,6 +37,6 @@ def build_graph():
         }
     )
     workflow.add_edge("evaluation_agent", END)
-    return workflow.compile()
-
-app_graph = build_graph()
\ No newline at end of file
+    if checkpointer is None:
+        checkpointer = create_checkpointer()
+    return workflow.compile(checkpointer=checkpointer)
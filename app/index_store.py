@@ -0,0 +1,146 @@
+"""
+Content-addressed, disk-persistent store for FAISS indexes.
+
+Indexes are keyed by a SHA-256 of the source document bytes plus the
+chunking/embedding settings used to build them, so the same PDF uploaded
+again (under any file name, by any session, after any restart) is loaded
+from disk instead of being re-parsed and re-embedded.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import Iterable, Optional
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+
+def content_key(data: bytes, **settings) -> str:
+    """
+    Build the store key for a document.
+
+    Args:
+        data: Raw document bytes
+        **settings: Settings that affect the resulting index (chunk size, embedding model, ...)
+
+    Returns:
+        Hex digest identifying the document/settings combination
+    """
+    digest = hashlib.sha256(data)
+    digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for entry in os.scandir(path):
+        if entry.is_file():
+            total += entry.stat().st_size
+    return total
+
+
+class IndexStore:
+    """
+    Directory of FAISS indexes saved with `save_local`, one sub-directory per key.
+    The directory mtime doubles as the last-used timestamp for LRU eviction.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def contains(self, key: str) -> bool:
+        return os.path.isdir(self._path(key))
+
+    def get(self, key: str, embeddings: Embeddings) -> Optional[FAISS]:
+        """
+        Load a persisted index.
+
+        Args:
+            key: Store key from `content_key`
+            embeddings: Embeddings used for queries against the loaded index
+
+        Returns:
+            FAISS vector store, or None if the key is not in the store
+        """
+        path = self._path(key)
+        if not os.path.isdir(path):
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            vectorstore = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+        except (FileNotFoundError, RuntimeError):
+            # RuntimeError: faiss cannot open a missing or half-evicted index file
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return vectorstore
+
+    def put(self, key: str, vectorstore: FAISS, keep: Iterable[str] = ()) -> None:
+        """Persist an index under `key` and evict old entries beyond the size cap (except those in `keep`)."""
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.root)
+        try:
+            vectorstore.save_local(tmp_dir)
+            target = self._path(key)
+            with self._lock:
+                if os.path.isdir(target):
+                    shutil.rmtree(target, ignore_errors=True)
+                os.replace(tmp_dir, target)
+        finally:
+            if os.path.isdir(tmp_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict(keep)
+
+    def evict(self, keep: Iterable[str] = ()) -> None:
+        """
+        Remove least recently used indexes until the store fits in `max_bytes`.
+
+        Args:
+            keep: Keys not to remove (indexes pinned by running interviews)
+        """
+        keep = set(keep)
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.root):
+                if entry.is_dir() and not entry.name.startswith("."):
+                    entries.append((entry.stat().st_mtime, entry.path, _dir_size(entry.path)))
+            total = sum(size for _, _, size in entries)
+            # Never evict the most recently used entry, even if it alone exceeds the cap
+            for _, path, size in sorted(entries)[:-1]:
+                if total <= self.max_bytes:
+                    break
+                if os.path.basename(path) in keep:
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current disk usage."""
+        with self._lock:
+            entries = [e for e in os.scandir(self.root) if e.is_dir() and not e.name.startswith(".")]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "bytes": sum(_dir_size(e.path) for e in entries),
+            }
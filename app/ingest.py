@@ -0,0 +1,336 @@
+"""
+Streaming PDF ingest pipeline.
+
+Pages are parsed straight from the uploaded bytes (no temp file), in parallel
+worker processes for long documents. Each page is split as soon as its text is
+available, chunks are grouped into embedding requests that run concurrently,
+and finished batches are appended to the FAISS index in document order, so
+parsing, embedding and indexing overlap instead of running one after another.
+
+A revised version of an already indexed document is diffed against the prior
+index instead: pages and chunks are matched by content hash, unchanged ones
+keep their vectors and only new chunks are embedded.
+"""
+import contextvars
+import hashlib
+import io
+import multiprocessing
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from pypdf import PdfReader
+
+from app.config import (
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    INGEST_EMBED_BATCH_SIZE,
+    INGEST_EMBED_CONCURRENCY,
+    INGEST_PAGES_PER_TASK,
+    INGEST_PARALLEL_MIN_PAGES,
+    INGEST_PARSE_WORKERS,
+)
+from app.pdf_text import extract_pages, ready
+from app.telemetry import span
+
+# Shared pool for embedding requests of all ingests in the process
+_embed_executor = ThreadPoolExecutor(max_workers=INGEST_EMBED_CONCURRENCY, thread_name_prefix="ingest-embed")
+
+
+@lru_cache(maxsize=None)
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Get the process pool for page extraction, or None if parsing runs inline.
+    Workers are spawned rather than forked because the UI and service processes are multi-threaded.
+    """
+    if INGEST_PARSE_WORKERS <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=INGEST_PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+def warm_parse_pool() -> List[Future]:
+    """
+    Start the parse workers ahead of the first large upload (spawning them takes a moment).
+
+    Returns:
+        Futures that complete once the workers are up (empty if parsing runs inline)
+    """
+    pool = get_parse_pool()
+    if pool is None:
+        return []
+    return [pool.submit(ready) for _ in range(INGEST_PARSE_WORKERS)]
+
+
+def iter_pages(pdf_bytes: bytes) -> Iterator[Tuple[int, int, str]]:
+    """
+    Yield the text of every page in order, parsing ahead in worker processes.
+
+    Args:
+        pdf_bytes: Raw PDF bytes
+
+    Yields:
+        (page number, page count, page text)
+    """
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    total = len(reader.pages)
+    pool = get_parse_pool() if total >= INGEST_PARALLEL_MIN_PAGES else None
+    pages_done = 0
+    if pool is not None:
+        ranges = [(start, min(start + INGEST_PAGES_PER_TASK, total)) for start in range(0, total, INGEST_PAGES_PER_TASK)]
+        try:
+            futures = [pool.submit(extract_pages, pdf_bytes, start, stop) for start, stop in ranges]
+            # Later ranges keep parsing while earlier ones are split and embedded
+            for (start, stop), future in zip(ranges, futures):
+                texts = future.result()
+                for offset, text in enumerate(texts):
+                    yield start + offset, total, text
+                pages_done = stop
+            return
+        except BrokenProcessPool as e:
+            print(f"PDF parse pool failed, parsing inline: {e}")
+            get_parse_pool.cache_clear()
+    for i in range(pages_done, total):
+        yield i, total, reader.pages[i].extract_text()
+
+
+def text_hash(text: str) -> str:
+    """Content hash used to match pages and chunks across document versions."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _split_page(splitter: RecursiveCharacterTextSplitter, page: int, total: int, text: str) -> List[Document]:
+    metadata = {"page": page, "total_pages": total, "page_hash": text_hash(text)}
+    return splitter.split_documents([Document(page_content=text, metadata=metadata)])
+
+
+def _splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, length_function=len)
+
+
+def _embed_batch(embeddings: Embeddings, docs: List[Document]) -> Tuple[List[Document], List[List[float]]]:
+    with span("ingest.embed_batch", kind="ingest", chunks=len(docs)):
+        return docs, embeddings.embed_documents([doc.page_content for doc in docs])
+
+
+class _EmbedPipeline:
+    """
+    Embedding requests of one ingest, run concurrently on the shared executor.
+    Finished batches are passed to `on_batch` in submission order as they complete,
+    with at most INGEST_EMBED_CONCURRENCY batches in flight.
+    """
+
+    def __init__(self, embeddings: Embeddings, on_batch: Callable[[List[Document], List[List[float]]], None]):
+        self.embeddings = embeddings
+        self.on_batch = on_batch
+        self.chunks = 0
+        self._pending = deque()
+
+    def submit(self, docs: List[Document]) -> None:
+        self._pending.append(
+            _embed_executor.submit(contextvars.copy_context().run, _embed_batch, self.embeddings, docs)
+        )
+        self.chunks += len(docs)
+        # Index finished batches as we go and bound the number of batches in flight
+        while self._pending and (self._pending[0].done() or len(self._pending) > INGEST_EMBED_CONCURRENCY):
+            self._next()
+
+    def drain(self) -> None:
+        """Wait for every submitted batch."""
+        while self._pending:
+            self._next()
+
+    def _next(self) -> None:
+        self.on_batch(*self._pending.popleft().result())
+
+
+def build_index(pdf_bytes: bytes, embeddings: Embeddings) -> Tuple[FAISS, dict]:
+    """
+    Parse, chunk, embed and index a PDF as a pipeline.
+
+    Args:
+        pdf_bytes: Raw PDF bytes
+        embeddings: Embeddings used for the chunks and stored on the index for queries
+
+    Returns:
+        (vectorstore, stats) where stats has pages, chunks, first_chunk_s (time until
+        the first chunk was searchable in the index) and total_s
+
+    Raises:
+        ValueError: If no text could be extracted from the PDF
+    """
+    start = time.perf_counter()
+    splitter = _splitter()
+    stats = {"pages": 0, "chunks": 0, "first_chunk_s": None, "total_s": None}
+    vectorstore: Optional[FAISS] = None
+    batch: List[Document] = []
+
+    def index_batch(docs: List[Document], vectors: List[List[float]]) -> None:
+        nonlocal vectorstore
+        text_embeddings = [(doc.page_content, vector) for doc, vector in zip(docs, vectors)]
+        metadatas = [doc.metadata for doc in docs]
+        if vectorstore is None:
+            vectorstore = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas)
+            stats["first_chunk_s"] = round(time.perf_counter() - start, 4)
+        else:
+            vectorstore.add_embeddings(text_embeddings, metadatas=metadatas)
+
+    pipeline = _EmbedPipeline(embeddings, index_batch)
+    for page, total, text in iter_pages(pdf_bytes):
+        stats["pages"] = total
+        batch.extend(_split_page(splitter, page, total, text))
+        # The first page goes out on its own so the index has searchable chunks early
+        batch_size = INGEST_EMBED_BATCH_SIZE if pipeline.chunks else len(batch) or 1
+        while len(batch) >= batch_size:
+            pipeline.submit(batch[:batch_size])
+            batch = batch[batch_size:]
+            batch_size = INGEST_EMBED_BATCH_SIZE
+    if batch:
+        pipeline.submit(batch)
+    pipeline.drain()
+    stats["chunks"] = pipeline.chunks
+    if vectorstore is None:
+        raise ValueError("No text could be extracted from the PDF")
+    stats["total_s"] = round(time.perf_counter() - start, 4)
+    return vectorstore, stats
+
+
+def _copy_vectorstore(base: FAISS, embeddings: Embeddings) -> FAISS:
+    """Independent copy of an index; registry indexes are shared and must not be modified."""
+    return FAISS(
+        embeddings,
+        faiss.clone_index(base.index),
+        InMemoryDocstore(dict(base.docstore._dict)),
+        dict(base.index_to_docstore_id),
+        relevance_score_fn=base.override_relevance_score_fn,
+        normalize_L2=base._normalize_L2,
+        distance_strategy=base.distance_strategy,
+    )
+
+
+def build_unified_index(sources: Dict[str, FAISS], embeddings: Embeddings) -> FAISS:
+    """
+    Combine the indexes of several documents into one, tagging every chunk with its source.
+    Vectors are copied from the source indexes, so nothing is re-embedded.
+
+    Args:
+        sources: Source label (stored as the `source` metadata field) -> index of that document
+        embeddings: Embeddings stored on the combined index for queries
+
+    Returns:
+        FAISS vector store over the chunks of all sources
+    """
+    text_embeddings = []
+    metadatas = []
+    for source, vectorstore in sources.items():
+        vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)
+        docs = vectorstore.docstore._dict
+        for position, doc_id in sorted(vectorstore.index_to_docstore_id.items()):
+            doc = docs[doc_id]
+            text_embeddings.append((doc.page_content, vectors[position].tolist()))
+            metadatas.append({**doc.metadata, "source": source})
+    return FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas)
+
+
+def update_index(pdf_bytes: bytes, embeddings: Embeddings, base: FAISS) -> Tuple[FAISS, dict]:
+    """
+    Build the index of a revised document from the index of its previous version.
+
+    Pages whose text is unchanged keep all their chunks without re-splitting;
+    other pages are split and their chunks matched by content hash. Matched
+    chunks keep their vectors, unmatched ones are embedded and added, and
+    chunks no longer in the document are deleted.
+
+    Args:
+        pdf_bytes: Raw bytes of the new version
+        embeddings: Embeddings for new chunks, stored on the index for queries
+        base: Index of the previous version (left unchanged)
+
+    Returns:
+        (vectorstore, stats) with the same stats as `build_index` plus
+        reused_pages, reused_chunks, new_chunks and removed_chunks
+
+    Raises:
+        ValueError: If no text could be extracted from the PDF
+    """
+    start = time.perf_counter()
+    vectorstore = _copy_vectorstore(base, embeddings)
+    docs = vectorstore.docstore._dict
+    pages = defaultdict(list)  # (page hash, page number) -> doc IDs
+    by_chunk = defaultdict(deque)  # chunk hash -> doc IDs
+    for doc_id in vectorstore.index_to_docstore_id.values():
+        doc = docs[doc_id]
+        if "page_hash" in doc.metadata:
+            pages[(doc.metadata["page_hash"], doc.metadata.get("page"))].append(doc_id)
+        by_chunk[text_hash(doc.page_content)].append(doc_id)
+    by_page = defaultdict(deque)  # page hash -> doc IDs of each old page with that text
+    for (page_hash, _), doc_ids in pages.items():
+        by_page[page_hash].append(doc_ids)
+
+    splitter = _splitter()
+    stats = {"pages": 0, "chunks": 0, "first_chunk_s": None, "total_s": None,
+             "reused_pages": 0, "reused_chunks": 0, "new_chunks": 0, "removed_chunks": 0}
+    kept = {}  # doc ID -> updated metadata
+    added = set()  # doc IDs of new chunks
+    batch: List[Document] = []
+
+    def index_batch(new_docs: List[Document], vectors: List[List[float]]) -> None:
+        added.update(vectorstore.add_embeddings(
+            [(doc.page_content, vector) for doc, vector in zip(new_docs, vectors)],
+            metadatas=[doc.metadata for doc in new_docs],
+        ))
+
+    # New chunks are embedded while the rest of the document is parsed and matched,
+    # so a mostly new document is not embedded in one serial request at the end
+    pipeline = _EmbedPipeline(embeddings, index_batch)
+    for page, total, text in iter_pages(pdf_bytes):
+        stats["pages"] = total
+        metadata = {"page": page, "total_pages": total, "page_hash": text_hash(text)}
+        candidate_pages = by_page.get(metadata["page_hash"])
+        while candidate_pages and any(doc_id in kept for doc_id in candidate_pages[0]):
+            candidate_pages.popleft()
+        if candidate_pages:
+            # Unchanged page (possibly moved): keep its chunks as they are
+            page_ids = candidate_pages.popleft()
+            kept.update((doc_id, metadata) for doc_id in page_ids)
+            stats["reused_pages"] += 1
+            stats["chunks"] += len(page_ids)
+            continue
+        for chunk in _split_page(splitter, page, total, text):
+            stats["chunks"] += 1
+            candidates = by_chunk.get(text_hash(chunk.page_content))
+            while candidates and candidates[0] in kept:
+                candidates.popleft()
+            if candidates:
+                kept[candidates.popleft()] = chunk.metadata
+            else:
+                batch.append(chunk)
+                if len(batch) >= INGEST_EMBED_BATCH_SIZE:
+                    pipeline.submit(batch)
+                    batch = []
+    if batch:
+        pipeline.submit(batch)
+    pipeline.drain()
+
+    removed = [
+        doc_id for doc_id in vectorstore.index_to_docstore_id.values() if doc_id not in kept and doc_id not in added
+    ]
+    if removed:
+        vectorstore.delete(removed)
+    for doc_id, metadata in kept.items():
+        # Page numbers shift when pages are inserted or removed
+        if docs[doc_id].metadata != metadata:
+            docs[doc_id] = Document(page_content=docs[doc_id].page_content, metadata=metadata, id=docs[doc_id].id)
+    if not vectorstore.index_to_docstore_id:
+        raise ValueError("No text could be extracted from the PDF")
+    stats.update(reused_chunks=len(kept), new_chunks=pipeline.chunks, removed_chunks=len(removed))
+    stats["total_s"] = round(time.perf_counter() - start, 4)
+    return vectorstore, stats
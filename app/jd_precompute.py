@@ -0,0 +1,226 @@
+"""
+Per-job-description precomputation, persisted and keyed by JD content.
+
+Routing an interview to a role title depends only on the job description, and
+the same JD is used for dozens of interviews. The role title, a compact JD
+digest for the interviewer prompt and optional seed questions are computed once
+per JD (typed text plus uploaded PDF), in the background as soon as the JD is
+entered, and stored as JSON so later interviews skip the routing round trip.
+"""
+import contextvars
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.config import (
+    JD_DIGEST_MAX_WORDS,
+    JD_DIGEST_MIN_CHARS,
+    JD_PRECOMPUTE_DIR,
+    JD_PRECOMPUTE_MAX_CHARS,
+    JD_PRECOMPUTE_MEMORY_SIZE,
+    JD_SEED_QUESTIONS,
+)
+from app.index_store import content_key
+from app.prompts import JD_DIGEST_PROMPT, ROUTER_SYSTEM_PROMPT, SEED_QUESTIONS_PROMPT
+from app.model_tiers import get_model_tiers, invoke_model
+from app.providers import model_name
+from app.rag_utils import get_document_text
+from app.telemetry import current_span, span
+
+
+def jd_text(job_description: str, jd_index_id: Optional[str]) -> str:
+    """The JD as seen by the precompute calls: typed text followed by the uploaded PDF's text."""
+    parts = [job_description.strip()]
+    if jd_index_id:
+        parts.append(get_document_text(jd_index_id, JD_PRECOMPUTE_MAX_CHARS))
+    return "\n\n".join(p for p in parts if p)[:JD_PRECOMPUTE_MAX_CHARS]
+
+
+def route_role(text: str) -> str:
+    """Ask the model for the interview's role title."""
+    content = f"Job Description:\n{text or '(not provided)'}"
+    messages = [SystemMessage(content=ROUTER_SYSTEM_PROMPT), HumanMessage(content=content)]
+    return invoke_model("router", messages).content.strip()
+
+
+class JDPrecomputeStore:
+    """
+    Directory of precomputed JD results, one JSON file per key, with the
+    `memory_size` most recently used results also kept in memory.
+    """
+
+    def __init__(self, root: str, memory_size: int = 1024):
+        self.root = root
+        self.memory_size = memory_size
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            if key in self._memory:
+                self.hits += 1
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        try:
+            with open(os.path.join(self.root, f"{key}.json")) as f:
+                value = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=self.root)
+        with os.fdopen(fd, "w") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, os.path.join(self.root, f"{key}.json"))
+        with self._lock:
+            self._remember(key, value)
+
+    def _remember(self, key: str, value: dict) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+
+class JDPrecomputer:
+    """
+    Computes and caches the role title, JD digest and seed questions of a JD.
+    Concurrent requests for the same JD share one computation.
+    """
+
+    def __init__(self, store: JDPrecomputeStore, max_workers: int = 4):
+        self.store = store
+        self.computed = 0
+        self.waited = 0
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        # Background precomputes and the parallel calls inside one precompute
+        self._background = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jd-precompute")
+        self._calls = ThreadPoolExecutor(max_workers=3 * max_workers, thread_name_prefix="jd-call")
+
+    @staticmethod
+    def key(job_description: str, jd_index_id: Optional[str]) -> str:
+        """Cache key: JD content plus everything that changes the computed result."""
+        return content_key(
+            job_description.strip().encode("utf-8"),
+            jd_index_id=jd_index_id,
+            models=[model_name(get_model_tiers().model(call)) for call in ("router", "precompute")],
+            prompts=[ROUTER_SYSTEM_PROMPT, JD_DIGEST_PROMPT, SEED_QUESTIONS_PROMPT],
+            digest=[JD_DIGEST_MIN_CHARS, JD_DIGEST_MAX_WORDS, JD_PRECOMPUTE_MAX_CHARS],
+            seed_questions=JD_SEED_QUESTIONS,
+        )
+
+    def submit(self, job_description: str, jd_index_id: Optional[str]) -> str:
+        """Start precomputing a JD in the background unless it is cached or running; returns its key."""
+        key = self.key(job_description, jd_index_id)
+        if self.store.get(key) is None:
+            self._start(key, job_description, jd_index_id, self._background)
+        return key
+
+    def get(self, job_description: str, jd_index_id: Optional[str]) -> dict:
+        """
+        Get the precomputed results of a JD, waiting for a running precompute or computing it now.
+
+        Returns:
+            {"role", "digest", "seed_questions"}; digest is None when the JD is short enough to use verbatim
+        """
+        key = self.key(job_description, jd_index_id)
+        value = self.store.get(key)
+        if value is not None:
+            current_span().add("cache_hits")
+            return value
+        current_span().add("cache_misses")
+        future, started = self._start(key, job_description, jd_index_id, None)
+        if not started:
+            with self._lock:
+                self.waited += 1
+        return future.result()
+
+    def _start(self, key: str, job_description: str, jd_index_id: Optional[str], executor):
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future, False
+            future = self._in_flight[key] = Future()
+
+        def run():
+            try:
+                value = self._compute(job_description, jd_index_id)
+                self.store.put(key, value)
+                future.set_result(value)
+            except Exception as e:
+                print(f"JD precompute failed: {e}")
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._in_flight.pop(key, None)
+
+        if executor is None:
+            run()
+        else:
+            executor.submit(run)
+        return future, True
+
+    def _compute(self, job_description: str, jd_index_id: Optional[str]) -> dict:
+        with span("jd.precompute", kind="precompute") as s:
+            text = jd_text(job_description, jd_index_id)
+            # Calls run in parallel, each in a copy of this context so their spans nest here
+            role = self._calls.submit(contextvars.copy_context().run, route_role, text)
+            digest = None
+            if len(text) > JD_DIGEST_MIN_CHARS:
+                digest = self._calls.submit(contextvars.copy_context().run, self._digest, text)
+            seeds = None
+            if JD_SEED_QUESTIONS > 0 and text:
+                seeds = self._calls.submit(contextvars.copy_context().run, self._seed_questions, text, role)
+            value = {
+                "role": role.result(),
+                "digest": digest.result() if digest else None,
+                "seed_questions": seeds.result() if seeds else [],
+            }
+            s.set(jd_chars=len(text), digest=bool(value["digest"]), seed_questions=len(value["seed_questions"]))
+        with self._lock:
+            self.computed += 1
+        return value
+
+    @staticmethod
+    def _digest(text: str) -> str:
+        messages = [SystemMessage(content=JD_DIGEST_PROMPT.format(max_words=JD_DIGEST_MAX_WORDS)), HumanMessage(content=text)]
+        return invoke_model("precompute", messages).content.strip()
+
+    @staticmethod
+    def _seed_questions(text: str, role: Future) -> list:
+        prompt = SEED_QUESTIONS_PROMPT.format(role=role.result(), count=JD_SEED_QUESTIONS)
+        reply = invoke_model("precompute", [SystemMessage(content=prompt), HumanMessage(content=text)]).content
+        return [line.strip() for line in reply.splitlines() if line.strip()][:JD_SEED_QUESTIONS]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.store.hits,
+                "misses": self.store.misses,
+                "computed": self.computed,
+                "waited_for_background": self.waited,
+                "in_flight": len(self._in_flight),
+            }
+
+
+@lru_cache(maxsize=None)
+def get_jd_precomputer() -> JDPrecomputer:
+    """Get the process-wide JD precomputer and its on-disk store."""
+    return JDPrecomputer(JDPrecomputeStore(JD_PRECOMPUTE_DIR, JD_PRECOMPUTE_MEMORY_SIZE))
@@ -0,0 +1,103 @@
+"""
+In-memory BM25 index over the chunks of a FAISS vectorstore.
+
+Built when an index is registered (at ingest or when it is loaded from the
+index store) and kept next to the vectorstore in the retriever registry, so
+keyword queries can be answered locally without a query embedding request.
+"""
+import math
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_community.vectorstores import FAISS
+
+# Keeps technical tokens such as "c++", "c#", "node.js" and "ci/cd" parts intact
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*")
+_POSSESSIVE = re.compile(r"['’]s\b")
+
+STOPWORDS = frozenset(
+    "a an and are as at be been by can could did do does for from had has have how i in is it its "
+    "me my of on or our should so than that the their them then there these they this to was we "
+    "were what when where which who why will with would you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords."""
+    return [t for t in _TOKEN.findall(_POSSESSIVE.sub("", text.lower())) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed list of documents, with an inverted index of term frequencies.
+
+    Args:
+        doc_ids: Docstore ID of each document
+        texts: Text of each document
+        k1: Term frequency saturation
+        b: Document length normalization
+    """
+
+    def __init__(self, doc_ids: Sequence[str], texts: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.doc_ids = list(doc_ids)
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: List[int] = []
+        for i, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, {})[i] = tf
+        n = len(self.doc_ids)
+        self.avg_length = (sum(self.doc_lengths) / n) if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore: FAISS) -> "BM25Index":
+        """Index every chunk of a FAISS vectorstore under its docstore ID."""
+        doc_ids = list(vectorstore.index_to_docstore_id.values())
+        docs = vectorstore.docstore._dict
+        return cls(doc_ids, [docs[doc_id].page_content for doc_id in doc_ids])
+
+    def search(self, query: str, k: int,
+               allowed: Optional[Callable[[str], bool]] = None) -> Tuple[List[Tuple[str, float]], float]:
+        """
+        Rank documents for a query.
+
+        Args:
+            query: Free-text query
+            k: Maximum number of results
+            allowed: Predicate on doc IDs restricting the documents considered
+
+        Returns:
+            ([(doc ID, score)] best first, only documents matching at least one term;
+            share of the distinct query terms that occur in the best document)
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        scores: Dict[int, float] = {}
+        for term in terms:
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = self.idf[term]
+            for i, tf in docs.items():
+                if allowed is not None and not allowed(self.doc_ids[i]):
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[i] / (self.avg_length or 1))
+                scores[i] = scores.get(i, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        coverage = 0.0
+        if ranked and terms:
+            best = ranked[0][0]
+            coverage = sum(1 for term in terms if best in self.postings.get(term, {})) / len(terms)
+        return [(self.doc_ids[i], score) for i, score in ranked], coverage
+
+    def approx_bytes(self) -> int:
+        """Rough resident size: postings entries plus per-document bookkeeping."""
+        entries = sum(len(docs) for docs in self.postings.values())
+        return entries * 64 + len(self.postings) * 100 + len(self.doc_ids) * 100
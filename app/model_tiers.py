@@ -0,0 +1,221 @@
+"""
+Per-call model tiers with latency budgets.
+
+Every chat model call the engine makes has a name ("router", "tools",
+"interviewer", ...) and runs on one of three tiers of chat models: "fast",
+"standard" or "strong" (CHAT_MODEL_<TIER>). Each call name has a tier, a
+latency budget and a timeout:
+
+- a call that times out is retried once, on the next faster tier; the
+  request itself is never re-sent on its tier (neither the client pool nor
+  the SDK retries timeouts of these calls), so a call takes at most two
+  timeouts before it fails (throttled 429/5xx responses are still retried)
+- when a call's recent latency on its tier (moving average) goes over the
+  budget, it runs on the next faster tier for MODEL_DEGRADE_COOLDOWN_S, after
+  which its own tier is tried again
+
+Model calls are recorded as "llm.<call>.<tier>" spans with their token counts,
+so telemetry summaries show the latency and tokens of each tier choice.
+"""
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+from langchain_core.runnables.config import ensure_config
+from openai import APITimeoutError
+
+from app.config import MODEL_CALLS, MODEL_DEGRADE_COOLDOWN_S
+from app.providers import get_llm, model_name
+from app.telemetry import current_span
+
+TIERS = ("fast", "standard", "strong")
+
+# Call name -> (tier, latency budget ms, timeout ms); a budget of 0 never degrades
+DEFAULT_CALLS: Dict[str, Tuple[str, float, float]] = {
+    "router": ("fast", 2000, 8000),
+    "interviewer": ("standard", 6000, 20000),
+    "summary": ("fast", 4000, 15000),
+    "precompute": ("standard", 10000, 30000),
+    "scoring": ("standard", 8000, 30000),
+    "feedback": ("standard", 15000, 45000),
+    "evaluation": ("strong", 30000, 90000),
+}
+# Calls missing from the table: standard tier, no budget, no timeout
+_UNLISTED = ("standard", 0, 0)
+# Calls that run like another call unless overridden: the tool-selection call asks the
+# question itself when it needs no retrieval (most turns), so it is the interviewer
+_SAME_AS = {"tools": "interviewer"}
+
+
+def parse_calls(spec: str, defaults: Dict[str, Tuple[str, float, float]] = DEFAULT_CALLS) -> Dict[str, Tuple[str, float, float]]:
+    """
+    Apply "call=tier[:budget_ms[:timeout_ms]],..." overrides to the per-call defaults.
+
+    Raises:
+        ValueError: On an unknown tier or a malformed entry
+    """
+    calls = dict(defaults)
+    entries = [part.strip() for part in spec.split(",") if part.strip()]
+    overridden = {entry.partition("=")[0].strip() for entry in entries}
+    for entry in entries:
+        name, _, value = entry.partition("=")
+        fields = value.split(":")
+        tier, budget, timeout = calls.get(name.strip()) or calls.get(_SAME_AS.get(name.strip()), _UNLISTED)
+        if fields[0]:
+            tier = fields[0]
+        if tier not in TIERS:
+            raise ValueError(f"unknown model tier {tier!r} in MODEL_CALLS entry {entry!r}")
+        if len(fields) > 1 and fields[1]:
+            budget = float(fields[1])
+        if len(fields) > 2 and fields[2]:
+            timeout = float(fields[2])
+        calls[name.strip()] = (tier, budget, timeout)
+    for name, same_as in _SAME_AS.items():
+        if name not in overridden:
+            calls[name] = calls.get(same_as, _UNLISTED)
+    return calls
+
+
+def faster(tier: str) -> Optional[str]:
+    """The next faster tier, or None for the fastest."""
+    index = TIERS.index(tier)
+    return TIERS[index - 1] if index else None
+
+
+class ModelTiers:
+    """
+    Chooses the tier of each model call and runs it with the call's timeout.
+
+    Args:
+        calls: Call name -> (tier, latency budget ms, timeout ms)
+        cooldown_s: Time a call stays on the faster tier after going over budget
+        alpha: Weight of the newest latency in the moving average
+    """
+
+    def __init__(self, calls: Dict[str, Tuple[str, float, float]], cooldown_s: float, alpha: float = 0.3):
+        self.calls = calls
+        self.cooldown_s = cooldown_s
+        self.alpha = alpha
+        self.counts: Counter = Counter()
+        # (call, tier) -> moving average latency in seconds
+        self._latency: Dict[Tuple[str, str], float] = {}
+        # (call, tier) -> monotonic time until which the call skips the tier
+        self._degraded_until: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def tier(self, call: str) -> str:
+        """Configured tier of a call."""
+        return self.calls.get(call, _UNLISTED)[0]
+
+    def model(self, call: str) -> BaseChatModel:
+        """Model of a call's configured tier, without timeout or fallback (e.g. for offline batch work)."""
+        return get_llm(self.tier(call))
+
+    def current_tier(self, call: str) -> str:
+        """Tier the next call will run on: the configured one, or a faster one while it is over budget."""
+        tier = self.tier(call)
+        now = time.monotonic()
+        with self._lock:
+            while faster(tier) and self._degraded_until.get((call, tier), 0.0) > now:
+                tier = faster(tier)
+        return tier
+
+    def invoke(self, call: str, messages: List, build: Callable[[BaseChatModel], Runnable] = None,
+               on_chunk: Callable[[Any], None] = None) -> Any:
+        """
+        Run a model call on its current tier, retrying once on the next faster tier if it times out
+        (a second timeout is raised).
+
+        Args:
+            call: Call name, e.g. "router" or "evaluation"
+            messages: Prompt messages
+            build: Turns the tier's chat model into the runnable to invoke (bind tools,
+                structured output, tags); the model itself by default
+            on_chunk: If given, the call is streamed and every chunk passed to it
+                (a call that times out after its first chunk is not retried)
+
+        Returns:
+            The runnable's result (when streamed: the chunks added together)
+        """
+        _, budget_ms, timeout_ms = self.calls.get(call, _UNLISTED)
+        tier = self.current_tier(call)
+        retried = False
+        while True:
+            llm = get_llm(tier, timeout_ms / 1000 if timeout_ms else None)
+            runnable = build(llm) if build else llm
+            # The parent run's metadata is kept so graph streaming still sees the node
+            metadata = {**(ensure_config().get("metadata") or {}), "model_call": call, "model_tier": tier}
+            start = time.perf_counter()
+            try:
+                if on_chunk is None:
+                    result = runnable.invoke(messages, config={"metadata": metadata})
+                else:
+                    result = None
+                    for chunk in runnable.stream(messages, config={"metadata": metadata}):
+                        result = chunk if result is None else result + chunk
+                        on_chunk(chunk)
+            except (TimeoutError, APITimeoutError):
+                fallback = faster(tier)
+                with self._lock:
+                    self.counts[f"{call}.{tier}.timeouts"] += 1
+                if retried or fallback is None or (on_chunk is not None and result is not None):
+                    raise
+                print(f"Model call {call} timed out on the {tier} tier ({model_name(llm)}), retrying on {fallback}")
+                current_span().add("model_timeouts")
+                current_span().set(timed_out_tier=tier, fallback_tier=fallback)
+                self._degrade(call, tier)
+                tier = fallback
+                retried = True
+                continue
+            self._observe(call, tier, time.perf_counter() - start, budget_ms)
+            return result
+
+    def _observe(self, call: str, tier: str, latency_s: float, budget_ms: float) -> None:
+        key = (call, tier)
+        with self._lock:
+            self.counts[f"{call}.{tier}.calls"] += 1
+            previous = self._latency.get(key)
+            average = latency_s if previous is None else self.alpha * latency_s + (1 - self.alpha) * previous
+            self._latency[key] = average
+        if budget_ms and average * 1000 > budget_ms and faster(tier):
+            self._degrade(call, tier)
+
+    def _degrade(self, call: str, tier: str) -> None:
+        with self._lock:
+            self._degraded_until[(call, tier)] = time.monotonic() + self.cooldown_s
+            # The tier starts from a fresh average when it is tried again
+            self._latency.pop((call, tier), None)
+            self.counts[f"{call}.{tier}.degraded"] += 1
+
+    def stats(self) -> dict:
+        """Per call: configured and current tier, budget, timeout, moving average latency per tier and counters."""
+        with self._lock:
+            counts = dict(self.counts)
+            latency = dict(self._latency)
+        stats = {}
+        for call, (tier, budget_ms, timeout_ms) in self.calls.items():
+            stats[call] = {
+                "tier": tier,
+                "current_tier": self.current_tier(call),
+                "budget_ms": budget_ms,
+                "timeout_ms": timeout_ms,
+                "avg_latency_ms": {t: round(latency[(call, t)] * 1000, 1) for t in TIERS if (call, t) in latency},
+                **{name[len(call) + 1:]: value for name, value in counts.items() if name.startswith(f"{call}.")},
+            }
+        return stats
+
+
+@lru_cache(maxsize=None)
+def get_model_tiers() -> ModelTiers:
+    """Get the process-wide model tier selector."""
+    return ModelTiers(parse_calls(MODEL_CALLS), MODEL_DEGRADE_COOLDOWN_S)
+
+
+def invoke_model(call: str, messages: List, build: Callable[[BaseChatModel], Runnable] = None,
+                 on_chunk: Callable[[Any], None] = None) -> Any:
+    """Run a named model call on its tier (see `ModelTiers.invoke`)."""
+    return get_model_tiers().invoke(call, messages, build, on_chunk)
@@ -16,4 +16,13 @@ class DetailedEvaluation(BaseModel):
     strengths: List[str] = Field(..., description="List of candidate's strengths demonstrated in the interview")
     areas_for_improvement: List[str] = Field(..., description="List of areas where candidate could improve")
     recommendations: str = Field(..., description="Detailed recommendations for hiring decision")
-    decision: str = Field(..., description="Final decision: HIRE, NO HIRE, or HOLD")
\ No newline at end of file
+    decision: str = Field(..., description="Final decision: HIRE, NO HIRE, or HOLD")
+
+class AnswerScore(BaseModel):
+    technical_rating: int = Field(..., description="Technical skills shown in this answer, from 1-10")
+    communication_rating: int = Field(..., description="Clarity of this answer, from 1-10")
+    problem_solving_rating: int = Field(..., description="Problem solving shown in this answer, from 1-10")
+    strengths: List[str] = Field(..., description="What the answer did well (at most 2 short points)")
+    areas_for_improvement: List[str] = Field(..., description="What the answer lacked (at most 2 short points)")
+    evidence: List[str] = Field(..., description="Short verbatim quotes from the answer supporting the ratings")
+    assessment: str = Field(..., description="One-sentence assessment of the answer")
\ No newline at end of file
@@ -1,139 +1,530 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, AIMessage
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import time
+from typing import Optional
+from langchain_core.messages import SystemMessage, AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool
+from langgraph.config import get_stream_writer
 from app.state import InterviewState
 from app.prompts import (
     ROUTER_SYSTEM_PROMPT, 
     INTERVIEWER_SYSTEM_PROMPT, 
     INTERVIEWER_REACT_PROMPT,
+    INTERVIEWER_PRE_RETRIEVAL_PROMPT,
     FEEDBACK_SYSTEM_PROMPT, 
-    EVALUATION_SYSTEM_PROMPT
+    EVALUATION_SYSTEM_PROMPT,
+    SUMMARY_SYSTEM_PROMPT,
+    SEED_QUESTIONS_SUFFIX,
 )
 from app.models import FeedbackScore, DetailedEvaluation
-from app.rag_utils import create_retrieval_tool
+from app.rag_utils import (
+    create_retrieval_tool,
+    create_resume_retrieval_tool,
+    get_retriever_registry,
+    create_unified_retrieval_tool,
+    get_session_retrieval_cache,
+    get_unified_index_id,
+)
+from app.streaming import FINISHED_SENTINEL, STREAM_TAG, PartialStructuredOutput, wants_code_input
+from app.model_tiers import invoke_model
+from app.transcript_store import get_transcript_store
+from app.telemetry import current_span, record, traced
+from app.config import (
+    RETRIEVAL_MODE,
+    TOOL_WORKERS,
+    COMPACTION_TOKEN_BUDGET,
+    COMPACTION_KEEP_TURNS,
+    UNIFIED_RETRIEVAL,
+    JD_PRECOMPUTE_ENABLED,
+    PREFETCH_ENABLED,
+    EVALUATION_MODE,
+)
+from app.answer_scoring import aggregate, candidate_answers, get_answer_scorer
+from app.jd_precompute import get_jd_precomputer
+from app.prefetch import get_prefetcher, prefetch_key
+from app.compaction import (
+    compacted_messages,
+    count_message_tokens,
+    format_for_summary,
+    is_pinned,
+    recent_turns_start,
+)
 from dotenv import load_dotenv
-import streamlit as st
 
 load_dotenv()
 
-@st.cache_resource
-def get_llm():
-    """Get cached LLM instance to avoid re-initialization on every rerun."""
-    return ChatOpenAI(model="gpt-5-nano", temperature=0.7)
+def streamed(llm):
+    """Tag a chat model's calls so their tokens are streamed to the candidate (see app.streaming)."""
+    return llm.with_config(tags=[STREAM_TAG])
+
+# Shared pool for retrieval tool calls
+_tool_executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="tools")
+
+MAX_QUESTIONS = 5
 
-# Get cached LLM
-llm = get_llm()
 
+def _session_id(config: RunnableConfig):
+    """The graph thread ID, which identifies the interview session."""
+    return (config or {}).get("configurable", {}).get("thread_id")
+
+
+@traced("node.main_agent")
 def main_agent_router(state: InterviewState):
     # If we already have a role, don't re-route or reset
     if state.get("interview_role"):
         return {"interview_role": state["interview_role"]}
         
+    if JD_PRECOMPUTE_ENABLED:
+        # Role, digest and seed questions depend only on the JD; usually precomputed in the background
+        precomputed = get_jd_precomputer().get(state.get("job_description", ""), state.get("jd_index_id"))
+        return {
+            "interview_role": precomputed["role"],
+            "jd_digest": precomputed["digest"],
+            "seed_questions": precomputed["seed_questions"],
+            "num_questions_asked": 0,
+            "interview_status": "active",
+        }
     messages = [SystemMessage(content=ROUTER_SYSTEM_PROMPT)] + state['messages']
-    response = llm.invoke(messages)
+    response = invoke_model("router", messages)
     return {"interview_role": response.content, "num_questions_asked": 0, "interview_status": "active"}
 
-def interviewer_agent(state: InterviewState):
+@traced("node.answer_scoring")
+def answer_scoring_agent(state: InterviewState, config: RunnableConfig):
+    """
+    Start scoring newly submitted answers in the background (EVALUATION_MODE "incremental")
+    and store the scores that have finished since the last turn.
+    """
+    if EVALUATION_MODE != "incremental":
+        return {}
+    scores = dict(state.get("answer_scores") or {})
+    pending = [a for a in candidate_answers(state['messages']) if a[0] not in scores]
+    if not pending:
+        return {}
+    scorer = get_answer_scorer()
+    session_id = _session_id(config)
+    scorer.submit(session_id, state['interview_role'], pending)
+    finished = {key: score for key, score in scorer.finished(session_id).items() if key not in scores}
+    current_span().set(started=len(pending) - len(finished), stored=len(finished))
+    return {"answer_scores": {**scores, **finished}} if finished else {}
+
+
+def prompt_transcript(state: InterviewState):
+    """Transcript to send to the model: rolling summary + pinned code submissions + recent turns."""
+    return compacted_messages(state['messages'], state.get("conversation_summary"), state.get("summary_cursor") or 0)
+
+
+def _summary_request(summary, aged):
+    """Summarizer call folding the newly aged messages into the rolling summary."""
+    return [
+        SystemMessage(content=SUMMARY_SYSTEM_PROMPT),
+        HumanMessage(content=(
+            f"Current summary:\n{summary or '(none)'}\n\n"
+            f"New transcript excerpt:\n{format_for_summary(aged)}"
+        )),
+    ]
+
+
+def _summary_key(summary, aged) -> str:
+    return prefetch_key("summary", summary, format_for_summary(aged))
+
+
+@traced("node.compaction_agent")
+def compaction_agent(state: InterviewState, config: RunnableConfig):
+    """
+    Keep the prompt transcript under COMPACTION_TOKEN_BUDGET.
+    Older turns are folded into a rolling summary (only the newly aged turns are
+    sent to the summarizer); the last COMPACTION_KEEP_TURNS turns and code
+    submissions stay verbatim. The full transcript remains in state.
+    The summary may already have been computed while the candidate was answering.
+    """
+    messages = state['messages']
+    summary = state.get("conversation_summary")
+    cursor = state.get("summary_cursor") or 0
+    tokens_before = count_message_tokens(messages)
+    tokens_after = count_message_tokens(compacted_messages(messages, summary, cursor))
+    update = {}
+
+    boundary = recent_turns_start(messages, COMPACTION_KEEP_TURNS)
+    if tokens_after > COMPACTION_TOKEN_BUDGET and boundary > cursor:
+        aged = [m for m in messages[cursor:boundary] if not is_pinned(m)]
+        prefetched = get_prefetcher().take(_session_id(config), "summary", _summary_key(summary, aged))
+        if prefetched is not None:
+            current_span().set(prefetched=True)
+            summary = prefetched
+        else:
+            summary = invoke_model("summary", _summary_request(summary, aged)).content
+        cursor = boundary
+        tokens_after = count_message_tokens(compacted_messages(messages, summary, cursor))
+        update = {"conversation_summary": summary, "summary_cursor": cursor}
+
+    update["compaction_stats"] = {"tokens_before": tokens_before, "tokens_after": tokens_after}
+    return update
+
+
+def _run_tool_calls(tools, tool_calls):
+    """
+    Execute the model's tool calls concurrently.
+    Each call is an embedding request plus a FAISS search, so running them in
+    parallel makes a multi-tool turn cost roughly one retrieval.
+
+    Returns:
+        Retrieved context strings, in the order the calls were made
+    """
+    tools_by_name = {t.name: t for t in tools}
+    calls = [
+        (tools_by_name[call['name']], call['args'])
+        for call in tool_calls
+        if call['name'] in tools_by_name
+    ]
+    # Each call runs in a copy of the caller's context so its spans keep their parent and session
+    futures = [
+        _tool_executor.submit(contextvars.copy_context().run, _call_tool, tool, args)
+        for tool, args in calls
+    ]
+    return [future.result() for future in futures]
+
+
+def _call_tool(tool, args: dict) -> str:
+    """Call a retrieval tool's function with the model's arguments."""
+    if isinstance(tool, StructuredTool):
+        return tool.func(**{k: v for k, v in args.items() if k in tool.args})
+    return tool.func(args.get('query', ''))
+
+
+def _with_seed_questions(system_prompt: str, state: InterviewState) -> str:
+    """Add the JD's precomputed question ideas to the prompt of the opening question."""
+    if state.get("num_questions_asked", 0) or not state.get("seed_questions"):
+        return system_prompt
+    questions = "\n".join(f"- {q}" for q in state["seed_questions"])
+    return system_prompt + SEED_QUESTIONS_SUFFIX.format(questions=questions)
+
+
+def _interview_tools(state: InterviewState, session_id: Optional[str], cache) -> list:
+    """
+    Retrieval tools for the documents uploaded for this interview (none without uploads).
+    The session pins the indexes it uses until the interview ends, so they are not
+    evicted mid-interview.
+
+    Raises:
+        LookupError: If an uploaded document's index is no longer available
+    """
+    # State only holds IDs of the shared indexes
+    registry = get_retriever_registry()
+    registry.pin(session_id, (state.get("jd_index_id"), state.get("resume_index_id")))
+    jd_retriever = registry.get(state.get("jd_index_id"))
+    resume_retriever = registry.get(state.get("resume_index_id"))
+    for label, index_id, retriever in (
+        ("job description", state.get("jd_index_id"), jd_retriever),
+        ("resume", state.get("resume_index_id"), resume_retriever),
+    ):
+        if index_id and retriever is None:
+            # Interviewing without it would silently drop retrieval for the rest of the interview
+            raise LookupError(f"The index of the uploaded {label} ({index_id[:12]}) is no longer available; upload it again")
+
+    tools = []
+    unified_index_id = None
+    if UNIFIED_RETRIEVAL and jd_retriever and resume_retriever:
+        unified_index_id = get_unified_index_id({"jd": state["jd_index_id"], "resume": state["resume_index_id"]})
+        registry.pin(session_id, (unified_index_id,))
+    if unified_index_id:
+        # One cross-document tool: a single embedding and search per query
+        tools.append(create_unified_retrieval_tool(
+            registry.get(unified_index_id), registry.get_lexical(unified_index_id), cache, unified_index_id
+        ))
+    elif jd_retriever:
+        jd_index_id = state.get("jd_index_id")
+        tools.append(create_retrieval_tool(jd_retriever, registry.get_lexical(jd_index_id), cache, jd_index_id))
+    if resume_retriever and not unified_index_id:
+        resume_index_id = state.get("resume_index_id")
+        tools.append(create_resume_retrieval_tool(
+            resume_retriever, registry.get_lexical(resume_index_id), cache, resume_index_id
+        ))
+    return tools
+
+
+def _context_key(state: InterviewState, question: str, tools) -> str:
+    return prefetch_key("contexts", question, state.get("jd_index_id"), state.get("resume_index_id"),
+                        *(t.name for t in tools))
+
+
+def _last_question(state: InterviewState) -> str:
+    """Text of the interviewer's most recent question, the one the candidate is answering."""
+    for message in reversed(state['messages']):
+        if isinstance(message, AIMessage):
+            return message.content
+    return ""
+
+
+def _start_prefetch(session_id, state: InterviewState, question: AIMessage, tools) -> None:
+    """
+    Start the parts of the next turn that don't depend on the candidate's answer (see app.prefetch):
+    retrieval for the question just asked, and the rolling summary compaction will need
+    once the answer is in. Results are used by the next turn only if their inputs still match.
+    """
+    if not PREFETCH_ENABLED or not session_id:
+        return
+    tasks = {}
+    messages = state['messages'] + [question]
+    if tools and RETRIEVAL_MODE == "tools" and state["num_questions_asked"] + 1 < MAX_QUESTIONS:
+        calls = [{'name': t.name, 'args': {'query': question.content}} for t in tools]
+        tasks["contexts"] = (_context_key(state, question.content, tools), lambda: _run_tool_calls(tools, calls))
+
+    # Compaction once the answer is appended; the answer's length is estimated from the earlier ones
+    summary = state.get("conversation_summary")
+    cursor = state.get("summary_cursor") or 0
+    answers = [m for m in messages if isinstance(m, HumanMessage)]
+    expected_tokens = count_message_tokens(answers) // len(answers) if answers else 0
+    boundary = recent_turns_start(messages + [HumanMessage(content="")], COMPACTION_KEEP_TURNS)
+    tokens = count_message_tokens(compacted_messages(messages, summary, cursor)) + expected_tokens
+    if tokens > COMPACTION_TOKEN_BUDGET and boundary > cursor:
+        aged = [m for m in messages[cursor:boundary] if not is_pinned(m)]
+        tasks["summary"] = (
+            _summary_key(summary, aged),
+            lambda: invoke_model("summary", _summary_request(summary, aged)).content,
+        )
+    if tasks:
+        get_prefetcher().start(session_id, tasks)
+
+
+def _latest_candidate_answer(state: InterviewState) -> str:
+    """Text of the most recent human message, used as the pre-retrieval query."""
+    for message in reversed(state['messages']):
+        if isinstance(message, HumanMessage):
+            return message.content
+    return ""
+
+
+def _answered(state: InterviewState):
+    """Text of the candidate answer the current turn responds to (None before the first question)."""
+    messages = state['messages']
+    if len(messages) > 1 and isinstance(messages[-1], HumanMessage) and isinstance(messages[-2], AIMessage):
+        return messages[-1].content
+    return None
+
+
+def _record_evaluation(config: RunnableConfig, state: InterviewState, evaluation: dict) -> dict:
+    """Queue the final evaluation for the transcript store and pass it through."""
+    store = get_transcript_store()
+    if store is not None:
+        store.record_evaluation(_session_id(config), state, evaluation)
+    return evaluation
+
+
+@traced("node.interviewer_agent")
+def interviewer_agent(state: InterviewState, config: RunnableConfig):
     """
     Interviewer agent that can use both JD and resume RAG tools.
-    Uses function calling to decide when to retrieve context from either source.
+    Uses function calling to decide when to retrieve context from either source,
+    or, in "pre" retrieval mode, retrieves from both up front and answers in a single call.
     Falls back to simple LLM if no retrievers available.
+    Retrieval results are cached per session (the graph thread). Context prefetched for
+    the question being answered is added to the prompt, which usually saves the tool round trip.
+    The turn, its retrieval context and timings are queued for the transcript store.
     """
-    if state.get("num_questions_asked", 0) >= 5:
+    if state.get("num_questions_asked", 0) >= MAX_QUESTIONS:
+        store = get_transcript_store()
+        if store is not None:
+            # The closing turn: records the last answer
+            store.record_turn(_session_id(config), state, MAX_QUESTIONS + 1, _answered(state), None, [], None)
         return {"interview_status": "finished"}
 
-    # Check for retrievers
-    jd_retriever = state.get("retriever")
-    resume_retriever = state.get("resume_retriever")
-    
-    # Build list of available tools
-    tools = []
-    if jd_retriever:
-        from app.rag_utils import create_retrieval_tool
-        tools.append(create_retrieval_tool(jd_retriever))
-    if resume_retriever:
-        from app.rag_utils import create_resume_retrieval_tool
-        tools.append(create_resume_retrieval_tool(resume_retriever))
-    
-    if tools:
-        # Use LLM with tool calling for RAG
-        llm_with_tools = llm.bind_tools(tools)
-        
+    turn_start = time.perf_counter()
+    transcript = prompt_transcript(state)
+    timings = {
+        "mode": RETRIEVAL_MODE,
+        "llm_calls": 0,
+        "llm_s": 0.0,
+        "retrieval_s": 0.0,
+        "tool_calls": 0,
+        "prompt_tokens": count_message_tokens(transcript),
+        "prompt_tokens_uncompacted": count_message_tokens(state['messages']),
+    }
+
+    def timed_invoke(call, messages, build=streamed):
+        start = time.perf_counter()
+        result = invoke_model(call, messages, build)
+        timings["llm_s"] += time.perf_counter() - start
+        timings["llm_calls"] += 1
+        return result
+
+    # Retrieval results in the prompt, recorded with the turn
+    contexts = []
+
+    def timed_tools(tools, tool_calls):
+        start = time.perf_counter()
+        result = _run_tool_calls(tools, tool_calls)
+        timings["retrieval_s"] += time.perf_counter() - start
+        timings["tool_calls"] += len(tool_calls)
+        contexts.extend(result)
+        return result
+
+    session_id = _session_id(config)
+    tools = _interview_tools(state, session_id, get_session_retrieval_cache(session_id))
+
+    if tools and RETRIEVAL_MODE == "pre":
+        # Retrieve from every source in parallel using the candidate's latest answer,
+        # then generate the question in one LLM call (no tool-selection round trip)
+        query = _latest_candidate_answer(state) or state['interview_role']
+        contexts = timed_tools(tools, [{'name': t.name, 'args': {'query': query}} for t in tools])
+        system_prompt = INTERVIEWER_PRE_RETRIEVAL_PROMPT.format(
+            role=state['interview_role'],
+            candidate=state['candidate_details'],
+            context="\n\n".join(contexts)
+        )
+        messages = [SystemMessage(content=_with_seed_questions(system_prompt, state))] + transcript
+        response = timed_invoke("interviewer", messages)
+        response_content = response.content
+    elif tools:
+        # Use LLM with tool calling for RAG (a question asked without tools is streamed as is)
+        def with_tools(llm):
+            return streamed(llm.bind_tools(tools))
+
         # Create system prompt
         system_prompt = INTERVIEWER_REACT_PROMPT.format(
             role=state['interview_role'],
             candidate=state['candidate_details']
         )
         
-        messages = [SystemMessage(content=system_prompt)] + state['messages']
+        messages = [SystemMessage(content=_with_seed_questions(system_prompt, state))] + transcript
+        question = _last_question(state)
+        prefetched = get_prefetcher().take(session_id, "contexts", _context_key(state, question, tools))
+        if prefetched:
+            # Retrieved for the question while the candidate was answering
+            messages += [AIMessage(content=f"Retrieved context: {context}") for context in prefetched]
+            contexts.extend(prefetched)
+            timings["prefetched_contexts"] = len(prefetched)
         
         try:
             # First call - LLM decides if it needs to use tools
-            response = llm_with_tools.invoke(messages)
+            response = timed_invoke("tools", messages, with_tools)
             
             # Check if LLM wants to use tools
             if response.tool_calls:
-                # Execute tool calls and collect context
-                for tool_call in response.tool_calls:
-                    tool_name = tool_call['name']
-                    # Find the matching tool
-                    matching_tool = next((t for t in tools if t.name == tool_name), None)
-                    if matching_tool:
-                        query = tool_call['args'].get('query', '')
-                        context = matching_tool.func(query)
-                        # Add context to messages
-                        messages.append(AIMessage(content=f"Retrieved context: {context}"))
+                # Execute tool calls concurrently and add the context to messages
+                for context in timed_tools(tools, response.tool_calls):
+                    messages.append(AIMessage(content=f"Retrieved context: {context}"))
                 
                 # Generate final response with context
-                response = llm.invoke(messages)
+                response = timed_invoke("interviewer", messages)
             
             response_content = response.content
         except Exception as e:
             # Fallback to simple LLM if tool calling fails
             print(f"Tool calling error: {e}, falling back to simple LLM")
+            current_span().add("retries")
             system_prompt = INTERVIEWER_SYSTEM_PROMPT.format(
                 role=state['interview_role'],
-                jd=state['job_description'],
+                jd=state.get('jd_digest') or state['job_description'],
                 candidate=state['candidate_details']
             )
-            messages = [SystemMessage(content=system_prompt)] + state['messages']
-            response = llm.invoke(messages)
+            messages = [SystemMessage(content=_with_seed_questions(system_prompt, state))] + transcript
+            response = timed_invoke("interviewer", messages)
             response_content = response.content
     else:
         # No PDFs uploaded, use simple LLM
+        timings["mode"] = "none"
         system_prompt = INTERVIEWER_SYSTEM_PROMPT.format(
             role=state['interview_role'],
-            jd=state['job_description'],
+            jd=state.get('jd_digest') or state['job_description'],
             candidate=state['candidate_details']
         )
-        messages = [SystemMessage(content=system_prompt)] + state['messages']
-        response = llm.invoke(messages)
+        messages = [SystemMessage(content=_with_seed_questions(system_prompt, state))] + transcript
+        response = timed_invoke("interviewer", messages)
         response_content = response.content
-    
-    if "INTERVIEW_FINISHED" in response_content:
-        return {"interview_status": "finished"}
+
+    timings["total_s"] = time.perf_counter() - turn_start
+    finished = FINISHED_SENTINEL in response_content
+    store = get_transcript_store()
+    if store is not None:
+        # Only queued here; the store's writer thread commits it
+        store.record_turn(
+            session_id, state, state.get("num_questions_asked", 0) + 1, _answered(state),
+            None if finished else response_content, contexts, timings,
+        )
+
+    if finished:
+        return {"interview_status": "finished", "turn_timings": timings}
         
-    ask_for_code = "write code" in response_content.lower() or "code snippet" in response_content.lower()
+    ask_for_code = wants_code_input(response_content)
 
     # Create AIMessage for response
     response_message = AIMessage(content=response_content)
+    _start_prefetch(session_id, state, response_message, tools)
 
     # Increment the question count since we just asked a question
     return {
         "messages": [response_message], 
         "num_questions_asked": state["num_questions_asked"] + 1,
-        "req_code_input": ask_for_code
+        "req_code_input": ask_for_code,
+        "turn_timings": timings
     }
 
 
+@traced("node.feedback_agent")
 def feedback_agent(state: InterviewState):
-    structured_llm = llm.with_structured_output(FeedbackScore)
     messages = [SystemMessage(content=FEEDBACK_SYSTEM_PROMPT)] + state['messages']
-    report = structured_llm.invoke(messages)
+    report = invoke_model("feedback", messages, lambda llm: llm.with_structured_output(FeedbackScore))
     return {"feedback_report": report.dict(), "interview_status": "completed"}
 
-def evaluation_agent(state: InterviewState):
-    """Generate detailed evaluation with ratings and recommendations"""
-    structured_llm = llm.with_structured_output(DetailedEvaluation)
-    messages = [SystemMessage(content=EVALUATION_SYSTEM_PROMPT)] + state['messages']
-    evaluation = structured_llm.invoke(messages)
-    return {"detailed_evaluation": evaluation.dict(), "interview_status": "completed"}
+def evaluation_messages(transcript):
+    """Prompt of the detailed evaluation of a (compacted) transcript; shared with `app.batch_eval`."""
+    return [SystemMessage(content=EVALUATION_SYSTEM_PROMPT)] + transcript
+
+
+@traced("node.evaluation_agent")
+def evaluation_agent(state: InterviewState, config: RunnableConfig):
+    """
+    Generate detailed evaluation with ratings and recommendations.
+    In "incremental" mode it aggregates the per-answer scores (waiting for any still
+    running); without answers or when scoring failed, one call evaluates the whole transcript.
+    That call is streamed: its fields are validated as they arrive and sent to the
+    client as partial results (graph "custom" stream), ratings first.
+    The time to the first rating is recorded as the "evaluation.first_rating" span.
+    The evaluation is queued for the transcript store.
+    """
+    start = time.perf_counter()
+    # Retrieval is over: the interview's indexes may be evicted again
+    get_retriever_registry().unpin(_session_id(config))
+    if EVALUATION_MODE == "incremental":
+        answers = candidate_answers(state['messages'])
+        scores = dict(state.get("answer_scores") or {})
+        missing = [a for a in answers if a[0] not in scores]
+        if missing:
+            scores.update(get_answer_scorer().wait(_session_id(config), state['interview_role'], missing))
+        if answers and all(a[0] in scores for a in answers):
+            current_span().set(incremental=True, answers=len(answers), waited_for=len(missing))
+            record("evaluation.first_rating", time.perf_counter() - start, kind="metric", incremental=True)
+            return {
+                "detailed_evaluation": _record_evaluation(config, state, aggregate([scores[a[0]] for a in answers])),
+                "answer_scores": scores,
+                "interview_status": "completed",
+            }
+        unscored = sum(1 for a in answers if a[0] not in scores)
+        current_span().set(incremental=False, answers=len(answers), unscored=unscored)
+        if answers:
+            print("Some answers could not be scored, evaluating the whole transcript")
+    writer = get_stream_writer()
+    partial = PartialStructuredOutput(DetailedEvaluation)
+    first_rating = []
+
+    def on_chunk(chunk):
+        values = partial.feed(chunk)
+        if values is None:
+            return
+        if not first_rating and any(name.endswith("_rating") for name in values):
+            first_rating.append(time.perf_counter() - start)
+            current_span().set(first_rating_s=first_rating[0])
+            record("evaluation.first_rating", first_rating[0], kind="metric", incremental=False)
+        writer({"node": "evaluation_agent", "partial": values})
+
+    message = invoke_model(
+        "evaluation",
+        evaluation_messages(prompt_transcript(state)),
+        lambda llm: llm.bind_tools([DetailedEvaluation], tool_choice="any"),
+        on_chunk,
+    )
+    if not message.tool_calls:
+        raise ValueError("the evaluation model returned no structured output")
+    evaluation = DetailedEvaluation.model_validate(message.tool_calls[0]["args"])
+    return {"detailed_evaluation": _record_evaluation(config, state, evaluation.model_dump()), "interview_status": "completed"}
@@ -0,0 +1,20 @@
+"""
+Page text extraction for the ingest pipeline's parse workers.
+
+Kept free of LangChain and app imports so spawned worker processes start quickly.
+"""
+import io
+from typing import List
+
+from pypdf import PdfReader
+
+
+def ready() -> bool:
+    """No-op task used to start worker processes ahead of time."""
+    return True
+
+
+def extract_pages(pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop)."""
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
@@ -0,0 +1,131 @@
+"""
+Speculative prefetch of the next interviewer turn.
+
+The interviewer only starts working once the candidate's answer arrives, but
+some of that work does not depend on the answer: retrieval for the topic of the
+question just asked (follow-ups are usually about the same topic) and the
+rolling summary the compaction step will need once the answer is appended.
+When a question has been asked, those tasks start in the background while the
+candidate is typing or recording. Each result is stored per session under a
+key derived from its inputs; the next turn takes the results whose key matches
+its own state and the rest are discarded.
+"""
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app import telemetry
+from app.config import PREFETCH_SESSIONS, PREFETCH_WORKERS
+
+# A task: (key of the inputs it was computed from, function computing it)
+Task = Tuple[str, Callable[[], Any]]
+
+
+def prefetch_key(*parts: Optional[str]) -> str:
+    """Key of a prefetched result: hash of the inputs it depends on."""
+    return hashlib.sha256("\0".join(p or "" for p in parts).encode("utf-8")).hexdigest()
+
+
+class SessionPrefetches:
+    """
+    Prefetched results per session, least recently used sessions dropped beyond `max_sessions`.
+
+    Args:
+        max_sessions: Sessions whose prefetches are kept
+        max_workers: Prefetch tasks running at the same time (all sessions)
+    """
+
+    def __init__(self, max_sessions: int, max_workers: int):
+        self.max_sessions = max_sessions
+        self.counts: Counter = Counter()
+        # session ID -> {task name: (key, future)}
+        self._sessions: "OrderedDict[str, Dict[str, Tuple[str, Future]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+
+    def start(self, session_id: str, tasks: Dict[str, Task]) -> None:
+        """
+        Start a session's prefetch tasks in the background, replacing the results of its previous turn.
+
+        Args:
+            session_id: Session (graph thread) ID
+            tasks: {name: (key, function)}
+        """
+        futures = {
+            name: (key, self._executor.submit(self._run, session_id, name, func))
+            for name, (key, func) in tasks.items()
+        }
+        with self._lock:
+            previous = self._sessions.pop(session_id, None)
+            self._sessions[session_id] = futures
+            self.counts.update(f"{name}.started" for name in tasks)
+            while len(self._sessions) > self.max_sessions:
+                _, evicted = self._sessions.popitem(last=False)
+                self._discard(evicted)
+            if previous:
+                self._discard(previous)
+
+    @staticmethod
+    def _run(session_id: str, name: str, func: Callable[[], Any]) -> Any:
+        with telemetry.session(session_id), telemetry.span(f"prefetch.{name}", kind="prefetch"):
+            return func()
+
+    def take(self, session_id: Optional[str], name: str, key: str) -> Optional[Any]:
+        """
+        Take a prefetched result, waiting for it if it is still running.
+
+        Args:
+            session_id: Session (graph thread) ID
+            name: Task name
+            key: Key of the inputs the caller would compute the result from
+
+        Returns:
+            The result, or None if nothing was prefetched for these inputs (or the task failed)
+        """
+        with self._lock:
+            tasks = self._sessions.get(session_id)
+            entry = tasks.pop(name, None) if tasks else None
+            if entry is None:
+                return None
+            if entry[0] != key:
+                self._discard({name: entry})
+                return None
+        try:
+            result = entry[1].result()
+        except Exception as e:
+            print(f"Prefetch {name} failed: {e}")
+            telemetry.current_span().add("prefetch_failures")
+            telemetry.current_span().set(prefetch_error=f"{name}: {type(e).__name__}")
+            with self._lock:
+                self.counts[f"{name}.failed"] += 1
+            return None
+        with self._lock:
+            self.counts[f"{name}.used"] += 1
+        return result
+
+    def drop(self, session_id: str) -> None:
+        """Discard a session's prefetched results (e.g. when the session is deleted)."""
+        with self._lock:
+            tasks = self._sessions.pop(session_id, None)
+            if tasks:
+                self._discard(tasks)
+
+    def _discard(self, tasks: Dict[str, Tuple[str, Future]]) -> None:
+        for name, (_, future) in tasks.items():
+            future.cancel()
+            self.counts[f"{name}.discarded"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counts)
+            stats["sessions"] = len(self._sessions)
+        return stats
+
+
+@lru_cache(maxsize=None)
+def get_prefetcher() -> SessionPrefetches:
+    """Get the process-wide per-session prefetch store."""
+    return SessionPrefetches(PREFETCH_SESSIONS, PREFETCH_WORKERS)
@@ -0,0 +1,176 @@
+"""
+Shared model clients.
+
+Nodes and the ingest path get their chat model and embeddings client from here,
+so benchmarks and tests can swap in local stand-ins with `use_providers`
+without touching the graph.
+"""
+from functools import lru_cache
+from typing import Dict, Optional
+
+import httpx
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from app.client_pool import AIMDLimiter, ClientPool, PooledTransport
+from app.config import (
+    AUDIO_RPM,
+    CHAT_MODEL_FAST,
+    CHAT_MODEL_STANDARD,
+    CHAT_MODEL_STRONG,
+    CHAT_RPM,
+    CHAT_TEMPERATURE,
+    CHAT_TPM,
+    CLIENT_POOL_ENABLED,
+    EMBEDDING_MODEL,
+    EMBEDDING_RPM,
+    EMBEDDING_TPM,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    POOL_BACKOFF_BASE_S,
+    POOL_BACKOFF_MAX_S,
+    POOL_INITIAL_CONCURRENCY,
+    POOL_MAX_CONCURRENCY,
+    POOL_MAX_RETRIES,
+)
+from app.telemetry import TelemetryCallbackHandler
+
+_overrides = {}
+# Copies of override chat models with a request timeout, by (model, timeout)
+_timeout_copies: Dict[tuple, BaseChatModel] = {}
+
+CHAT_MODELS = {"fast": CHAT_MODEL_FAST, "standard": CHAT_MODEL_STANDARD, "strong": CHAT_MODEL_STRONG}
+
+
+def use_providers(chat_model: BaseChatModel = None, embeddings: Embeddings = None,
+                  tier_models: Dict[str, BaseChatModel] = None) -> None:
+    """
+    Replace the process-wide chat model and/or embeddings client.
+
+    Args:
+        chat_model: Chat model used by every graph node
+        embeddings: Embeddings client wrapped by the embedding cache
+        tier_models: Chat models of individual tiers ("fast", "standard", "strong"), taking precedence over `chat_model`
+    """
+    if chat_model is not None:
+        _overrides["chat_model"] = chat_model
+    if embeddings is not None:
+        _overrides["embeddings"] = embeddings
+    if tier_models:
+        _overrides.setdefault("tier_models", {}).update(tier_models)
+    _timeout_copies.clear()
+
+
+def reset_providers() -> None:
+    """Go back to the default OpenAI clients."""
+    _overrides.clear()
+    _timeout_copies.clear()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE)
+
+
+@lru_cache(maxsize=None)
+def get_transport() -> Optional[PooledTransport]:
+    """
+    The process-wide rate-limit-aware transport (see app/client_pool.py),
+    or None when CLIENT_POOL_ENABLED is off.
+    """
+    if not CLIENT_POOL_ENABLED:
+        return None
+
+    def limiter():
+        return AIMDLimiter(POOL_INITIAL_CONCURRENCY, 1, POOL_MAX_CONCURRENCY)
+
+    pools = {
+        "chat": ClientPool("chat", CHAT_RPM, CHAT_TPM, limiter()),
+        "embeddings": ClientPool("embeddings", EMBEDDING_RPM, EMBEDDING_TPM, limiter()),
+        "audio": ClientPool("audio", AUDIO_RPM, None, limiter()),
+    }
+    return PooledTransport(pools, _limits(), POOL_MAX_RETRIES, POOL_BACKOFF_BASE_S, POOL_BACKOFF_MAX_S)
+
+
+@lru_cache(maxsize=None)
+def http_client() -> httpx.Client:
+    """Keep-alive connection pool shared by every OpenAI client in the process (chat, embeddings, audio)."""
+    transport = get_transport()
+    if transport is None:
+        return httpx.Client(limits=_limits(), timeout=httpx.Timeout(60.0, connect=10.0))
+    return httpx.Client(transport=transport, timeout=httpx.Timeout(60.0, connect=10.0))
+
+
+@lru_cache(maxsize=None)
+def http_async_client() -> httpx.AsyncClient:
+    """Async counterpart of `http_client`, used by `ainvoke`/`astream` calls."""
+    transport = get_transport()
+    if transport is None:
+        return httpx.AsyncClient(limits=_limits(), timeout=httpx.Timeout(60.0, connect=10.0))
+    return httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(60.0, connect=10.0))
+
+
+def _max_retries() -> int:
+    # The pool retries with its own backoff; SDK-level retries would double up
+    return 0 if CLIENT_POOL_ENABLED else 2
+
+
+@lru_cache(maxsize=None)
+def _default_llm(model: str = CHAT_MODEL_STANDARD, timeout: Optional[float] = None) -> ChatOpenAI:
+    return ChatOpenAI(
+        model=model,
+        temperature=CHAT_TEMPERATURE,
+        timeout=timeout,
+        stream_usage=True,
+        callbacks=[TelemetryCallbackHandler()],
+        http_client=http_client(),
+        http_async_client=http_async_client(),
+        # With a timeout the tier fallback handles timeouts (app/model_tiers.py); an SDK retry would double it
+        max_retries=0 if timeout else _max_retries(),
+    )
+
+
+@lru_cache(maxsize=None)
+def _default_embeddings() -> OpenAIEmbeddings:
+    return OpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        http_client=http_client(),
+        http_async_client=http_async_client(),
+        max_retries=_max_retries(),
+    )
+
+
+def get_llm(tier: str = "standard", timeout: Optional[float] = None) -> BaseChatModel:
+    """
+    Get the shared chat model of a tier.
+
+    Args:
+        tier: "fast", "standard" or "strong" (see app/model_tiers.py)
+        timeout: Request timeout in seconds (None: the HTTP client's default)
+    """
+    override = (_overrides.get("tier_models") or {}).get(tier) or _overrides.get("chat_model")
+    if override is None:
+        return _default_llm(CHAT_MODELS[tier], timeout)
+    if timeout is None or "request_timeout" not in type(override).model_fields:
+        return override
+    key = (id(override), timeout)
+    if key not in _timeout_copies:
+        _timeout_copies[key] = override.model_copy(update={"request_timeout": timeout})
+    return _timeout_copies[key]
+
+
+def model_name(llm: BaseChatModel) -> str:
+    """Model name of a chat model, for cache keys and metrics."""
+    return getattr(llm, "model_name", None) or type(llm).__name__
+
+
+def get_base_embeddings() -> Embeddings:
+    """Get the shared embeddings client."""
+    return _overrides.get("embeddings") or _default_embeddings()
+
+
+@lru_cache(maxsize=None)
+def get_openai_client():
+    """Raw OpenAI client for audio (TTS/STT), sharing the pooled transport."""
+    from openai import OpenAI
+    return OpenAI(http_client=http_client(), max_retries=_max_retries())
@@ -1,79 +1,326 @@
 """
 RAG Utilities for PDF-based Job Description Retrieval
 """
-from typing import Optional
-from langchain_community.document_loaders import PyPDFLoader
+import json
+import threading
+from functools import lru_cache
+from typing import Dict, List, Literal, Optional, Tuple
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
-from langchain_core.tools import Tool
+from langchain_core.tools import StructuredTool, Tool
 from langchain_core.documents import Document
-import tempfile
-import os
-import streamlit as st
+from app.config import (
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    EMBEDDING_MODEL,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_BATCH_SIZE,
+    HYBRID_CANDIDATES,
+    HYBRID_RETRIEVAL,
+    LEXICAL_FAST_PATH_MAX_TERMS,
+    RRF_K,
+    RETRIEVAL_CACHE_ENABLED,
+    RETRIEVAL_CACHE_SESSIONS,
+    RETRIEVAL_CACHE_SIZE,
+    RETRIEVAL_CACHE_SIMILARITY,
+    INDEX_STORE_DIR,
+    INDEX_STORE_MAX_BYTES,
+    RETRIEVER_PIN_SESSIONS,
+    RETRIEVER_REGISTRY_MAX_BYTES,
+)
+from app.embedding_cache import CachedEmbeddings, EmbeddingStore
+from app.index_store import IndexStore, content_key
+from app.ingest import build_index, build_unified_index, update_index
+from app.lexical_index import BM25Index, tokenize
+from app.retrieval_cache import RetrievalCache, SessionRetrievalCaches
+from app.providers import get_base_embeddings
+from app.retriever_registry import RetrieverRegistry
+from app.telemetry import current_span, span, traced
 
 
-@st.cache_resource(show_spinner=False)
-def process_pdf(_pdf_file) -> FAISS:
+@lru_cache(maxsize=None)
+def get_index_store() -> IndexStore:
+    """Get the process-wide persistent index store."""
+    return IndexStore(INDEX_STORE_DIR, INDEX_STORE_MAX_BYTES)
+
+
+@lru_cache(maxsize=None)
+def get_embedding_store() -> EmbeddingStore:
+    """Get the process-wide chunk embedding store."""
+    return EmbeddingStore(EMBEDDING_CACHE_DIR, EMBEDDING_MODEL)
+
+
+def get_embeddings() -> CachedEmbeddings:
     """
-    Process uploaded PDF and create FAISS vector store.
-    Cached to avoid reprocessing same PDFs.
-    Note: Parameter prefixed with _ to exclude from Streamlit's hash.
-    
+    Create the embeddings used for indexing and queries.
+    A new wrapper is returned per call so each ingest gets its own hit/miss stats,
+    while the underlying client and on-disk cache are shared.
+    """
+    return CachedEmbeddings(get_base_embeddings(), get_embedding_store(), batch_size=EMBEDDING_BATCH_SIZE)
+
+
+@lru_cache(maxsize=None)
+def get_retriever_registry() -> RetrieverRegistry:
+    """Get the process-wide registry of shared, read-only indexes."""
+    return RetrieverRegistry(get_index_store(), get_embeddings, RETRIEVER_REGISTRY_MAX_BYTES, RETRIEVER_PIN_SESSIONS)
+
+
+@lru_cache(maxsize=None)
+def get_retrieval_caches() -> SessionRetrievalCaches:
+    """Get the process-wide, per-session retrieval result caches."""
+    return SessionRetrievalCaches(RETRIEVAL_CACHE_SESSIONS, RETRIEVAL_CACHE_SIZE, RETRIEVAL_CACHE_SIMILARITY)
+
+
+def get_session_retrieval_cache(session_id: Optional[str]) -> Optional[RetrievalCache]:
+    """The retrieval cache of a session, or None if caching is disabled or there is no session."""
+    if not RETRIEVAL_CACHE_ENABLED or not session_id:
+        return None
+    return get_retrieval_caches().get(session_id)
+
+
+_unified_lock = threading.Lock()
+
+
+def get_unified_index_id(sources: Dict[str, str]) -> Optional[str]:
+    """
+    ID of the combined index over several documents, building and persisting it on first use.
+
     Args:
-        _pdf_file: Streamlit UploadedFile object
-        
+        sources: Source label ("jd", "resume") -> index ID of that document
+
     Returns:
-        FAISS vector store
+        Index ID of the combined index, or None if a source index is unavailable
     """
-    # Save uploaded file to temporary location
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-        tmp_file.write(_pdf_file.getvalue())
-        tmp_path = tmp_file.name
+    key = content_key(json.dumps(sources, sort_keys=True).encode("utf-8"), kind="unified", **_index_settings())
+    registry = get_retriever_registry()
+    if key in registry:
+        return key
+    # One build per combination even when several sessions start at once
+    with _unified_lock:
+        if registry.get(key) is not None:
+            return key
+        vectorstores = {source: registry.get(index_id) for source, index_id in sources.items()}
+        if any(vectorstore is None for vectorstore in vectorstores.values()):
+            return None
+        with span("ingest.unified", kind="ingest") as s:
+            vectorstore = build_unified_index(vectorstores, get_embeddings())
+            s.set(chunks=vectorstore.index.ntotal)
+        get_index_store().put(key, vectorstore, keep=registry.pinned())
+        registry.register(key, vectorstore)
+    return key
+
+
+def get_document_text(index_id: str, max_chars: int) -> str:
+    """
+    Text of an indexed document, rebuilt from its chunks in page order.
+
+    Args:
+        index_id: Index ID of the document
+        max_chars: Maximum length of the returned text
+
+    Returns:
+        Document text (chunk overlaps included), or "" if the index is unavailable
+    """
+    vectorstore = get_retriever_registry().get(index_id)
+    if vectorstore is None:
+        return ""
+    docs = vectorstore.docstore._dict
+    ordered = sorted(
+        (docs[doc_id] for _, doc_id in sorted(vectorstore.index_to_docstore_id.items())),
+        key=lambda doc: doc.metadata.get("page", 0),
+    )
+    text = ""
+    for doc in ordered:
+        if len(text) >= max_chars:
+            break
+        text += doc.page_content + "\n"
+    return text[:max_chars]
+
+
+def get_ingest_stats(index_id: str) -> Optional[dict]:
+    """
+    Stats for the ingest that built an index: embedding cache hits, misses and
+    saved_tokens, plus pages, chunks, first_chunk_s and total_s (and reused_chunks,
+    new_chunks and removed_chunks for an index updated from a previous version).
+    """
+    vectorstore = get_retriever_registry().get(index_id)
+    return getattr(vectorstore.embedding_function, "stats", None) if vectorstore else None
+
+
+def _index_settings() -> dict:
+    """Settings that change the index built from a document; part of the store key."""
+    return {
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "embedding_model": EMBEDDING_MODEL,
+    }
+
+
+@traced("ingest.pdf", kind="ingest")
+def process_pdf(pdf_file, base_index_id: Optional[str] = None) -> str:
+    """
+    Process uploaded PDF into a FAISS vector store and register it for retrieval.
+    Indexes are persisted in the content-addressed index store, so a PDF that was
+    already processed (by any session, before a restart) is loaded from disk
+    without parsing or embedding calls. New PDFs go through the streaming ingest
+    pipeline (app/ingest.py); a revised version of an indexed PDF is diffed
+    against the index of its previous version, so only changed chunks are embedded.
     
-    try:
-        # Load PDF
-        loader = PyPDFLoader(tmp_path)
-        documents = loader.load()
-        
-        # Split into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-        )
-        chunks = text_splitter.split_documents(documents)
-        
-        # Create embeddings and vector store
-        embeddings = OpenAIEmbeddings()
-        vectorstore = FAISS.from_documents(chunks, embeddings)
+    Args:
+        pdf_file: Uploaded file object (anything with `getvalue()` returning the PDF bytes)
+        base_index_id: Index ID of the previous version of this document, if any
         
-        return vectorstore
-    finally:
-        # Clean up temp file
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
+    Returns:
+        Index ID to keep in graph state; resolve it with `get_retriever_registry().get`
+    """
+    pdf_bytes = pdf_file.getvalue()
+    store = get_index_store()
+    registry = get_retriever_registry()
+    key = content_key(pdf_bytes, **_index_settings())
+    if registry.get(key) is not None:
+        current_span().add("cache_hits")
+        return key
+    current_span().add("cache_misses")
+    embeddings = get_embeddings()
+
+    base = registry.get(base_index_id)
+    if base is not None:
+        vectorstore, ingest_stats = update_index(pdf_bytes, embeddings, base)
+    else:
+        vectorstore, ingest_stats = build_index(pdf_bytes, embeddings)
+    # Timings are reported with the per-ingest embedding stats (see get_ingest_stats)
+    embeddings.stats.update(ingest_stats)
+    current_span().set(**ingest_stats)
+    store.put(key, vectorstore, keep=registry.pinned())
+    registry.register(key, vectorstore)
+    return key
+
+
+class HybridRetriever:
+    """
+    Retrieves chunks by fusing BM25 and vector search rankings with reciprocal
+    rank fusion. Short keyword queries whose terms all occur in the best BM25
+    match are answered from the lexical index alone, without a query embedding
+    request. With a session cache, repeated and near-duplicate queries are
+    served from it. The path taken is recorded on the current span.
+
+    Args:
+        vectorstore: FAISS vector store of the document
+        lexical: BM25 index of the same chunks (vector search only if None)
+        k: Number of chunks returned
+        cache: The session's retrieval cache, if any
+        index_id: Index ID of the document; required with `cache`
+    """
+
+    def __init__(self, vectorstore: FAISS, lexical: Optional[BM25Index] = None, k: int = 3,
+                 cache: Optional[RetrievalCache] = None, index_id: Optional[str] = None):
+        self.vectorstore = vectorstore
+        self.lexical = lexical if HYBRID_RETRIEVAL else None
+        self.k = k
+        self.cache = cache if index_id else None
+        self.index_id = index_id
+
+    def _lexical_docs(self, ranked: List[Tuple[str, float]]) -> List[Document]:
+        return [self.vectorstore.docstore.search(doc_id) for doc_id, _ in ranked]
+
+    def _from_source(self, source: str):
+        docs = self.vectorstore.docstore._dict
+        return lambda doc_id: docs[doc_id].metadata.get("source") == source
+
+    def invoke(self, query: str, source: Optional[str] = None) -> List[Document]:
+        """
+        Retrieve the `k` best chunks for a query.
+
+        Args:
+            query: Free-text query
+            source: Only consider chunks whose `source` metadata matches (unified indexes)
+
+        Returns:
+            Matching chunks, best first
+        """
+        s = current_span()
+        cache_key = f"{self.index_id}#{source}" if source else self.index_id
+        if self.cache is not None:
+            docs = self.cache.get(cache_key, query)
+            if docs is not None:
+                s.set(path="cache", cache="exact")
+                s.add("cache_hits")
+                return docs
+
+        ranked: List[Tuple[str, float]] = []
+        if self.lexical is not None:
+            with span("retrieval.lexical", kind="retrieval"):
+                ranked, coverage = self.lexical.search(
+                    query, HYBRID_CANDIDATES, self._from_source(source) if source else None
+                )
+            terms = len(set(tokenize(query)))
+            if ranked and coverage == 1.0 and terms <= LEXICAL_FAST_PATH_MAX_TERMS:
+                s.set(path="lexical", lexical_fast_path=1)
+                docs = self._lexical_docs(ranked[:self.k])
+                if self.cache is not None:
+                    s.add("cache_misses")
+                    self.cache.miss()
+                    self.cache.put(cache_key, query, None, docs)
+                return docs
+
+        vector = self.vectorstore.embedding_function.embed_query(query)
+        if self.cache is not None:
+            docs = self.cache.get_similar(cache_key, vector)
+            if docs is not None:
+                s.set(path="cache", cache="semantic")
+                s.add("cache_hits")
+                return docs
+            s.add("cache_misses")
+
+        with span("retrieval.vector", kind="retrieval"):
+            search_kwargs = {"filter": {"source": source}, "fetch_k": 4 * HYBRID_CANDIDATES} if source else {}
+            vector_docs = self.vectorstore.similarity_search_by_vector(
+                vector, k=HYBRID_CANDIDATES if ranked else self.k, **search_kwargs
+            )
+        if not ranked:
+            s.set(path="vector")
+            docs = vector_docs[:self.k]
+        else:
+            s.set(path="hybrid")
+            docs = self._fuse(vector_docs, self._lexical_docs(ranked))
+        if self.cache is not None:
+            self.cache.put(cache_key, query, vector, docs)
+        return docs
 
+    def _fuse(self, *rankings: List[Document]) -> List[Document]:
+        """Reciprocal rank fusion of several rankings of the same chunks."""
+        fused: Dict[str, float] = {}
+        docs: Dict[str, Document] = {}
+        for ranking in rankings:
+            for rank, doc in enumerate(ranking):
+                key = doc.id or doc.page_content
+                docs.setdefault(key, doc)
+                fused[key] = fused.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+        best = sorted(fused, key=fused.get, reverse=True)[:self.k]
+        return [docs[key] for key in best]
 
 
-def create_retrieval_tool(vectorstore: FAISS) -> Tool:
+def create_retrieval_tool(vectorstore: FAISS, lexical: Optional[BM25Index] = None,
+                          cache: Optional[RetrievalCache] = None, index_id: Optional[str] = None) -> Tool:
     """
     Create a LangChain tool for retrieving job description context
     
     Args:
         vectorstore: FAISS vector store containing job description
+        lexical: BM25 index of the same chunks, for hybrid retrieval
+        cache: The session's retrieval cache, if any
+        index_id: Index ID of the vector store (cache key)
         
     Returns:
         LangChain Tool for retrieval
     """
-    retriever = vectorstore.as_retriever(
-        search_type="similarity",
-        search_kwargs={"k": 3}
-    )
+    retriever = HybridRetriever(vectorstore, lexical, k=3, cache=cache, index_id=index_id)
     
     def retrieve_context(query: str) -> str:
         """Retrieve relevant context from the job description"""
-        docs = retriever.invoke(query)  # Updated to use invoke instead of get_relevant_documents
+        with span("retrieval.jd", kind="retrieval") as s:
+            docs = retriever.invoke(query)
+            s.set(docs=len(docs))
         if not docs:
             return "No relevant information found in job description."
         
@@ -95,24 +342,27 @@ def create_retrieval_tool(vectorstore: FAISS) -> Tool:
     return tool
 
 
-def create_resume_retrieval_tool(vectorstore: FAISS) -> Tool:
+def create_resume_retrieval_tool(vectorstore: FAISS, lexical: Optional[BM25Index] = None,
+                                 cache: Optional[RetrievalCache] = None, index_id: Optional[str] = None) -> Tool:
     """
     Create a LangChain tool for retrieving candidate resume/experience context
     
     Args:
         vectorstore: FAISS vector store containing candidate resume
+        lexical: BM25 index of the same chunks, for hybrid retrieval
+        cache: The session's retrieval cache, if any
+        index_id: Index ID of the vector store (cache key)
         
     Returns:
         LangChain Tool for resume retrieval
     """
-    retriever = vectorstore.as_retriever(
-        search_type="similarity",
-        search_kwargs={"k": 3}
-    )
+    retriever = HybridRetriever(vectorstore, lexical, k=3, cache=cache, index_id=index_id)
     
     def retrieve_resume_context(query: str) -> str:
         """Retrieve relevant context from the candidate's resume"""
-        docs = retriever.invoke(query)
+        with span("retrieval.resume", kind="retrieval") as s:
+            docs = retriever.invoke(query)
+            s.set(docs=len(docs))
         if not docs:
             return "No relevant information found in candidate resume."
         
@@ -135,6 +385,55 @@ def create_resume_retrieval_tool(vectorstore: FAISS) -> Tool:
 
 
 
+SOURCE_HEADINGS = {"jd": "Relevant Job Description Context", "resume": "Relevant Candidate Resume Context"}
+
+
+def create_unified_retrieval_tool(vectorstore: FAISS, lexical: Optional[BM25Index] = None,
+                                  cache: Optional[RetrievalCache] = None, index_id: Optional[str] = None) -> StructuredTool:
+    """
+    Create one tool retrieving from the job description and resume together
+    (see `get_unified_index_id`): the query is embedded and searched once, and
+    results are grouped by source.
+
+    Args:
+        vectorstore: Unified FAISS vector store with `source` metadata ("jd" / "resume")
+        lexical: BM25 index of the same chunks, for hybrid retrieval
+        cache: The session's retrieval cache, if any
+        index_id: Index ID of the vector store (cache key)
+
+    Returns:
+        LangChain tool taking a query and an optional source filter
+    """
+    retriever = HybridRetriever(vectorstore, lexical, k=4, cache=cache, index_id=index_id)
+
+    def retrieve_interview_context(query: str, source: Optional[Literal["jd", "resume"]] = None) -> str:
+        """Retrieve relevant context from the job description and/or the candidate's resume"""
+        with span("retrieval.unified", kind="retrieval") as s:
+            docs = retriever.invoke(query, source=source)
+            s.set(docs=len(docs), source=source or "all")
+        if not docs:
+            return "No relevant information found in the job description or candidate resume."
+
+        grouped: Dict[str, List[str]] = {}
+        for doc in docs:
+            grouped.setdefault(doc.metadata.get("source", "jd"), []).append(doc.page_content)
+        return "\n\n".join(
+            f"{SOURCE_HEADINGS.get(name, name)}:\n" + "\n\n".join(contents)
+            for name, contents in grouped.items()
+        )
+
+    return StructuredTool.from_function(
+        func=retrieve_interview_context,
+        name="interview_context_retrieval",
+        description=(
+            "Retrieves relevant information from the job description PDF and the candidate's "
+            "resume PDF in one call, grouped by document. Use it to look up role requirements, "
+            "the candidate's projects and experience, or to connect the two. Input is a specific "
+            "question or topic; set source to 'jd' or 'resume' to search only one document."
+        ),
+    )
+
+
 def create_simple_vectorstore(text: str) -> FAISS:
     """
     Create a simple vector store from plain text (fallback if no PDF)
@@ -147,13 +446,13 @@ def create_simple_vectorstore(text: str) -> FAISS:
     """
     # Split text into chunks
     text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
     )
     chunks = text_splitter.create_documents([text])
     
     # Create embeddings and vector store
-    embeddings = OpenAIEmbeddings()
+    embeddings = get_embeddings()
     vectorstore = FAISS.from_documents(chunks, embeddings)
     
     return vectorstore
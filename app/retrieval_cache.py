@@ -0,0 +1,169 @@
+"""
+Session-scoped cache of retrieval results.
+
+Within one interview the interviewer keeps asking near-identical retrieval
+queries ("candidate's Python experience", "Python projects on resume"). Each
+session gets its own bounded cache in front of the retrieval tools: exact hits
+on the normalized query skip retrieval entirely, and near-duplicate hits (query
+embedding within a cosine threshold of a cached query for the same index) skip
+the vector search.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.lexical_index import tokenize
+
+
+def normalize_query(query: str) -> str:
+    """Lowercased query terms without stopwords or punctuation."""
+    return " ".join(tokenize(query)) or query.strip().lower()
+
+
+class RetrievalCache:
+    """
+    LRU cache of retrieved chunks for one session.
+
+    Args:
+        max_entries: Cached queries kept for the session (all indexes together)
+        similarity: Minimum cosine similarity for a near-duplicate hit
+    """
+
+    def __init__(self, max_entries: int, similarity: float):
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+        # (index ID, normalized query) -> (unit query vector or None, docs)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, index_id: str, query: str) -> Optional[List[Document]]:
+        """Exact lookup on the normalized query; counts a hit but not a miss (see `get_similar`)."""
+        key = (index_id, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.stats["exact_hits"] += 1
+            return entry[1]
+
+    def get_similar(self, index_id: str, vector: Sequence[float]) -> Optional[List[Document]]:
+        """
+        Near-duplicate lookup by query embedding; counts a miss when nothing is close enough.
+
+        Args:
+            index_id: Index the query runs against
+            vector: Query embedding
+
+        Returns:
+            Docs of the most similar cached query above the threshold, or None
+        """
+        unit = _unit(vector)
+        with self._lock:
+            best_key, best_score = None, self.similarity
+            for key, (cached, _) in self._entries.items():
+                if key[0] != index_id or cached is None or cached.shape != unit.shape:
+                    continue
+                score = float(np.dot(cached, unit))
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.stats["semantic_hits"] += 1
+            return self._entries[best_key][1]
+
+    def miss(self) -> None:
+        """Count a miss for a query answered without an embedding (no near-duplicate lookup)."""
+        with self._lock:
+            self.stats["misses"] += 1
+
+    def put(self, index_id: str, query: str, vector: Optional[Sequence[float]], docs: List[Document]) -> None:
+        """Cache the result of a query; `vector` is None if the query was not embedded."""
+        key = (index_id, normalize_query(query))
+        with self._lock:
+            self._entries[key] = (_unit(vector) if vector is not None else None, docs)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        return _with_hit_rate(stats)
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm else array
+
+
+def _with_hit_rate(stats: dict) -> dict:
+    lookups = stats["exact_hits"] + stats["semantic_hits"] + stats["misses"]
+    stats["hit_rate"] = round((stats["exact_hits"] + stats["semantic_hits"]) / lookups, 4) if lookups else 0.0
+    return stats
+
+
+class SessionRetrievalCaches:
+    """
+    One `RetrievalCache` per session, least recently used sessions dropped beyond `max_sessions`.
+    Sessions never see each other's entries.
+    """
+
+    def __init__(self, max_sessions: int, max_entries: int, similarity: float):
+        self.max_sessions = max_sessions
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self._caches: "OrderedDict[str, RetrievalCache]" = OrderedDict()
+        self._dropped = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> RetrievalCache:
+        """Get (or create) the cache of a session."""
+        with self._lock:
+            cache = self._caches.get(session_id)
+            if cache is None:
+                cache = self._caches[session_id] = RetrievalCache(self.max_entries, self.similarity)
+                while len(self._caches) > self.max_sessions:
+                    _, evicted = self._caches.popitem(last=False)
+                    self._retire(evicted)
+            self._caches.move_to_end(session_id)
+            return cache
+
+    def drop(self, session_id: str) -> None:
+        """Forget a session's cache (e.g. when the session is deleted)."""
+        with self._lock:
+            cache = self._caches.pop(session_id, None)
+            if cache is not None:
+                self._retire(cache)
+
+    def _retire(self, cache: RetrievalCache) -> None:
+        for key, value in cache.snapshot().items():
+            if key in self._dropped:
+                self._dropped[key] += value
+
+    def session_stats(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            cache = self._caches.get(session_id)
+        return cache.snapshot() if cache else None
+
+    def stats(self) -> dict:
+        """Totals across live and dropped sessions."""
+        with self._lock:
+            caches = list(self._caches.values())
+            totals: Dict[str, int] = dict(self._dropped)
+        entries = 0
+        for cache in caches:
+            snapshot = cache.snapshot()
+            entries += snapshot["entries"]
+            for key in totals:
+                totals[key] += snapshot[key]
+        totals.update(sessions=len(caches), entries=entries)
+        return _with_hit_rate(totals)
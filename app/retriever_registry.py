@@ -0,0 +1,152 @@
+"""
+Process-wide registry of loaded FAISS indexes.
+
+Graph state only carries index IDs (the content hash used by the index store);
+the registry hands out one shared, read-only vectorstore per ID to every
+session, together with a BM25 index of its chunks for lexical retrieval. Memory use is tracked and least recently used indexes are dropped
+beyond a byte budget, to be reloaded from the index store on demand. Indexes
+pinned by a running interview are never dropped (from memory, nor from the
+index store when it evicts), so a session keeps the copy it started with.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional, Set
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from app.index_store import IndexStore
+from app.lexical_index import BM25Index
+
+
+def estimate_index_bytes(vectorstore: FAISS) -> int:
+    """Approximate resident size of a FAISS vectorstore: vectors plus docstore text."""
+    index = vectorstore.index
+    vector_bytes = index.ntotal * index.d * 4
+    docs = getattr(vectorstore.docstore, "_dict", {})
+    text_bytes = sum(len(doc.page_content) + len(str(doc.metadata)) for doc in docs.values())
+    return vector_bytes + text_bytes
+
+
+class RetrieverRegistry:
+    """
+    LRU cache of shared vectorstores under a byte budget, backed by an `IndexStore`.
+    Pinned indexes are not evicted; pins of the least recently active sessions are
+    released beyond `max_pinned_sessions` (abandoned interviews).
+    """
+
+    def __init__(self, store: IndexStore, embeddings_factory: Callable[[], Embeddings], max_bytes: int,
+                 max_pinned_sessions: int = 1024):
+        self.store = store
+        self.embeddings_factory = embeddings_factory
+        self.max_bytes = max_bytes
+        self.max_pinned_sessions = max_pinned_sessions
+        self.bytes_in_use = 0
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # index_id -> (vectorstore, lexical index, size)
+        self._pins: "OrderedDict[str, Set[str]]" = OrderedDict()  # session ID -> pinned index IDs
+        self._lock = threading.Lock()
+
+    def __contains__(self, index_id: str) -> bool:
+        with self._lock:
+            return index_id in self._entries
+
+    def register(self, index_id: str, vectorstore: FAISS) -> None:
+        """Add a freshly built or loaded index; it must already be saved in the index store."""
+        with self._lock:
+            self._add(index_id, vectorstore)
+
+    def get(self, index_id: Optional[str]) -> Optional[FAISS]:
+        """
+        Get the shared vectorstore for an index ID, loading it from disk if needed.
+
+        Args:
+            index_id: Index ID from graph state (None is allowed and returns None)
+
+        Returns:
+            FAISS vectorstore, or None if the index is unknown or was evicted from disk
+        """
+        entry = self._entry(index_id)
+        return entry[0] if entry else None
+
+    def pin(self, session_id: Optional[str], index_ids: Iterable[Optional[str]]) -> None:
+        """Keep a session's indexes loaded until `unpin` (index IDs that are None are skipped)."""
+        if not session_id:
+            return
+        with self._lock:
+            pins = self._pins.pop(session_id, set())
+            pins.update(index_id for index_id in index_ids if index_id)
+            self._pins[session_id] = pins
+            while len(self._pins) > self.max_pinned_sessions:
+                self._pins.popitem(last=False)
+
+    def unpin(self, session_id: str) -> None:
+        """Release a session's pins (e.g. when the interview ends or the session is deleted)."""
+        with self._lock:
+            self._pins.pop(session_id, None)
+
+    def pinned(self) -> Set[str]:
+        """Index IDs pinned by any session."""
+        with self._lock:
+            return self._pinned()
+
+    def _pinned(self) -> Set[str]:
+        return set().union(*self._pins.values())
+
+    def get_lexical(self, index_id: Optional[str]) -> Optional[BM25Index]:
+        """Get the BM25 index of an index ID's chunks, loading the index if needed (see `get`)."""
+        entry = self._entry(index_id)
+        return entry[1] if entry else None
+
+    def _entry(self, index_id: Optional[str]):
+        if not index_id:
+            return None
+        with self._lock:
+            entry = self._entries.get(index_id)
+            if entry is not None:
+                self._entries.move_to_end(index_id)
+                self.hits += 1
+                return entry
+            # Loading under the lock keeps concurrent sessions from loading duplicate copies
+            vectorstore = self.store.get(index_id, self.embeddings_factory())
+            if vectorstore is None:
+                return None
+            self.loads += 1
+            return self._add(index_id, vectorstore)
+
+    def _add(self, index_id: str, vectorstore: FAISS):
+        if index_id in self._entries:
+            self._entries.move_to_end(index_id)
+            return self._entries[index_id]
+        lexical = BM25Index.from_vectorstore(vectorstore)
+        size = estimate_index_bytes(vectorstore) + lexical.approx_bytes()
+        entry = (vectorstore, lexical, size)
+        self._entries[index_id] = entry
+        self.bytes_in_use += size
+        if self.bytes_in_use > self.max_bytes:
+            # Keep pinned entries and the newest entry even if they alone exceed the budget
+            pinned = self._pinned()
+            for evicted_id in list(self._entries)[:-1]:
+                if self.bytes_in_use <= self.max_bytes:
+                    break
+                if evicted_id in pinned:
+                    continue
+                _, _, evicted_size = self._entries.pop(evicted_id)
+                self.bytes_in_use -= evicted_size
+                self.evictions += 1
+        return entry
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes_in_use": self.bytes_in_use,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "pinned_sessions": len(self._pins),
+                "pinned": len(self._pinned()),
+            }
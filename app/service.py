@@ -0,0 +1,450 @@
+"""
+Headless interview service.
+
+Drives the compiled interview graph with `astream` and multiplexes every
+session over one asyncio event loop. Graph nodes run on a shared worker pool
+(SERVICE_WORKERS) with the process-wide LLM/embedding clients and their
+connection pool, so one process serves many concurrent interviews; the
+Streamlit UI is a thin client of this API.
+
+HTTP/WebSocket API:
+    GET    /healthz
+    GET    /metrics                    Prometheus text (telemetry and client pool)
+    GET    /stats                      index store, shared index, retrieval cache, JD precompute, prefetch,
+                                       answer scoring, model tiers, transcript store, client pool and session counters
+    POST   /indexes[?base=<index_id>]  PDF bytes -> {"index_id", "ingest_stats"}; `base` is the
+                                       index of the document's previous version, to reuse its chunks
+    POST   /jd/precompute              {"job_description", "jd_index_id"?} -> {"key"}; starts routing and
+                                       digesting the JD in the background
+    GET    /sessions/{id}              checkpointed interview state
+    DELETE /sessions/{id}              drop the session's checkpoints
+    POST   /sessions/{id}/turns        {"text", "code"?, "context"?} -> NDJSON event stream
+    WS     /sessions/{id}/ws           one JSON turn request per frame, events back
+    GET    /sessions/{id}/telemetry    span summary, JSONL and retrieval cache stats for the session
+    GET    /interviews                 recorded interviews, newest first; filters: candidate, jd, decision,
+                                       since, until (Unix time or ISO date), limit
+    GET    /interviews/{id}            recorded interview with its turns and evaluation
+
+Turn events are JSON objects with a "type":
+    token    {"message_id", "text"}       visible text delta of a streamed interviewer message
+    discard  {"message_id"}               the streamed message ended the interview; drop it
+    partial  {"node", "values"}           validated fields of a node's structured output so far
+                                          (the final evaluation, while it is generated)
+    update   {"node", "values"}           state update from a graph node
+    error    {"message"}
+    done     {}
+
+Run with `python -m app.service`.
+"""
+import asyncio
+import contextlib
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from app import telemetry
+from app.answer_scoring import get_answer_scorer
+from app.checkpoint import create_async_checkpointer
+from app.config import SERVICE_HOST, SERVICE_PORT, SERVICE_WORKERS, STREAM_RESPONSES
+from app.graph import build_graph
+from app.ingest import warm_parse_pool
+from app.jd_precompute import get_jd_precomputer
+from app.model_tiers import get_model_tiers
+from app.prefetch import get_prefetcher
+from app.transcript_store import get_transcript_store
+from app.providers import get_transport
+from app.rag_utils import (
+    get_index_store,
+    get_ingest_stats,
+    get_retrieval_caches,
+    get_retriever_registry,
+    process_pdf,
+)
+from app.streaming import STREAM_TAG, StreamBuffer
+
+START_MESSAGE = "Start the interview."
+# "custom" carries partial results that nodes emit with the stream writer (the streamed evaluation)
+STREAM_MODES = ["updates", "custom", "messages"] if STREAM_RESPONSES else ["updates", "custom"]
+
+
+def to_jsonable(value):
+    """Convert graph state values (messages, pydantic models, nested containers) to JSON types."""
+    if isinstance(value, BaseMessage):
+        role = {"human": "user", "ai": "assistant"}.get(value.type, value.type)
+        return {"role": role, "content": value.content}
+    if isinstance(value, dict):
+        return {k: to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return value
+
+
+class InterviewService:
+    """
+    Runs interview turns for many sessions on one event loop.
+    Turns of the same session are serialized; different sessions run concurrently.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.turns_started = 0
+        self.turns_completed = 0
+        self._active: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def _config(thread_id: str) -> dict:
+        return {"configurable": {"thread_id": thread_id}}
+
+    @contextlib.asynccontextmanager
+    async def _session_lock(self, thread_id: str):
+        lock = self._locks.setdefault(thread_id, asyncio.Lock())
+        self._active[thread_id] = self._active.get(thread_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._active[thread_id] -= 1
+            if not self._active[thread_id]:
+                del self._active[thread_id]
+                self._locks.pop(thread_id, None)
+
+    async def get_state(self, thread_id: str) -> dict:
+        snapshot = await self.graph.aget_state(self._config(thread_id))
+        return to_jsonable(snapshot.values)
+
+    async def delete_session(self, thread_id: str) -> None:
+        await self.graph.checkpointer.adelete_thread(thread_id)
+        get_retrieval_caches().drop(thread_id)
+        get_prefetcher().drop(thread_id)
+        get_answer_scorer().drop(thread_id)
+        get_retriever_registry().unpin(thread_id)
+
+    async def _payload(self, thread_id: str, text: str, code: Optional[str], context: Optional[dict]) -> dict:
+        full_input = text
+        if code:
+            full_input += f"\n\n### CANDIDATE CODE SUBMISSION:\n```\n{code}\n```"
+        snapshot = await self.graph.aget_state(self._config(thread_id))
+        if snapshot.values.get("messages"):
+            # The rest of the state is restored from the thread's checkpoint
+            return {"messages": [HumanMessage(content=full_input)]}
+        context = context or {}
+        return {
+            "messages": [HumanMessage(content=START_MESSAGE)],
+            "job_description": context.get("job_description", ""),
+            "candidate_details": context.get("candidate_details", ""),
+            "interview_role": None,
+            "num_questions_asked": 0,
+            "interview_status": "active",
+            "jd_index_id": context.get("jd_index_id"),
+            "resume_index_id": context.get("resume_index_id"),
+        }
+
+    async def run_turn(self, thread_id: str, text: str, code: Optional[str] = None,
+                       context: Optional[dict] = None) -> AsyncIterator[dict]:
+        """
+        Run one interview turn and yield its events.
+
+        The graph runs in its own task, so the turn completes and is checkpointed
+        even if the client disconnects mid-stream.
+
+        Args:
+            thread_id: Session (LangGraph thread) ID
+            text: Candidate answer
+            code: Optional code submission appended to the answer
+            context: Job description, candidate details and index IDs; only used
+                on the first turn of a session
+
+        Yields:
+            Turn events (see module docstring)
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(self._drive(thread_id, text, code, context, queue))
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            await asyncio.shield(task)
+
+    async def _drive(self, thread_id, text, code, context, queue: asyncio.Queue) -> None:
+        self.turns_started += 1
+        streams: Dict[str, StreamBuffer] = {}
+        try:
+            with telemetry.session(thread_id):
+                async with self._session_lock(thread_id):
+                    payload = await self._payload(thread_id, text, code, context)
+                    async for mode, data in self.graph.astream(
+                        payload, config=self._config(thread_id), stream_mode=STREAM_MODES
+                    ):
+                        if mode == "messages":
+                            event = self._token_event(streams, *data)
+                            if event:
+                                queue.put_nowait(event)
+                            continue
+                        if mode == "custom":
+                            if isinstance(data, dict) and "partial" in data:
+                                queue.put_nowait({
+                                    "type": "partial", "node": data.get("node"), "values": to_jsonable(data["partial"])
+                                })
+                            continue
+                        for node, values in data.items():
+                            if values is not None:
+                                queue.put_nowait({"type": "update", "node": node, "values": to_jsonable(values)})
+            self.turns_completed += 1
+        except Exception as e:
+            print(f"Turn failed for session {thread_id}: {e}")
+            queue.put_nowait({"type": "error", "message": str(e)})
+        finally:
+            queue.put_nowait({"type": "done"})
+            queue.put_nowait(None)
+
+    @staticmethod
+    def _token_event(streams: Dict[str, StreamBuffer], chunk, metadata) -> Optional[dict]:
+        """Turn a streamed chunk into a visible-text delta, holding back the end-of-interview sentinel."""
+        if STREAM_TAG not in metadata.get("tags", []) or not isinstance(chunk.content, str) or not chunk.content:
+            return None
+        buffer = streams.setdefault(chunk.id, StreamBuffer())
+        if buffer.finished:
+            return None
+        before = buffer.visible
+        visible = buffer.feed(chunk.content)
+        if buffer.finished:
+            return {"type": "discard", "message_id": chunk.id}
+        if len(visible) == len(before):
+            return None
+        return {"type": "token", "message_id": chunk.id, "text": visible[len(before):]}
+
+    def stats(self) -> dict:
+        return {
+            "active_sessions": len(self._active),
+            "turns_started": self.turns_started,
+            "turns_completed": self.turns_completed,
+            "index_store": get_index_store().stats(),
+            "registry": get_retriever_registry().stats(),
+            "retrieval_cache": get_retrieval_caches().stats(),
+            "jd_precompute": get_jd_precomputer().stats(),
+            "prefetch": get_prefetcher().stats(),
+            "answer_scoring": get_answer_scorer().stats(),
+            "models": get_model_tiers().stats(),
+            "transcript_store": get_transcript_store().stats() if get_transcript_store() else None,
+            "client_pool": get_transport().stats() if get_transport() else None,
+        }
+
+
+# --- HTTP layer ---
+
+def _service(request) -> InterviewService:
+    return request.app.state.service
+
+
+async def healthz(request: Request):
+    return JSONResponse({"ok": True})
+
+
+async def metrics(request: Request):
+    text = telemetry.recorder.prometheus_text()
+    if get_transport():
+        text += get_transport().prometheus_text()
+    return PlainTextResponse(text)
+
+
+async def stats(request: Request):
+    return JSONResponse(_service(request).stats())
+
+
+async def create_index(request: Request):
+    body = await request.body()
+    if not body:
+        return JSONResponse({"error": "empty request body; send the PDF bytes"}, status_code=400)
+    loop = asyncio.get_running_loop()
+    try:
+        index_id = await loop.run_in_executor(None, process_pdf, io.BytesIO(body), request.query_params.get("base"))
+    except Exception as e:
+        return JSONResponse({"error": f"could not process PDF: {e}"}, status_code=422)
+    return JSONResponse({"index_id": index_id, "ingest_stats": get_ingest_stats(index_id)})
+
+
+async def precompute_jd(request: Request):
+    body = await request.json()
+    job_description = body.get("job_description") or ""
+    if not isinstance(job_description, str):
+        return JSONResponse({"error": "'job_description' must be a string"}, status_code=400)
+    loop = asyncio.get_running_loop()
+    # Only hashing (and, for an uploaded JD, reading its chunks) happens here; the model calls run in the background
+    key = await loop.run_in_executor(None, get_jd_precomputer().submit, job_description, body.get("jd_index_id"))
+    return JSONResponse({"key": key})
+
+
+async def session_state(request: Request):
+    return JSONResponse(await _service(request).get_state(request.path_params["thread_id"]))
+
+
+async def delete_session(request: Request):
+    await _service(request).delete_session(request.path_params["thread_id"])
+    return JSONResponse({"deleted": request.path_params["thread_id"]})
+
+
+async def session_telemetry(request: Request):
+    thread_id = request.path_params["thread_id"]
+    return JSONResponse({
+        "summary": telemetry.recorder.summary(thread_id),
+        "retrieval_cache": get_retrieval_caches().session_stats(thread_id),
+        "jsonl": telemetry.recorder.export_jsonl(thread_id),
+    })
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    """Unix time from a query parameter given as a number or an ISO date/datetime."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+async def list_interviews(request: Request):
+    store = get_transcript_store()
+    if store is None:
+        return JSONResponse({"error": "the transcript store is disabled (TRANSCRIPT_STORE_ENABLED)"}, status_code=404)
+    params = request.query_params
+    try:
+        filters = {
+            "candidate": params.get("candidate"),
+            "jd": params.get("jd"),
+            "decision": params.get("decision"),
+            "since": _timestamp(params.get("since")),
+            "until": _timestamp(params.get("until")),
+            "limit": int(params.get("limit", "100")),
+        }
+    except ValueError as e:
+        return JSONResponse({"error": f"bad filter: {e}"}, status_code=400)
+    loop = asyncio.get_running_loop()
+    rows = await loop.run_in_executor(None, lambda: store.interviews(**filters))
+    return JSONResponse({"interviews": rows})
+
+
+async def interview_transcript(request: Request):
+    store = get_transcript_store()
+    if store is None:
+        return JSONResponse({"error": "the transcript store is disabled (TRANSCRIPT_STORE_ENABLED)"}, status_code=404)
+    loop = asyncio.get_running_loop()
+    transcript = await loop.run_in_executor(None, store.transcript, request.path_params["thread_id"])
+    if transcript is None:
+        return JSONResponse({"error": "no such interview"}, status_code=404)
+    return JSONResponse(transcript)
+
+
+async def post_turn(request: Request):
+    body = await request.json()
+    if not isinstance(body.get("text"), str):
+        return JSONResponse({"error": "'text' is required"}, status_code=400)
+    events = _service(request).run_turn(
+        request.path_params["thread_id"], body["text"], body.get("code"), body.get("context")
+    )
+
+    async def ndjson():
+        async for event in events:
+            yield json.dumps(event, default=str) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+async def session_ws(websocket: WebSocket):
+    await websocket.accept()
+    thread_id = websocket.path_params["thread_id"]
+    service = websocket.app.state.service
+    try:
+        while True:
+            body = await websocket.receive_json()
+            async for event in service.run_turn(thread_id, body.get("text", ""), body.get("code"), body.get("context")):
+                await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette):
+    # Sync graph nodes run on this pool; size it for the number of concurrent turns
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=SERVICE_WORKERS, thread_name_prefix="node"))
+    warm_parse_pool()
+    app.state.service = InterviewService(build_graph(await create_async_checkpointer()))
+    yield
+    if get_transcript_store():
+        # Write what is still queued before the process exits
+        get_transcript_store().flush()
+
+
+def create_app() -> Starlette:
+    """Build the ASGI app."""
+    return Starlette(
+        routes=[
+            Route("/healthz", healthz),
+            Route("/metrics", metrics),
+            Route("/stats", stats),
+            Route("/indexes", create_index, methods=["POST"]),
+            Route("/jd/precompute", precompute_jd, methods=["POST"]),
+            Route("/sessions/{thread_id}", session_state, methods=["GET"]),
+            Route("/sessions/{thread_id}", delete_session, methods=["DELETE"]),
+            Route("/sessions/{thread_id}/turns", post_turn, methods=["POST"]),
+            Route("/sessions/{thread_id}/telemetry", session_telemetry),
+            WebSocketRoute("/sessions/{thread_id}/ws", session_ws),
+            Route("/interviews", list_interviews),
+            Route("/interviews/{thread_id}", interview_transcript),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def start_in_thread(host: str = "127.0.0.1", port: int = 0, timeout: float = 30.0) -> str:
+    """
+    Start the service on a background thread of this process (used by the UI
+    when no SERVICE_URL is configured).
+
+    Args:
+        host: Interface to bind
+        port: Port to bind; 0 picks a free one
+        timeout: Seconds to wait for startup
+
+    Returns:
+        Base URL of the running service
+    """
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(create_app(), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="interview-service", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + timeout
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("Interview service failed to start")
+        time.sleep(0.05)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    return f"http://{host}:{bound_port}"
+
+
+def main() -> None:
+    import uvicorn
+
+    uvicorn.run(create_app(), host=SERVICE_HOST, port=SERVICE_PORT)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from typing import Annotated, List, Optional, Any
+from typing import Annotated, Dict, List, Optional
 from typing_extensions import TypedDict
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
@@ -13,5 +13,12 @@ class InterviewState(TypedDict):
     req_code_input: bool
     feedback_report: Optional[dict]
     detailed_evaluation: Optional[dict]
-    retriever: Optional[Any]  # FAISS vectorstore for job description
-    resume_retriever: Optional[Any]  # FAISS vectorstore for candidate resume
\ No newline at end of file
+    jd_index_id: Optional[str]  # Retriever registry ID of the job description index
+    resume_index_id: Optional[str]  # Retriever registry ID of the candidate resume index
+    conversation_summary: Optional[str]  # Rolling summary of turns before summary_cursor
+    summary_cursor: int  # Number of leading messages folded into conversation_summary
+    compaction_stats: Optional[dict]  # Transcript tokens before/after compaction
+    turn_timings: Optional[dict]  # Latency breakdown of the last interviewer turn
+    jd_digest: Optional[str]  # Compact JD for interviewer prompts (None: use job_description verbatim)
+    seed_questions: Optional[List[str]]  # Opening question ideas precomputed from the JD
+    answer_scores: Optional[Dict[str, dict]]  # Per-answer partial scores, keyed by hash of question and answer
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Helpers for streaming interviewer responses token by token, and structured
+outputs (the evaluation) field by field.
+"""
+import json
+from typing import Dict, Optional, Type
+
+from langchain_core.utils.json import parse_partial_json
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# Sentinel the interviewer emits instead of a question when the interview is over
+FINISHED_SENTINEL = "INTERVIEW_FINISHED"
+
+# Tag attached to LLM calls whose tokens are shown to the candidate
+STREAM_TAG = "interviewer_response"
+
+
+def wants_code_input(text: str) -> bool:
+    """Whether an interviewer message asks the candidate to write code."""
+    lowered = text.lower()
+    return "write code" in lowered or "code snippet" in lowered
+
+
+class StreamBuffer:
+    """
+    Accumulates streamed tokens of one interviewer message.
+
+    `visible` never shows the finish sentinel: a trailing fragment that could be
+    the start of the sentinel is held back until enough tokens arrive to decide.
+    """
+
+    def __init__(self):
+        self.text = ""
+
+    def feed(self, token: str) -> str:
+        """Append a token and return the text that is safe to display."""
+        self.text += token
+        return self.visible
+
+    def reset(self) -> None:
+        self.text = ""
+
+    @property
+    def finished(self) -> bool:
+        return FINISHED_SENTINEL in self.text
+
+    @property
+    def wants_code(self) -> bool:
+        return wants_code_input(self.text)
+
+    @property
+    def visible(self) -> str:
+        if self.finished:
+            return ""
+        for size in range(min(len(FINISHED_SENTINEL) - 1, len(self.text)), 0, -1):
+            if FINISHED_SENTINEL.startswith(self.text[-size:]):
+                return self.text[:-size]
+        return self.text
+
+
+class PartialStructuredOutput:
+    """
+    Parses the streamed JSON arguments of a structured-output tool call and
+    validates each field against `model` as soon as it is complete.
+
+    A field is complete once the next field has started (or the object is
+    closed). Of a list that is still streaming, the items before the last are
+    complete, so lists fill in item by item. Invalid fields are left out.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.args = ""
+        self.values: Dict[str, object] = {}
+        self._adapters = {name: TypeAdapter(field.annotation) for name, field in model.model_fields.items()}
+
+    def feed(self, chunk) -> Optional[dict]:
+        """
+        Add a streamed message chunk.
+
+        Returns:
+            The validated fields so far, if the chunk added or changed any; else None
+        """
+        for call_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+            # The structured output is the first (and only) tool call
+            if not call_chunk.get("index"):
+                self.args += call_chunk.get("args") or ""
+        try:
+            parsed, closed = json.loads(self.args), True
+        except json.JSONDecodeError:
+            parsed, closed = parse_partial_json(self.args), False
+        if not isinstance(parsed, dict):
+            return None
+        names = list(parsed)
+        values = {}
+        for i, name in enumerate(names):
+            value = parsed[name]
+            if not closed and i == len(names) - 1:
+                # Still streaming: only a list's finished items are usable
+                if not isinstance(value, list) or len(value) < 2:
+                    continue
+                value = value[:-1]
+            adapter = self._adapters.get(name)
+            if adapter is None:
+                continue
+            try:
+                values[name] = adapter.validate_python(value)
+            except ValidationError:
+                continue
+        if values == self.values:
+            return None
+        self.values = values
+        return dict(values)
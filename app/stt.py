@@ -0,0 +1,340 @@
+"""
+Low-latency speech-to-text for voice answers.
+
+A recording is mixed down to mono, resampled to 16 kHz (all Whisper uses) and
+re-encoded compactly before upload, which cuts a browser recording to a fraction
+of its size. Long recordings are split at pauses into segments that are
+transcribed concurrently and joined in order, so a two-minute answer costs about
+as long as its longest segment instead of one full upload plus transcription.
+Transcripts are cached by a hash of the audio (whole recording and each
+segment), so identical audio is never transcribed twice.
+"""
+import contextvars
+import hashlib
+import io
+import struct
+import threading
+import time
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.telemetry import span
+
+_WAVE_FORMAT_MULAW = 7
+_MAGIC_NAMES = (
+    (b"RIFF", "audio.wav"),
+    (b"OggS", "audio.ogg"),
+    (b"fLaC", "audio.flac"),
+    (b"\x1aE\xdf\xa3", "audio.webm"),
+    (b"ID3", "audio.mp3"),
+)
+
+
+def decode_wav(data: bytes) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    Decode an integer PCM WAV file.
+
+    Returns:
+        (mono float32 samples in [-1, 1], sample rate), or None if `data` is not a PCM WAV file
+    """
+    try:
+        with wave.open(io.BytesIO(data)) as f:
+            channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+            frames = f.readframes(f.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width in (2, 4):
+        dtype = np.int16 if width == 2 else np.int32
+        samples = np.frombuffer(frames, dtype=dtype).astype(np.float32) / float(np.iinfo(dtype).max)
+    elif width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        ints = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8) | (raw[:, 2].astype(np.int32) << 16))
+        samples = (np.where(ints >= 1 << 23, ints - (1 << 24), ints) / float(1 << 23)).astype(np.float32)
+    else:
+        return None
+    if channels > 1:
+        samples = samples[: len(samples) // channels * channels].reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def resample(samples: np.ndarray, rate: int, target: int) -> np.ndarray:
+    """Resample by linear interpolation, after a moving-average low-pass when downsampling."""
+    if rate == target or not len(samples):
+        return samples
+    if rate > target:
+        window = int(round(rate / target))
+        if window > 1:
+            samples = np.convolve(samples, np.ones(window, dtype=np.float32) / window, mode="same")
+    positions = np.arange(int(len(samples) * target / rate)) * (rate / target)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def split_on_silence(samples: np.ndarray, rate: int, segment_s: float, min_silence_s: float,
+                     silence_db: float) -> List[Tuple[int, int]]:
+    """
+    Split a recording at pauses into segments of about `segment_s` seconds.
+
+    Args:
+        samples: Mono samples
+        rate: Sample rate
+        segment_s: Target segment length; shorter recordings stay in one piece
+        min_silence_s: Shortest pause to cut at
+        silence_db: Level, relative to the loud parts of the recording, below which a frame is silent
+
+    Returns:
+        (start, end) sample ranges in order, with leading/trailing silence trimmed;
+        empty if the recording is silent
+    """
+    frame = max(1, int(rate * 0.03))
+    count = len(samples) // frame
+    if not count:
+        return [(0, len(samples))] if len(samples) else []
+    rms = np.sqrt(np.mean(np.square(samples[: count * frame].reshape(count, frame)), axis=1))
+    loud = float(np.percentile(rms, 95))
+    if loud <= 1e-4:
+        return []
+    silent = rms < loud * 10 ** (silence_db / 20)
+    voiced = np.flatnonzero(~silent)
+    pad = int(0.2 * rate / frame)
+    first, last = max(0, voiced[0] - pad), min(count, voiced[-1] + 1 + pad)
+
+    # Centers of pauses long enough to cut at, in frames
+    min_run = max(1, int(min_silence_s * rate / frame))
+    cuts, run_start = [], None
+    for i in range(first, last + 1):
+        if i < last and silent[i]:
+            run_start = i if run_start is None else run_start
+            continue
+        if run_start is not None and i - run_start >= min_run:
+            cuts.append((run_start + i) // 2)
+        run_start = None
+
+    target = max(1, int(segment_s * rate / frame))
+    bounds, start = [], first
+    while last - start > 1.5 * target:
+        # The pause closest to the target length, else the quietest frame before twice the target
+        options = [c for c in cuts if start + target // 2 <= c <= start + 2 * target]
+        if options:
+            cut = min(options, key=lambda c: abs(c - start - target))
+        else:
+            window = rms[start + target // 2: start + 2 * target]
+            cut = start + target // 2 + int(np.argmin(window))
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, last))
+    return [(a * frame, min(len(samples), b * frame)) for a, b in bounds]
+
+
+def _wav(format_tag: int, bits: int, rate: int, data: bytes) -> bytes:
+    """A mono WAV file; non-PCM formats get the extended fmt chunk and a fact chunk."""
+    block = bits // 8
+    fmt = struct.pack("<HHIIHH", format_tag, 1, rate, rate * block, block, bits)
+    chunks = [b"WAVE"]
+    if format_tag == 1:
+        chunks.append(b"fmt " + struct.pack("<I", len(fmt)) + fmt)
+    else:
+        fmt += struct.pack("<H", 0)
+        chunks.append(b"fmt " + struct.pack("<I", len(fmt)) + fmt)
+        chunks.append(b"fact" + struct.pack("<II", 4, len(data) // block))
+    chunks.append(b"data" + struct.pack("<I", len(data)) + data + (b"\0" if len(data) % 2 else b""))
+    body = b"".join(chunks)
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _mulaw(samples: np.ndarray) -> bytes:
+    """G.711 mu-law: 8 bits per sample with logarithmic companding, suited to speech."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int32)
+    sign = np.where(pcm < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(pcm), 32635) + 132
+    exponent = np.floor(np.log2(magnitude >> 7)).astype(np.int32)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+
+def encode(samples: np.ndarray, rate: int, upload_format: str) -> Tuple[bytes, str]:
+    """
+    Encode mono samples for upload.
+
+    Args:
+        samples: Mono float samples
+        rate: Sample rate
+        upload_format: "mulaw" (8-bit G.711 WAV), "wav" (16-bit PCM) or "flac" (needs soundfile)
+
+    Returns:
+        (file bytes, file name with the matching extension)
+    """
+    if upload_format == "flac":
+        # Optional dependency: soundfile
+        import soundfile
+
+        buffer = io.BytesIO()
+        soundfile.write(buffer, samples, rate, format="FLAC")
+        return buffer.getvalue(), "audio.flac"
+    if upload_format == "mulaw":
+        return _wav(_WAVE_FORMAT_MULAW, 8, rate, _mulaw(samples)), "audio.wav"
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    return _wav(1, 16, rate, pcm), "audio.wav"
+
+
+def wav_duration(data: bytes) -> Optional[float]:
+    """Duration of a WAV file of any sample format, from its fmt and data chunks; None if not a WAV file."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    byte_rate, pos = None, 12
+    while pos + 8 <= len(data):
+        chunk_id, size = data[pos:pos + 4], struct.unpack("<I", data[pos + 4:pos + 8])[0]
+        if chunk_id == b"fmt ":
+            byte_rate = struct.unpack("<I", data[pos + 16:pos + 20])[0]
+        elif chunk_id == b"data" and byte_rate:
+            return min(size, len(data) - pos - 8) / byte_rate
+        pos += 8 + size + size % 2
+    return None
+
+
+def _file_name(data: bytes) -> str:
+    """File name whose extension tells the API how to decode audio we pass through unchanged."""
+    for magic, name in _MAGIC_NAMES:
+        if data.startswith(magic):
+            return name
+    return "audio.mp3"
+
+
+class OpenAISTTBackend:
+    """STT backend calling the OpenAI transcription endpoint."""
+
+    def __init__(self, client, model: str = "whisper-1"):
+        self.client = client
+        self.model = model
+
+    def transcribe(self, audio: bytes, filename: str = "audio.wav") -> str:
+        return self.client.audio.transcriptions.create(model=self.model, file=(filename, audio)).text
+
+
+class TranscriptCache:
+    """In-memory LRU of transcripts keyed by hash(model, audio bytes)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(audio: bytes, model: str) -> str:
+        digest = hashlib.sha256(model.encode("utf-8") + b"\0")
+        digest.update(audio)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key: str, text: str) -> None:
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+class SpeechToText:
+    """
+    Shared backend, transcript cache and bounded worker pool for transcribing voice answers.
+
+    Args:
+        backend: Object with `transcribe(audio: bytes, filename: str) -> str`
+        cache: Transcript cache
+        model: Model name, part of the cache key; defaults to the backend's `model`,
+            so the key always names the model that transcribes
+        sample_rate: Rate recordings are resampled to before upload
+        upload_format: Encoding of uploaded segments (see `encode`)
+        segment_s: Target segment length for long recordings
+        min_silence_s: Shortest pause a recording is split at
+        silence_db: Silence level relative to the loud parts of the recording
+        max_workers: Segments transcribed at the same time
+    """
+
+    def __init__(self, backend, cache: TranscriptCache, model: Optional[str] = None, sample_rate: int = 16000,
+                 upload_format: str = "mulaw", segment_s: float = 15.0, min_silence_s: float = 0.4,
+                 silence_db: float = -30.0, max_workers: int = 4):
+        self.backend = backend
+        self.cache = cache
+        self.model = model or getattr(backend, "model", None) or type(backend).__name__
+        self.sample_rate = sample_rate
+        self.upload_format = upload_format
+        self.segment_s = segment_s
+        self.min_silence_s = min_silence_s
+        self.silence_db = silence_db
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stt")
+
+    def segments(self, audio: bytes) -> List[Tuple[bytes, str]]:
+        """Normalized, split and encoded upload segments of a recording; non-WAV audio is passed through whole."""
+        decoded = decode_wav(audio)
+        if decoded is None:
+            return [(audio, _file_name(audio))]
+        samples = resample(decoded[0], decoded[1], self.sample_rate)
+        ranges = split_on_silence(samples, self.sample_rate, self.segment_s, self.min_silence_s, self.silence_db)
+        return [encode(samples[start:end], self.sample_rate, self.upload_format) for start, end in ranges]
+
+    def _transcribe_segment(self, data: bytes, filename: str) -> Tuple[str, bool]:
+        with span("stt.segment", kind="audio", bytes=len(data)) as s:
+            key = TranscriptCache.key(data, self.model)
+            text = self.cache.get(key)
+            if text is not None:
+                s.set(cache_hits=1)
+                return text, True
+            s.set(cache_misses=1)
+            text = self.backend.transcribe(data, filename)
+            self.cache.put(key, text)
+            return text, False
+
+    def transcribe(self, audio: bytes) -> Tuple[str, dict]:
+        """
+        Transcribe a recording.
+
+        Returns:
+            (transcript, {"input_bytes", "uploaded_bytes", "segments", "cached_segments", "audio_s", "latency_s"})
+        """
+        start = time.perf_counter()
+        with span("stt.transcribe", kind="audio", bytes=len(audio)) as s:
+            key = TranscriptCache.key(audio, self.model)
+            text = self.cache.get(key)
+            stats = {"input_bytes": len(audio), "uploaded_bytes": 0, "segments": 0, "cached_segments": 0, "audio_s": None}
+            if text is not None:
+                s.set(cache_hits=1)
+            else:
+                segments = self.segments(audio)
+                # Each segment runs in a copy of the caller's context so its span keeps its parent and session
+                futures = [
+                    self.executor.submit(contextvars.copy_context().run, self._transcribe_segment, data, name)
+                    for data, name in segments
+                ]
+                results = [future.result() for future in futures]
+                text = " ".join(part.strip() for part, _ in results if part.strip())
+                self.cache.put(key, text)
+                stats.update(
+                    uploaded_bytes=sum(len(data) for (data, _), (_, cached) in zip(segments, results) if not cached),
+                    segments=len(segments),
+                    cached_segments=sum(cached for _, cached in results),
+                    audio_s=sum(wav_duration(data) or 0.0 for data, _ in segments) or None,
+                )
+                s.set(cache_misses=1, uploaded_bytes=stats["uploaded_bytes"], segments=len(segments))
+            stats["latency_s"] = time.perf_counter() - start
+        return text, stats
@@ -0,0 +1,342 @@
+"""
+Lightweight tracing for the interview engine.
+
+Every graph node, LLM call, retrieval, embedding batch and audio call is
+recorded as a span with wall time, token counts, retries and cache hits.
+Finished spans are kept in a bounded in-memory buffer (for per-session
+summaries), optionally appended to a JSONL file, and can be rendered in
+Prometheus text format. When telemetry is disabled `span()` returns a shared
+no-op object, so instrumented code pays one boolean check.
+"""
+import contextvars
+import functools
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.config import TELEMETRY_ENABLED, TELEMETRY_JSONL, TELEMETRY_BUFFER_SIZE
+
+_enabled = TELEMETRY_ENABLED
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+_current_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_session", default=None)
+
+# Span attributes that are summed in session summaries and Prometheus counters
+COUNTER_ATTRS = ("input_tokens", "output_tokens", "retries", "cache_hits", "cache_misses", "lexical_fast_path")
+
+
+def enable(flag: bool = True) -> None:
+    """Turn span recording on or off for the whole process."""
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, key: str, value: float = 1):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """One timed operation. Use as a context manager; nested spans record their parent."""
+
+    def __init__(self, name: str, kind: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.attrs = attrs
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id: Optional[str] = None
+        self.session_id: Optional[str] = None
+        self.start = 0.0
+        self.duration = 0.0
+        self.error: Optional[str] = None
+        self._token = None
+        self._t0 = 0.0
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def add(self, key: str, value: float = 1) -> None:
+        self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent else None
+        self.session_id = _current_session.get()
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._t0
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        _current_span.reset(self._token)
+        recorder.record(self)
+        return False
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "session_id": self.session_id,
+            "start": self.start,
+            "duration_s": self.duration,
+            "error": self.error,
+            **self.attrs,
+        }
+
+
+def span(name: str, kind: str = "internal", **attrs):
+    """
+    Start a span.
+
+    Args:
+        name: Span name, e.g. "node.interviewer_agent" or "retrieval.jd"
+        kind: Category: node, llm, retrieval, embedding, audio, internal
+        **attrs: Initial attributes (token counts, cache_hits, ...)
+
+    Returns:
+        Context manager yielding the span (a no-op when telemetry is disabled)
+    """
+    if not _enabled:
+        return NOOP_SPAN
+    return Span(name, kind, attrs)
+
+
+def record(name: str, duration_s: float, kind: str = "internal", **attrs) -> None:
+    """
+    Record a measurement that is not a block of code as a span ending now,
+    e.g. the time from the start of a call to its first useful output.
+    """
+    if not _enabled:
+        return
+    finished = Span(name, kind, attrs)
+    parent = _current_span.get()
+    finished.parent_id = parent.span_id if parent else None
+    finished.session_id = _current_session.get()
+    finished.start = time.time() - duration_s
+    finished.duration = duration_s
+    recorder.record(finished)
+
+
+def current_span():
+    """The innermost active span, or a no-op span."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(name: str, kind: str = "node"):
+    """Decorator that records each call of a function as a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(name, kind, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class session:
+    """Context manager tagging every span started inside it with a session (thread) ID."""
+
+    def __init__(self, session_id: Optional[str]):
+        self.session_id = session_id
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_session.set(self.session_id)
+        return self
+
+    def __exit__(self, *exc):
+        _current_session.reset(self._token)
+        return False
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class Recorder:
+    """Bounded buffer of finished spans with JSONL export and aggregation."""
+
+    def __init__(self, max_spans: int, jsonl_path: Optional[str] = None):
+        self.spans = deque(maxlen=max_spans)
+        self.jsonl_path = jsonl_path
+        # Cumulative per-name totals; unlike the span buffer these never roll over,
+        # so they can back monotonic Prometheus counters
+        self.totals: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, finished: Span) -> None:
+        data = finished.to_dict()
+        with self._lock:
+            self.spans.append(data)
+            totals = self.totals.setdefault(data["name"], {"count": 0, "sum": 0.0, "errors": 0})
+            totals["count"] += 1
+            totals["sum"] += data["duration_s"]
+            totals["errors"] += 1 if data["error"] else 0
+            for attr in COUNTER_ATTRS:
+                if data.get(attr):
+                    totals[attr] = totals.get(attr, 0) + data[attr]
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a") as f:
+                    f.write(json.dumps(data, default=str) + "\n")
+
+    def snapshot(self, session_id: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            spans = list(self.spans)
+        if session_id is not None:
+            spans = [s for s in spans if s["session_id"] == session_id]
+        return spans
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+            self.totals.clear()
+
+    def summary(self, session_id: Optional[str] = None) -> List[dict]:
+        """Per span name: call count, wall time percentiles and summed counters."""
+        groups: Dict[str, List[dict]] = {}
+        for s in self.snapshot(session_id):
+            groups.setdefault(s["name"], []).append(s)
+        rows = []
+        for name, spans in sorted(groups.items()):
+            durations = [s["duration_s"] for s in spans]
+            row = {
+                "name": name,
+                "calls": len(spans),
+                "errors": sum(1 for s in spans if s["error"]),
+                "total_s": round(sum(durations), 4),
+                "p50_s": round(_percentile(durations, 0.50), 4),
+                "p95_s": round(_percentile(durations, 0.95), 4),
+                "p99_s": round(_percentile(durations, 0.99), 4),
+            }
+            for attr in COUNTER_ATTRS:
+                row[attr] = sum(s.get(attr, 0) or 0 for s in spans)
+            rows.append(row)
+        return rows
+
+    def export_jsonl(self, session_id: Optional[str] = None) -> str:
+        return "".join(json.dumps(s, default=str) + "\n" for s in self.snapshot(session_id))
+
+    def prometheus_text(self) -> str:
+        """Render spans in the Prometheus text exposition format (quantiles over the buffered spans)."""
+        with self._lock:
+            totals = {name: dict(values) for name, values in self.totals.items()}
+        quantiles = {row["name"]: row for row in self.summary()}
+        lines = [
+            "# HELP interview_span_duration_seconds Wall time of instrumented operations.",
+            "# TYPE interview_span_duration_seconds summary",
+        ]
+        for name, values in sorted(totals.items()):
+            label = f'name="{name}"'
+            row = quantiles.get(name)
+            if row:
+                for q, key in (("0.5", "p50_s"), ("0.95", "p95_s"), ("0.99", "p99_s")):
+                    lines.append(f'interview_span_duration_seconds{{{label},quantile="{q}"}} {row[key]}')
+            lines.append(f"interview_span_duration_seconds_sum{{{label}}} {values['sum']:.6f}")
+            lines.append(f"interview_span_duration_seconds_count{{{label}}} {values['count']}")
+        for attr in COUNTER_ATTRS + ("errors",):
+            metric = f"interview_{attr}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for name, values in sorted(totals.items()):
+                if values.get(attr):
+                    lines.append(f'{metric}{{name="{name}"}} {values[attr]}')
+        return "\n".join(lines) + "\n"
+
+
+recorder = Recorder(TELEMETRY_BUFFER_SIZE, TELEMETRY_JSONL or None)
+
+
+class TelemetryCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback handler recording every chat model call as an "llm" span,
+    with input/output token usage reported by the provider.
+    """
+
+    def __init__(self, name: str = "llm"):
+        self.name = name
+        self._spans: Dict[Any, Span] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        if not _enabled:
+            return
+        model = (kwargs.get("invocation_params") or {}).get("model") or (kwargs.get("metadata") or {}).get("ls_model_name")
+        metadata = kwargs.get("metadata") or {}
+        node = metadata.get("langgraph_node")
+        attrs = {"model": model} if model else {}
+        if metadata.get("model_call"):
+            # Named per model call and tier ("llm.evaluation.strong", see app/model_tiers.py)
+            name = f"{self.name}.{metadata['model_call']}.{metadata.get('model_tier')}"
+            if node:
+                attrs["node"] = node
+        else:
+            # Named per graph node ("llm.interviewer_agent") so summaries break LLM time down by node
+            name = f"{self.name}.{node}" if node else self.name
+        started = Span(name, "llm", attrs)
+        # Enter without making it the current span: callbacks may end on another thread
+        parent = _current_span.get()
+        started.parent_id = parent.span_id if parent else None
+        started.session_id = _current_session.get()
+        started.start = time.time()
+        started._t0 = time.perf_counter()
+        self._spans[run_id] = started
+
+    def _finish(self, run_id, error: Optional[str] = None, response=None):
+        started = self._spans.pop(run_id, None)
+        if started is None:
+            return
+        started.duration = time.perf_counter() - started._t0
+        started.error = error
+        if response is not None:
+            started.attrs.update(_usage_from_result(response))
+        recorder.record(started)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id, response=response)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=type(error).__name__)
+
+
+def _usage_from_result(result) -> Dict[str, int]:
+    """Extract input/output token counts from an LLMResult."""
+    for generations in result.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return {"input_tokens": usage.get("input_tokens", 0), "output_tokens": usage.get("output_tokens", 0)}
+    token_usage = (result.llm_output or {}).get("token_usage") or {}
+    if token_usage:
+        return {
+            "input_tokens": token_usage.get("prompt_tokens", 0),
+            "output_tokens": token_usage.get("completion_tokens", 0),
+        }
+    return {}
@@ -0,0 +1,32 @@
+"""
+Token counting helpers backed by tiktoken.
+"""
+from functools import lru_cache
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """
+    Encoding for a model, or None if it cannot be loaded.
+    Failures are cached too: tiktoken downloads encodings on first use, and
+    retrying on every call would stall each prompt on a network timeout when offline.
+    """
+    import tiktoken
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """
+    Count tokens in `text` for the given model.
+    Falls back to a ~4 characters/token estimate if the encoding cannot be loaded.
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
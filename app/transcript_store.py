@@ -0,0 +1,328 @@
+"""
+Durable, indexed store of interview transcripts and evaluations.
+
+The graph checkpoint holds an interview's state while it runs, but past
+interviews cannot be queried from it. This appends every interviewer turn
+(the candidate's answer, the question asked, the retrieval context used and
+the turn timings) and the final evaluation to a SQLite database in WAL mode:
+
+- nodes only enqueue rows; one writer thread commits them in batches (up to
+  TRANSCRIPT_BATCH_SIZE rows per transaction, at most TRANSCRIPT_FLUSH_MS
+  after the first), so a turn never waits on the disk. When the queue is
+  full, rows are dropped and counted rather than blocking the turn
+- rows are never updated; a turn or evaluation recorded twice (a node run
+  again) is ignored
+- interviews and evaluations are indexed by candidate, JD hash, decision and
+  date, so queries like "all HOLD decisions for this JD this week" read only
+  the matching index range
+
+Readers use their own connection; with WAL they never block the writer.
+"""
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import List, Optional
+
+from app.config import (
+    TRANSCRIPT_BATCH_SIZE,
+    TRANSCRIPT_DB,
+    TRANSCRIPT_FLUSH_MS,
+    TRANSCRIPT_QUEUE_SIZE,
+    TRANSCRIPT_STORE_ENABLED,
+)
+from app.index_store import content_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interviews (
+    thread_id TEXT PRIMARY KEY,
+    candidate_id TEXT NOT NULL,
+    candidate_details TEXT,
+    jd_hash TEXT NOT NULL,
+    role TEXT,
+    jd_index_id TEXT,
+    resume_index_id TEXT,
+    started_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS interviews_candidate ON interviews (candidate_id, started_at);
+CREATE INDEX IF NOT EXISTS interviews_jd ON interviews (jd_hash, started_at);
+CREATE INDEX IF NOT EXISTS interviews_started ON interviews (started_at);
+
+CREATE TABLE IF NOT EXISTS turns (
+    thread_id TEXT NOT NULL,
+    turn INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    answer TEXT,
+    question TEXT,
+    retrieval_context TEXT,
+    timings TEXT,
+    PRIMARY KEY (thread_id, turn)
+);
+
+CREATE TABLE IF NOT EXISTS evaluations (
+    thread_id TEXT PRIMARY KEY,
+    candidate_id TEXT NOT NULL,
+    jd_hash TEXT NOT NULL,
+    decision TEXT,
+    overall_rating INTEGER,
+    evaluated_at REAL NOT NULL,
+    evaluation TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS evaluations_jd_decision ON evaluations (jd_hash, decision, evaluated_at);
+CREATE INDEX IF NOT EXISTS evaluations_candidate ON evaluations (candidate_id, evaluated_at);
+CREATE INDEX IF NOT EXISTS evaluations_decision ON evaluations (decision, evaluated_at);
+CREATE INDEX IF NOT EXISTS evaluations_date ON evaluations (evaluated_at);
+"""
+
+_INSERTS = {
+    "interview": "INSERT OR IGNORE INTO interviews VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    "turn": "INSERT OR IGNORE INTO turns VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "evaluation": "INSERT OR IGNORE INTO evaluations VALUES (?, ?, ?, ?, ?, ?, ?)",
+}
+
+
+def jd_hash(job_description: str, jd_index_id: Optional[str]) -> str:
+    """Key of a JD: its typed text and uploaded document."""
+    return content_key((job_description or "").strip().encode("utf-8"), jd_index_id=jd_index_id)
+
+
+def candidate_id(candidate_details: str, resume_index_id: Optional[str]) -> str:
+    """Key of a candidate: the uploaded resume's index ID, else a hash of the typed details."""
+    if resume_index_id:
+        return resume_index_id
+    return hashlib.sha256(" ".join((candidate_details or "").lower().split()).encode("utf-8")).hexdigest()
+
+
+class TranscriptStore:
+    """
+    Append-only SQLite store of interviews, turns and evaluations, written in batches by a background thread.
+
+    Args:
+        path: SQLite database file
+        batch_size: Rows committed per transaction at most
+        flush_ms: Longest a row waits for its batch to fill up
+        queue_size: Rows waiting to be written before new ones are dropped
+    """
+
+    def __init__(self, path: str, batch_size: int = 256, flush_ms: float = 200, queue_size: int = 10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_s = flush_ms / 1000
+        self.counts: Counter = Counter()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        self._writer = threading.Thread(target=self._write_loop, name="transcript-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection (the writer thread and each reader thread have their own)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.row_factory = sqlite3.Row
+            # WAL commits are durable at checkpoints; a crash loses at most the last batches
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    # --- Writes (non-blocking) ---
+
+    def _enqueue(self, kind: str, row: tuple) -> None:
+        try:
+            self._queue.put_nowait((kind, row))
+        except queue.Full:
+            with self._lock:
+                self.counts["dropped"] += 1
+            return
+        with self._lock:
+            self.counts["queued"] += 1
+
+    def record_turn(self, thread_id: str, state: dict, turn: int, answer: Optional[str],
+                    question: Optional[str], contexts: List[str], timings: Optional[dict]) -> None:
+        """
+        Append an interviewer turn (and the interview itself, on its first turn).
+
+        Args:
+            thread_id: Session (graph thread) ID
+            state: Graph state the turn ran on (for the candidate, JD and role)
+            turn: Question number the turn asked, or the one after the last for the closing turn
+            answer: Candidate answer the turn responded to (None for the opening question)
+            question: Question asked (None when the turn ended the interview)
+            contexts: Retrieval results in the turn's prompt
+            timings: Latency breakdown of the turn
+        """
+        now = time.time()
+        self._enqueue("interview", (
+            thread_id,
+            candidate_id(state.get("candidate_details"), state.get("resume_index_id")),
+            state.get("candidate_details"),
+            jd_hash(state.get("job_description"), state.get("jd_index_id")),
+            state.get("interview_role"),
+            state.get("jd_index_id"),
+            state.get("resume_index_id"),
+            now,
+        ))
+        self._enqueue("turn", (
+            thread_id, turn, now, answer, question, json.dumps(contexts), json.dumps(timings or {}),
+        ))
+
+    def record_evaluation(self, thread_id: str, state: dict, evaluation: dict) -> None:
+        """Append an interview's final evaluation (DetailedEvaluation fields)."""
+        self._enqueue("evaluation", (
+            thread_id,
+            candidate_id(state.get("candidate_details"), state.get("resume_index_id")),
+            jd_hash(state.get("job_description"), state.get("jd_index_id")),
+            evaluation.get("decision"),
+            evaluation.get("overall_rating"),
+            time.time(),
+            json.dumps(evaluation),
+        ))
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_s
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._write(conn, batch)
+
+    def _write(self, conn: sqlite3.Connection, batch: list) -> None:
+        rows = [item for item in batch if not isinstance(item, threading.Event)]
+        start = time.perf_counter()
+        try:
+            with conn:
+                # One statement per kind of row, in the order the kinds were first queued
+                for kind in dict.fromkeys(kind for kind, _ in rows):
+                    conn.executemany(_INSERTS[kind], [row for k, row in rows if k == kind])
+        except sqlite3.Error as e:
+            # The batch was rolled back: write it row by row so a bad row loses only itself
+            print(f"Transcript store batch write failed, retrying {len(rows)} rows one by one: {e}")
+            written = self._write_rows(conn, rows)
+            with self._lock:
+                self.counts["written"] += written
+                self.counts["failed"] += len(rows) - written
+                self.counts["batch_retries"] += 1
+        else:
+            with self._lock:
+                self.counts["written"] += len(rows)
+                self.counts["batches"] += 1 if rows else 0
+                self.counts["write_ms"] += (time.perf_counter() - start) * 1000
+        for item in batch:
+            if isinstance(item, threading.Event):
+                item.set()
+
+    @staticmethod
+    def _write_rows(conn: sqlite3.Connection, rows: list) -> int:
+        """Write rows in a transaction each, skipping those that fail; returns the number written."""
+        written = 0
+        for kind, row in rows:
+            try:
+                with conn:
+                    conn.execute(_INSERTS[kind], row)
+            except sqlite3.Error as e:
+                print(f"Transcript store dropped a {kind} row ({row[0]}): {e}")
+                continue
+            written += 1
+        return written
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every row queued so far is written (e.g. before reading it back or at shutdown)."""
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    # --- Reads ---
+
+    def interviews(self, candidate: Optional[str] = None, jd: Optional[str] = None, decision: Optional[str] = None,
+                   since: Optional[float] = None, until: Optional[float] = None, limit: int = 100) -> List[dict]:
+        """
+        Interviews matching every given filter, newest first.
+
+        Args:
+            candidate: Candidate ID (`candidate_id`)
+            jd: JD hash (`jd_hash`)
+            decision: "HIRE", "HOLD" or "NO HIRE"; only evaluated interviews match
+            since: Unix time; the evaluation date when filtering on a decision, else the start date
+            until: Unix time, exclusive
+            limit: Rows returned at most
+
+        Returns:
+            [{"thread_id", "candidate_id", "jd_hash", "role", "started_at", "decision",
+              "overall_rating", "evaluated_at"}]
+        """
+        # With a decision the evaluations table (and its indexes) drives the query, else the interviews table
+        if decision is not None:
+            driver, date = "e", "e.evaluated_at"
+            sql = "SELECT {} FROM evaluations e JOIN interviews i ON i.thread_id = e.thread_id"
+        else:
+            driver, date = "i", "i.started_at"
+            sql = "SELECT {} FROM interviews i LEFT JOIN evaluations e ON e.thread_id = i.thread_id"
+        sql = sql.format(
+            "i.thread_id, i.candidate_id, i.jd_hash, i.role, i.started_at, e.decision, e.overall_rating, e.evaluated_at"
+        )
+        where, params = [], []
+        for column, value in ((f"{driver}.candidate_id", candidate), (f"{driver}.jd_hash", jd), ("e.decision", decision)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            where.append(f"{date} >= ?")
+            params.append(since)
+        if until is not None:
+            where.append(f"{date} < ?")
+            params.append(until)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {date} DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self._connect().execute(sql, params)]
+
+    def transcript(self, thread_id: str) -> Optional[dict]:
+        """An interview with its turns (in order) and evaluation, or None if it was never recorded."""
+        conn = self._connect()
+        interview = conn.execute("SELECT * FROM interviews WHERE thread_id = ?", (thread_id,)).fetchone()
+        if interview is None:
+            return None
+        turns = [
+            {**dict(row), "retrieval_context": json.loads(row["retrieval_context"]), "timings": json.loads(row["timings"])}
+            for row in conn.execute("SELECT * FROM turns WHERE thread_id = ? ORDER BY turn", (thread_id,))
+        ]
+        evaluation = conn.execute("SELECT evaluation FROM evaluations WHERE thread_id = ?", (thread_id,)).fetchone()
+        return {
+            **dict(interview),
+            "turns": turns,
+            "evaluation": json.loads(evaluation["evaluation"]) if evaluation else None,
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counts)
+        stats["pending"] = self._queue.qsize()
+        stats["write_ms"] = round(stats.get("write_ms", 0.0), 1)
+        return stats
+
+
+@lru_cache(maxsize=None)
+def get_transcript_store() -> Optional[TranscriptStore]:
+    """Get the process-wide transcript store (None when TRANSCRIPT_STORE_ENABLED is off)."""
+    if not TRANSCRIPT_STORE_ENABLED:
+        return None
+    return TranscriptStore(TRANSCRIPT_DB, TRANSCRIPT_BATCH_SIZE, TRANSCRIPT_FLUSH_MS, TRANSCRIPT_QUEUE_SIZE)
@@ -0,0 +1,293 @@
+"""
+Sentence-pipelined text-to-speech with a content-addressed audio cache.
+
+Text is split at sentence boundaries and each sentence is synthesized on a
+bounded worker pool as soon as it is complete, so audio for the first sentence
+is ready while the rest of the message is still being generated. Synthesized
+audio is cached on disk by hash(model, voice, text), which makes fixed prompts
+(such as the closing thank-you message) and repeated phrases free.
+"""
+import contextvars
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, List, Optional
+
+from app.telemetry import span
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+MIN_SEGMENT_CHARS = 20
+
+
+def split_sentences(text: str, min_chars: int = MIN_SEGMENT_CHARS) -> List[str]:
+    """
+    Split text into sentences for synthesis.
+    Fragments shorter than `min_chars` are merged into the next sentence so we
+    don't pay a request for "Great." on its own.
+    """
+    sentences = []
+    pending = ""
+    for part in _SENTENCE_END.split(text.strip()):
+        pending = f"{pending} {part}".strip() if pending else part.strip()
+        if len(pending) >= min_chars:
+            sentences.append(pending)
+            pending = ""
+    if pending:
+        sentences.append(pending)
+    return sentences
+
+
+# httpx closes keep-alive connections idle for longer than this
+KEEPALIVE_EXPIRY_S = 5.0
+
+
+class OpenAITTSBackend:
+    """
+    TTS backend calling the OpenAI speech endpoint.
+
+    Args:
+        client: OpenAI client
+        warm_idle_s: `warm` sends a request only when the backend has been idle for longer
+            than this (its keep-alive connection is gone); None never warms, e.g. when the
+            client's pooled transport keeps connections to the API open for the chat calls
+    """
+
+    def __init__(self, client, warm_idle_s: Optional[float] = KEEPALIVE_EXPIRY_S):
+        self.client = client
+        self.warm_idle_s = warm_idle_s
+        self._last_used = 0.0
+
+    def synthesize(self, text: str, voice: str, model: str) -> bytes:
+        self._last_used = time.monotonic()
+        try:
+            return self.client.audio.speech.create(model=model, voice=voice, input=text).content
+        finally:
+            self._last_used = time.monotonic()
+
+    def warm(self) -> None:
+        """Open a keep-alive connection to the API with a cheap request, if the last one has expired."""
+        if self.warm_idle_s is None or time.monotonic() - self._last_used < self.warm_idle_s:
+            return
+        self._last_used = time.monotonic()
+        self.client.models.list()
+
+
+class FakeTTSBackend:
+    """Local stand-in backend for tests and benchmarks: sleeps, then returns deterministic bytes."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def warm(self) -> None:
+        pass
+
+    def synthesize(self, text: str, voice: str, model: str) -> bytes:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return f"[{model}:{voice}]{text}".encode("utf-8")
+
+
+class AudioCache:
+    """
+    Directory of synthesized audio files keyed by hash(model, voice, text).
+    File mtimes are used as last-used timestamps for LRU eviction. Writes keep a
+    running byte total; the directory is only scanned when it exceeds `max_bytes`.
+    """
+
+    # Fraction of max_bytes an over-full cache is evicted down to
+    EVICT_TO = 0.9
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        # Starts the running total from what is on disk
+        self.evict()
+
+    @staticmethod
+    def key(text: str, voice: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\0{voice}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = os.path.join(self.root, key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = os.path.join(self.root, key)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=self.root)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        try:
+            replaced = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.bytes += len(data) - replaced
+            full = self.bytes > self.max_bytes
+        if full:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove least recently used files until the cache fits in `max_bytes`. An over-full
+        cache is cut down to EVICT_TO of it, so a full cache is not scanned again on every write.
+        The scan also resets the running total (other processes may share the directory).
+        """
+        with self._lock:
+            entries = [
+                (e.stat().st_mtime, e.path, e.stat().st_size)
+                for e in os.scandir(self.root)
+                if e.is_file() and not e.name.startswith(".")
+            ]
+            total = sum(size for _, _, size in entries)
+            target = self.max_bytes if total <= self.max_bytes else self.max_bytes * self.EVICT_TO
+            for _, path, size in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+            self.bytes = total
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "bytes": self.bytes}
+
+
+class TTSEngine:
+    """Shared backend, audio cache and bounded worker pool; hands out per-message pipelines."""
+
+    def __init__(self, backend, cache: AudioCache, voice: str = "alloy", model: str = "tts-1", max_workers: int = 4):
+        self.backend = backend
+        self.cache = cache
+        self.voice = voice
+        self.model = model
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+
+    def synthesize_segment(self, text: str) -> bytes:
+        """Synthesize one segment, serving it from the audio cache when possible."""
+        with span("tts.segment", kind="audio", chars=len(text)) as s:
+            key = AudioCache.key(text, self.voice, self.model)
+            audio = self.cache.get(key)
+            if audio is None:
+                s.set(cache_misses=1)
+                audio = self.backend.synthesize(text, self.voice, self.model)
+                self.cache.put(key, audio)
+            else:
+                s.set(cache_hits=1)
+            return audio
+
+    def warm(self) -> Future:
+        """
+        Warm the backend's connection in the background, e.g. while the next message is
+        being generated, so its first sentence doesn't pay for a new connection after the
+        candidate's answer left the previous one idle.
+        """
+        def run():
+            try:
+                with span("tts.warm", kind="audio"):
+                    self.backend.warm()
+            except Exception as e:
+                print(f"TTS warm-up failed: {e}")
+
+        return self.executor.submit(run)
+
+    def pipeline(self) -> "TTSPipeline":
+        return TTSPipeline(self)
+
+    def synthesize(self, text: str) -> bytes:
+        """Synthesize a complete message; segments run concurrently and are joined in order."""
+        pipeline = self.pipeline()
+        pipeline.feed(text)
+        pipeline.close()
+        return pipeline.audio()
+
+
+class TTSPipeline:
+    """
+    Synthesis of one message whose text may still be streaming in.
+
+    `feed` accepts text deltas and submits every completed sentence to the
+    engine's worker pool; `segments` yields audio in sentence order as soon as
+    each segment is ready.
+    """
+
+    def __init__(self, engine: TTSEngine):
+        self.engine = engine
+        self.futures: List[Future] = []
+        self.started_at = time.perf_counter()
+        self.first_segment_latency: Optional[float] = None
+        self._pending = ""
+        self._closed = False
+
+    def _submit(self, sentence: str) -> None:
+        # Run in a copy of the caller's context so the segment span keeps its session
+        self.futures.append(
+            self.engine.executor.submit(contextvars.copy_context().run, self.engine.synthesize_segment, sentence)
+        )
+
+    def feed(self, delta: str) -> None:
+        """Add streamed text; complete sentences are submitted for synthesis right away."""
+        self._pending += delta
+        boundaries = list(_SENTENCE_END.finditer(self._pending))
+        if not boundaries:
+            return
+        complete = self._pending[:boundaries[-1].start()]
+        rest = self._pending[boundaries[-1].end():]
+        sentences = split_sentences(complete, MIN_SEGMENT_CHARS)
+        # A short trailing sentence waits to be merged with the next one
+        if sentences and len(sentences[-1]) < MIN_SEGMENT_CHARS:
+            rest = f"{sentences.pop()} {rest}"
+        for sentence in sentences:
+            self._submit(sentence)
+        self._pending = rest
+
+    def close(self) -> None:
+        """Submit whatever text is left; no more text will be fed."""
+        if not self._closed and self._pending.strip():
+            self._submit(self._pending.strip())
+        self._pending = ""
+        self._closed = True
+
+    def segments(self) -> Iterator[bytes]:
+        """Yield synthesized audio segments in order, each as soon as it is ready."""
+        for i, future in enumerate(self.futures):
+            audio = future.result()
+            if i == 0 and self.first_segment_latency is None:
+                self.first_segment_latency = time.perf_counter() - self.started_at
+            yield audio
+
+    def audio(self) -> bytes:
+        """All segments joined in order (MP3 frames concatenate into one playable stream)."""
+        return b"".join(self.segments())
+
+    def cancel(self) -> None:
+        for future in self.futures:
+            future.cancel()
+        self.futures = []
+        self._pending = ""
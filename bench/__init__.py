@@ -0,0 +1 @@
+"""Offline benchmark and load-test harness (see `python -m bench.run --help`)."""
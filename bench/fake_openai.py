@@ -0,0 +1,185 @@
+"""
+Local stand-in for the OpenAI HTTP API that injects throttling.
+
+Serves the chat completions (streaming and not), embeddings and speech
+endpoints with deterministic content, and answers 429 (with `Retry-After`)
+when a request exceeds its concurrency limit or requests/minute budget, or at
+a random `throttle_rate`. Used to exercise `app/client_pool.py` offline.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+
+class ThrottlePolicy:
+    """
+    Server-side limits.
+
+    Args:
+        max_concurrency: Concurrent requests served; beyond it requests get 429
+        rpm: Requests per rolling minute; beyond it requests get 429
+        throttle_rate: Probability of a spurious 429
+        latency_ms: Processing time per request
+        seed: Seed for the random 429s
+    """
+
+    def __init__(self, max_concurrency: int = 16, rpm: int = 0, throttle_rate: float = 0.0,
+                 latency_ms: float = 100.0, seed: int = 0):
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm
+        self.throttle_rate = throttle_rate
+        self.latency_ms = latency_ms
+        self.rng = random.Random(seed)
+        self.in_flight = 0
+        self.stats = {"requests": 0, "served": 0, "throttled": 0, "max_in_flight": 0}
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def admit(self) -> float:
+        """Return 0 to serve the request, or a Retry-After value in seconds to throttle it."""
+        with self._lock:
+            now = time.monotonic()
+            self.stats["requests"] += 1
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            retry_after = 0.0
+            if self.in_flight >= self.max_concurrency:
+                retry_after = 0.2
+            elif self.rpm and len(self._recent) >= self.rpm:
+                retry_after = max(0.1, 60 - (now - self._recent[0]))
+            elif self.throttle_rate and self.rng.random() < self.throttle_rate:
+                retry_after = 0.5
+            if retry_after:
+                self.stats["throttled"] += 1
+                return retry_after
+            self._recent.append(now)
+            self.in_flight += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.in_flight)
+            return 0.0
+
+    def done(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.stats["served"] += 1
+
+
+def _too_many(retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded", "code": "rate_limit_exceeded"}},
+        status_code=429,
+        headers={"retry-after": f"{retry_after:.2f}"},
+    )
+
+
+def _reply_text(body: dict) -> str:
+    prompt = json.dumps(body.get("messages", []))
+    seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+    words = random.Random(seed).choices(["design", "latency", "cache", "queue", "python", "scale"], k=12)
+    return " ".join(words).capitalize() + "?"
+
+
+def _usage(body: dict, text: str) -> dict:
+    prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+    completion_tokens = len(text.split())
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def create_app(policy: ThrottlePolicy) -> Starlette:
+    async def throttled(request: Request, handler):
+        retry_after = policy.admit()
+        if retry_after:
+            return _too_many(retry_after)
+        try:
+            await asyncio.sleep(policy.latency_ms / 1000)
+            return await handler(await request.json())
+        finally:
+            policy.done()
+
+    async def chat(body: dict):
+        text = _reply_text(body)
+        created = int(time.time())
+        model = body.get("model", "fake")
+        if not body.get("stream"):
+            return JSONResponse({
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": _usage(body, text),
+            })
+
+        def chunk(delta, finish=None):
+            return {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+
+        def events():
+            yield f"data: {json.dumps(chunk({'role': 'assistant', 'content': ''}))}\n\n"
+            for i, word in enumerate(text.split(" ")):
+                yield f"data: {json.dumps(chunk({'content': word if i == 0 else ' ' + word}))}\n\n"
+            yield f"data: {json.dumps(chunk({}, 'stop'))}\n\n"
+            if (body.get("stream_options") or {}).get("include_usage"):
+                usage = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created,
+                         "model": model, "choices": [], "usage": _usage(body, text)}
+                yield f"data: {json.dumps(usage)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def embeddings(body: dict):
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        data = []
+        for i, text in enumerate(inputs):
+            seed = int(hashlib.sha256(json.dumps(text).encode("utf-8")).hexdigest()[:8], 16)
+            vector = np.random.default_rng(seed).standard_normal(body.get("dimensions") or 256).astype(np.float32)
+            vector /= np.linalg.norm(vector)
+            if body.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(len(json.dumps(t)) // 4 for t in inputs)
+        return JSONResponse({"object": "list", "data": data, "model": body.get("model", "fake"),
+                             "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+    async def speech(body: dict):
+        return Response(f"[{body.get('voice')}]{body.get('input')}".encode("utf-8"), media_type="audio/mpeg")
+
+    async def stats(request: Request):
+        return JSONResponse(policy.stats)
+
+    def endpoint(handler):
+        async def route(request: Request):
+            return await throttled(request, handler)
+        return route
+
+    return Starlette(routes=[
+        Route("/v1/chat/completions", endpoint(chat), methods=["POST"]),
+        Route("/v1/embeddings", endpoint(embeddings), methods=["POST"]),
+        Route("/v1/audio/speech", endpoint(speech), methods=["POST"]),
+        Route("/stats", stats),
+    ])
+
+
+def start_in_thread(policy: ThrottlePolicy, host: str = "127.0.0.1") -> str:
+    """Run the fake API on a free port in a daemon thread; returns its base URL (with /v1)."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(create_app(policy), host=host, port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="fake-openai", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Fake OpenAI server failed to start")
+        time.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return f"http://{host}:{port}/v1"
@@ -0,0 +1,304 @@
+"""
+Deterministic local stand-ins for the chat model, embeddings, TTS and STT.
+
+Every fake sleeps according to a configurable latency profile and returns
+output derived only from its input and seed, so benchmark runs are repeatable
+and need no network access or API key.
+"""
+import hashlib
+import io
+import json
+import random
+import threading
+import time
+import uuid
+import wave
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from app.stt import wav_duration
+from app.tts import FakeTTSBackend  # noqa: F401  (re-exported for the benchmark)
+
+_WORDS = (
+    "design system latency cache index query service queue thread python data "
+    "model test deploy review scale team project api database memory trade-off"
+).split()
+
+
+class LatencyProfile:
+    """
+    Latency of one simulated backend call: a log-normally distributed base
+    delay plus a per-unit cost (per output token, per embedded text, ...).
+
+    Args:
+        base_ms: Median fixed delay per call
+        jitter: Log-normal sigma of the fixed delay (0 = constant)
+        per_unit_ms: Extra delay per unit of work
+    """
+
+    def __init__(self, base_ms: float = 0.0, jitter: float = 0.0, per_unit_ms: float = 0.0):
+        self.base_ms = base_ms
+        self.jitter = jitter
+        self.per_unit_ms = per_unit_ms
+
+    def base_delay(self, rng: random.Random) -> float:
+        if not self.base_ms:
+            return 0.0
+        factor = rng.lognormvariate(0.0, self.jitter) if self.jitter else 1.0
+        return self.base_ms * factor / 1000.0
+
+    def unit_delay(self, units: int = 1) -> float:
+        return self.per_unit_ms * units / 1000.0
+
+
+def _rng(seed: int, *parts: str) -> random.Random:
+    """Random generator seeded from the fake's seed and the request content."""
+    digest = hashlib.sha256("\0".join((str(seed),) + parts).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def _sentence(rng: random.Random, words: int, end: str = ".") -> str:
+    body = " ".join(rng.choice(_WORDS) for _ in range(max(1, words)))
+    return body[0].upper() + body[1:] + end
+
+
+def _fill_schema(schema: dict, rng: random.Random) -> dict:
+    """Arguments satisfying a tool's JSON schema (used for structured output)."""
+    args = {}
+    for name, prop in schema.get("properties", {}).items():
+        kind = prop.get("type")
+        if kind == "integer":
+            args[name] = rng.randint(4, 9)
+        elif kind == "number":
+            args[name] = round(rng.uniform(4, 9), 1)
+        elif kind == "boolean":
+            args[name] = rng.random() < 0.5
+        elif kind == "array":
+            args[name] = [_sentence(rng, 6) for _ in range(2)]
+        elif name == "decision":
+            args[name] = rng.choice(["HIRE", "NO HIRE", "HOLD"])
+        else:
+            args[name] = _sentence(rng, 12)
+    return args
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers from the prompt alone, with simulated time to first
+    token and token rate. It recognises the calls the graph makes:
+
+    - router prompt -> a role title
+    - summarizer prompt -> a short summary
+    - structured output (forced tool choice) -> schema-valid arguments
+    - interviewer with retrieval tools -> tool calls on `tool_call_rate` of turns
+    - anything else -> an interview question of about `output_tokens` words
+
+    A first token later than `request_timeout` raises TimeoutError, as the
+    OpenAI client does.
+    """
+
+    model_name: str = "fake-chat"
+    seed: int = 0
+    ttft_ms: float = 300.0
+    ttft_jitter: float = 0.3
+    tokens_per_s: float = 50.0
+    output_tokens: int = 40
+    tool_call_rate: float = 0.5
+    request_timeout: Optional[float] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "seed": self.seed}
+
+    def bind_tools(self, tools, *, tool_choice: Optional[str] = None, **kwargs):
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        if tool_choice is not None:
+            kwargs["tool_choice"] = tool_choice
+        return self.bind(tools=formatted, **kwargs)
+
+    def _respond(self, messages: List[BaseMessage], tools: Optional[list], tool_choice: Optional[str]):
+        """Decide the reply for a request; returns (message, rng)."""
+        system = _text(messages[0]) if messages and isinstance(messages[0], SystemMessage) else ""
+        rng = _rng(self.seed, *(_text(m) for m in messages))
+
+        if tools and tool_choice == "any":
+            function = tools[0]["function"]
+            args = _fill_schema(function.get("parameters", {}), rng)
+            call = {"name": function["name"], "args": args, "id": f"call_{uuid.uuid4().hex[:12]}"}
+            return AIMessage(content="", tool_calls=[call]), rng
+        if tools and not _text(messages[-1]).startswith("Retrieved context") and rng.random() < self.tool_call_rate:
+            calls = [
+                {
+                    "name": tool["function"]["name"],
+                    "args": {"query": _sentence(rng, 5, end="")},
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                }
+                for tool in tools
+            ]
+            return AIMessage(content="", tool_calls=calls), rng
+        if "HR Orchestrator" in system:
+            return AIMessage(content="Senior Python Developer"), rng
+        if "running summary" in system:
+            return AIMessage(content=_sentence(rng, self.output_tokens)), rng
+
+        words = max(3, self.output_tokens)
+        sentences = []
+        while words > 0:
+            n = min(words, rng.randint(8, 16))
+            sentences.append(_sentence(rng, n, end="." if words > n else "?"))
+            words -= n
+        return AIMessage(content=" ".join(sentences)), rng
+
+    def _usage(self, messages: List[BaseMessage], reply: AIMessage) -> dict:
+        input_tokens = sum(len(_text(m)) // 4 + 4 for m in messages)
+        output_tokens = len(_text(reply).split()) + sum(len(json.dumps(c["args"])) // 4 for c in reply.tool_calls)
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        reply, rng = self._respond(messages, kwargs.get("tools"), kwargs.get("tool_choice"))
+        usage = self._usage(messages, reply)
+        self._wait_first_token(rng)
+        time.sleep(usage["output_tokens"] / self.tokens_per_s)
+        reply.usage_metadata = usage
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        reply, rng = self._respond(messages, kwargs.get("tools"), kwargs.get("tool_choice"))
+        usage = self._usage(messages, reply)
+        self._wait_first_token(rng)
+        if reply.tool_calls:
+            # Arguments arrive a token (about 4 characters) at a time, as from a real provider
+            pieces = [
+                (i, c, piece)
+                for i, c in enumerate(reply.tool_calls)
+                for args in [json.dumps(c["args"])]
+                for piece in [args[j:j + 4] for j in range(0, len(args), 4)]
+            ]
+            delay = usage["output_tokens"] / self.tokens_per_s / max(1, len(pieces))
+            started = set()
+            for i, c, piece in pieces:
+                time.sleep(delay)
+                first = i not in started
+                started.add(i)
+                chunk = {"name": c["name"] if first else None, "args": piece, "id": c["id"] if first else None, "index": i}
+                yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[chunk]))
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+            return
+        words = _text(reply).split(" ")
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(1.0 / self.tokens_per_s)
+            token = word if i == 0 else f" {word}"
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+    def _wait_first_token(self, rng: random.Random) -> None:
+        ttft = LatencyProfile(self.ttft_ms, self.ttft_jitter).base_delay(rng)
+        if self.request_timeout is not None and ttft > self.request_timeout:
+            time.sleep(self.request_timeout)
+            raise TimeoutError("Request timed out.")
+        time.sleep(ttft)
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic unit vectors derived from a hash of the text, with simulated request latency."""
+
+    def __init__(self, size: int = 256, latency: Optional[LatencyProfile] = None, seed: int = 0):
+        self.size = size
+        self.latency = latency or LatencyProfile()
+        self.seed = seed
+        self.requests = 0
+        self.texts = 0
+        self._lock = threading.Lock()
+
+    def _vector(self, text: str) -> List[float]:
+        digest = hashlib.sha256(f"{self.seed}\0{text}".encode("utf-8")).digest()
+        vector = np.random.default_rng(int.from_bytes(digest[:8], "big")).standard_normal(self.size)
+        return (vector / np.linalg.norm(vector)).astype(np.float32).tolist()
+
+    def _wait(self, texts: List[str]) -> None:
+        with self._lock:
+            self.requests += 1
+            self.texts += len(texts)
+        rng = _rng(self.seed, *texts[:1])
+        time.sleep(self.latency.base_delay(rng) + self.latency.unit_delay(len(texts)))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self._wait(texts)
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self._wait([text])
+        return self._vector(text)
+
+
+class FakeSTTBackend:
+    """
+    Speech-to-text stand-in. WAV audio gets a transcript of plausible length for its
+    duration; any other "audio" is taken to be the UTF-8 transcript itself.
+    Latency grows with the upload size and the audio duration, like a real request.
+    """
+
+    def __init__(self, latency: Optional[LatencyProfile] = None, per_audio_s: float = 0.0, seed: int = 0):
+        self.latency = latency or LatencyProfile()
+        self.per_audio_s = per_audio_s
+        self.seed = seed
+        self.calls = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio: bytes, filename: str = "audio.wav") -> str:
+        with self._lock:
+            self.calls += 1
+            self.bytes_received += len(audio)
+        rng = _rng(self.seed, hashlib.sha256(audio).hexdigest())
+        duration = wav_duration(audio)
+        time.sleep(
+            self.latency.base_delay(rng) + self.latency.unit_delay(len(audio) // 1000)
+            + (duration or 0.0) * self.per_audio_s
+        )
+        if duration is None:
+            return audio.decode("utf-8")
+        return _sentence(rng, max(1, round(duration * 2.5)))
+
+
+def synth_speech(text: str, sample_rate: int = 48000, seed: int = 0) -> bytes:
+    """
+    Speech-like 16-bit mono WAV for `text`, as a browser recorder would produce: a voiced
+    burst per word, short gaps between words and longer pauses after sentences.
+    """
+    rng = np.random.default_rng(int.from_bytes(hashlib.sha256(f"{seed}:{text}".encode("utf-8")).digest()[:8], "big"))
+    word_n, gap_n, pause_n = int(0.28 * sample_rate), int(0.08 * sample_rate), int(0.7 * sample_rate)
+    t = np.arange(word_n) / sample_rate
+    envelope = np.sin(np.pi * t / t[-1]) ** 0.5
+    parts = [np.zeros(int(0.3 * sample_rate))]
+    for word in text.split():
+        pitch = rng.uniform(110, 220)
+        voiced = np.sin(2 * np.pi * pitch * t) + 0.5 * np.sin(4 * np.pi * pitch * t) + 0.2 * rng.standard_normal(word_n)
+        parts.append(0.3 * envelope * voiced)
+        parts.append(np.zeros(pause_n if word[-1] in ".?!" else gap_n))
+    samples = np.concatenate(parts) + 0.002 * rng.standard_normal(sum(len(p) for p in parts))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
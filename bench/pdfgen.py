@@ -0,0 +1,62 @@
+"""
+Minimal PDF writer for ingest benchmarks.
+
+Produces valid single-font text PDFs of any page count without extra
+dependencies, so ingest can be measured on documents of controlled size.
+"""
+import random
+from typing import List
+
+_WORDS = (
+    "experience python distributed systems kubernetes latency ownership mentoring "
+    "postgres streaming pipelines testing reliability product customers roadmap "
+    "architecture migration observability security performance collaboration"
+).split()
+
+
+def lorem_pages(pages: int, words_per_page: int = 350, seed: int = 0) -> List[str]:
+    """Deterministic filler text, one string per page."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(_WORDS) for _ in range(words_per_page)) for _ in range(pages)]
+
+
+def make_pdf(pages: List[str], line_chars: int = 90) -> bytes:
+    """
+    Build a PDF with one page per string.
+
+    Args:
+        pages: Text of each page (parentheses and backslashes are dropped)
+        line_chars: Characters per text line
+
+    Returns:
+        PDF file content
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for i, text in enumerate(pages):
+        page_id, content_id = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{page_id} 0 R")
+        clean = text.replace("\\", "").replace("(", "").replace(")", "")
+        lines = [clean[j:j + line_chars] for j in range(0, len(clean), line_chars)]
+        stream = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF".encode()
+    return bytes(out)
@@ -0,0 +1,471 @@
+"""
+Offline benchmark and load test for the interview engine.
+
+Runs the compiled graph from `app/graph.py` against the local stand-ins in
+`bench.fakes` (no network, no API key) and reports:
+
+- ingest time for generated PDFs of several sizes, cold and warm
+- N scripted interviews replayed concurrently: turns/s, time to first
+  streamed token and per-turn wall time
+- per-span p50/p95/p99 from the telemetry recorder (nodes, LLM calls,
+  retrieval, embeddings, audio)
+- peak RSS
+
+Usage:
+    python -m bench.run --interviews 16 --concurrency 8 --output bench.json
+    python -m bench.run --baseline bench.json --tolerance 0.2   # exit 1 on regression
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Optional
+
+DEFAULT_SCRIPT = [
+    "I have six years of Python experience, mostly building data pipelines and internal APIs.",
+    "I would put a queue in front of the workers and make each job idempotent so retries are safe.",
+    "We cached the hot queries in Redis and cut p95 latency from 800 ms to about 120 ms.",
+    "Here is how I would deduplicate the events.\n\n### CANDIDATE CODE SUBMISSION:\n```\n"
+    "def dedupe(events):\n    seen = set()\n    for e in events:\n        if e.id not in seen:\n"
+    "            seen.add(e.id)\n            yield e\n```",
+    "I mentor two junior engineers and run our weekly design review.",
+    "Thanks, I don't have further questions.",
+]
+
+
+def _configure_environment(workdir: str, args) -> None:
+    """Point every cache at a scratch directory; must run before `app` is imported."""
+    os.environ["INDEX_STORE_DIR"] = os.path.join(workdir, "indexes")
+    os.environ["EMBEDDING_CACHE_DIR"] = os.path.join(workdir, "embeddings")
+    os.environ["TTS_CACHE_DIR"] = os.path.join(workdir, "tts")
+    os.environ["JD_PRECOMPUTE_DIR"] = os.path.join(workdir, "jd")
+    os.environ["TRANSCRIPT_DB"] = os.path.join(workdir, "transcripts.sqlite")
+    os.environ["CHECKPOINTER"] = "memory"
+    os.environ["TELEMETRY_ENABLED"] = "true"
+    os.environ["TELEMETRY_JSONL"] = args.spans_jsonl or ""
+    os.environ["TELEMETRY_BUFFER_SIZE"] = str(1_000_000)
+    # The OpenAI clients are never called, but constructing them needs a key
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def bench_ingest(page_counts: List[int]) -> List[dict]:
+    """Ingest a generated PDF of each size twice: cold (new content) and warm (already indexed)."""
+    from app.rag_utils import get_ingest_stats, get_retriever_registry, process_pdf
+    from app.ingest import warm_parse_pool
+    from bench.pdfgen import lorem_pages, make_pdf
+
+    # The service starts its parse workers at startup; do the same so cold ingests don't include it
+    wait(warm_parse_pool())
+    results = []
+    for pages in page_counts:
+        pdf = make_pdf(lorem_pages(pages, seed=pages))
+        start = time.perf_counter()
+        index_id = process_pdf(io.BytesIO(pdf))
+        cold = time.perf_counter() - start
+        ingest_stats = get_ingest_stats(index_id) or {}
+        start = time.perf_counter()
+        process_pdf(io.BytesIO(pdf))
+        warm = time.perf_counter() - start
+        results.append({
+            "pages": pages,
+            "bytes": len(pdf),
+            "chunks": get_retriever_registry().get(index_id).index.ntotal,
+            "cold_s": round(cold, 4),
+            "first_chunk_s": ingest_stats.get("first_chunk_s"),
+            "warm_s": round(warm, 4),
+        })
+    return results
+
+
+def run_interview(graph, answers: List[str], jd_index_id: Optional[str], resume_index_id: Optional[str],
+                  tts_engine=None, stt=None, think_s: float = 0.0) -> dict:
+    """
+    Replay one scripted interview on its own thread ID.
+    The candidate takes `think_s` to answer each question (not counted in turn times).
+
+    Returns:
+        Per-turn wall times, times to first streamed token and whether the evaluation was produced
+    """
+    from langchain_core.messages import HumanMessage
+    from app import telemetry
+    from app.compaction import CODE_SUBMISSION_MARKER
+    from app.streaming import STREAM_TAG
+    from bench.fakes import synth_speech
+
+    thread_id = uuid.uuid4().hex
+    config = {"configurable": {"thread_id": thread_id}}
+    initial_state = {
+        "messages": [HumanMessage(content="Start the interview.")],
+        "job_description": "Senior Python Developer working on data-intensive backend services.",
+        "candidate_details": "Six years of Python, distributed systems and mentoring.",
+        "interview_role": None,
+        "num_questions_asked": 0,
+        "interview_status": "active",
+        "jd_index_id": jd_index_id,
+        "resume_index_id": resume_index_id,
+    }
+    turn_s, ttft_s, stt_stats = [], [], []
+    with telemetry.session(thread_id):
+        for answer in [None] + answers:
+            if answer is not None and think_s:
+                time.sleep(think_s)
+            start = time.perf_counter()
+            if answer is None:
+                payload = initial_state
+            else:
+                if stt is not None:
+                    # The spoken part is recorded; code is submitted as text, as in the UI
+                    speech, marker, code = answer.partition(CODE_SUBMISSION_MARKER)
+                    text, transcription = stt.transcribe(synth_speech(speech.strip(), seed=int(thread_id[:8], 16)))
+                    stt_stats.append(transcription)
+                    answer = text + (f"\n\n{marker}{code}" if marker else "")
+                payload = {"messages": [HumanMessage(content=answer)]}
+            first_token = None
+            message_id = None
+            pipeline = None
+            for mode, data in graph.stream(payload, config=config, stream_mode=["updates", "custom", "messages"]):
+                if mode != "messages":
+                    continue
+                chunk, metadata = data
+                if STREAM_TAG not in metadata.get("tags", []) or not isinstance(chunk.content, str) or not chunk.content:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                if tts_engine is not None:
+                    if chunk.id != message_id:
+                        message_id = chunk.id
+                        if pipeline is not None:
+                            pipeline.cancel()
+                        pipeline = tts_engine.pipeline()
+                    pipeline.feed(chunk.content)
+            if pipeline is not None:
+                pipeline.close()
+                pipeline.audio()
+            turn_s.append(time.perf_counter() - start)
+            if first_token is not None:
+                ttft_s.append(first_token)
+            if graph.get_state(config).values.get("detailed_evaluation"):
+                break
+    completed = bool(graph.get_state(config).values.get("detailed_evaluation"))
+    return {"turn_s": turn_s, "ttft_s": ttft_s, "stt": stt_stats, "completed": completed}
+
+
+def bench_load(graph, interviews: int, concurrency: int, answers: List[str], jd_index_id, resume_index_id,
+               tts_engine=None, stt=None, think_s: float = 0.0) -> dict:
+    """Run `interviews` scripted interviews, `concurrency` at a time."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="interview") as pool:
+        futures = [
+            pool.submit(run_interview, graph, answers, jd_index_id, resume_index_id, tts_engine, stt, think_s)
+            for _ in range(interviews)
+        ]
+        results = [f.result() for f in futures]
+    return _load_summary(results, time.perf_counter() - start, interviews, concurrency)
+
+
+async def _service_interview(service, answers: List[str], context: dict, think_s: float = 0.0) -> dict:
+    """Async counterpart of `run_interview`, driving `InterviewService.run_turn`."""
+    import asyncio
+
+    thread_id = uuid.uuid4().hex
+    turn_s, ttft_s = [], []
+    for i, answer in enumerate(["Start"] + answers):
+        if i and think_s:
+            await asyncio.sleep(think_s)
+        start = time.perf_counter()
+        first_token = None
+        async for event in service.run_turn(thread_id, answer, context=context if i == 0 else None):
+            if event["type"] == "token" and first_token is None:
+                first_token = time.perf_counter() - start
+        turn_s.append(time.perf_counter() - start)
+        if first_token is not None:
+            ttft_s.append(first_token)
+        if (await service.get_state(thread_id)).get("detailed_evaluation"):
+            break
+    completed = bool((await service.get_state(thread_id)).get("detailed_evaluation"))
+    return {"turn_s": turn_s, "ttft_s": ttft_s, "completed": completed}
+
+
+def bench_service_load(interviews: int, concurrency: int, answers: List[str], jd_index_id, resume_index_id,
+                       think_s: float = 0.0) -> dict:
+    """Run the interviews through the async service (`app.service`): all sessions on one event loop."""
+    import asyncio
+    from app.checkpoint import create_async_checkpointer
+    from app.config import SERVICE_WORKERS
+    from app.graph import build_graph
+    from app.service import InterviewService
+
+    context = {
+        "job_description": "Senior Python Developer working on data-intensive backend services.",
+        "candidate_details": "Six years of Python, distributed systems and mentoring.",
+        "jd_index_id": jd_index_id,
+        "resume_index_id": resume_index_id,
+    }
+
+    async def main():
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=SERVICE_WORKERS, thread_name_prefix="node")
+        )
+        service = InterviewService(build_graph(await create_async_checkpointer("memory")))
+        gate = asyncio.Semaphore(concurrency)
+
+        async def bounded():
+            async with gate:
+                return await _service_interview(service, answers, context, think_s)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded() for _ in range(interviews)))
+        return results, time.perf_counter() - start
+
+    results, wall = asyncio.run(main())
+    return _load_summary(results, wall, interviews, concurrency)
+
+
+def _load_summary(results: List[dict], wall: float, interviews: int, concurrency: int) -> dict:
+    turn_s = [t for r in results for t in r["turn_s"]]
+    ttft_s = [t for r in results for t in r["ttft_s"]]
+    stt = [t for r in results for t in r.get("stt", [])]
+    summary = {
+        "interviews": interviews,
+        "concurrency": concurrency,
+        "completed": sum(r["completed"] for r in results),
+        "turns": len(turn_s),
+        "wall_s": round(wall, 3),
+        "turns_per_s": round(len(turn_s) / wall, 3) if wall else 0.0,
+        "turn_p50_s": round(_percentile(turn_s, 0.50), 4),
+        "turn_p95_s": round(_percentile(turn_s, 0.95), 4),
+        "turn_p99_s": round(_percentile(turn_s, 0.99), 4),
+        "ttft_p50_s": round(_percentile(ttft_s, 0.50), 4),
+        "ttft_p95_s": round(_percentile(ttft_s, 0.95), 4),
+        "ttft_p99_s": round(_percentile(ttft_s, 0.99), 4),
+    }
+    if stt:
+        stt_s = [t["latency_s"] for t in stt]
+        summary.update(
+            stt_p50_s=round(_percentile(stt_s, 0.50), 4),
+            stt_p95_s=round(_percentile(stt_s, 0.95), 4),
+            stt_recorded_mb=round(sum(t["input_bytes"] for t in stt) / 1e6, 3),
+            stt_uploaded_mb=round(sum(t["uploaded_bytes"] for t in stt) / 1e6, 3),
+        )
+    return summary
+
+
+class RawSpeechToText:
+    """The previous voice path, for comparison: the recording uploaded as is, in one request."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def transcribe(self, audio: bytes):
+        from app.telemetry import span
+
+        start = time.perf_counter()
+        with span("stt.transcribe", kind="audio", bytes=len(audio)):
+            text = self.backend.transcribe(audio, "audio.wav")
+        return text, {"input_bytes": len(audio), "uploaded_bytes": len(audio), "latency_s": time.perf_counter() - start}
+
+
+def _transcript_store_report(store) -> Optional[dict]:
+    """Write counters of the transcript store, and the latency of a dashboard query once everything is written."""
+    if store is None:
+        return None
+    store.flush()
+    start = time.perf_counter()
+    hold = store.interviews(decision="HOLD", since=time.time() - 7 * 86400)
+    return {**store.stats(), "hold_this_week": len(hold), "query_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+
+def _metrics(report: dict) -> dict:
+    """Flatten a report into {metric: (value, higher_is_better)} for baseline comparison."""
+    metrics = {"load.turns_per_s": (report["load"]["turns_per_s"], True)}
+    for key in ("turn_p95_s", "ttft_p95_s"):
+        metrics[f"load.{key}"] = (report["load"][key], False)
+    for row in report["ingest"]:
+        metrics[f"ingest.{row['pages']}p.cold_s"] = (row["cold_s"], False)
+        metrics[f"ingest.{row['pages']}p.warm_s"] = (row["warm_s"], False)
+        if row.get("first_chunk_s") is not None:
+            metrics[f"ingest.{row['pages']}p.first_chunk_s"] = (row["first_chunk_s"], False)
+    for row in report["spans"]:
+        metrics[f"span.{row['name']}.p95_s"] = (row["p95_s"], False)
+    metrics["peak_rss_mb"] = (report["peak_rss_mb"], False)
+    return metrics
+
+
+def compare(report: dict, baseline: dict, tolerance: float, min_delta_s: float = 0.005) -> List[str]:
+    """
+    Compare a report against a baseline report.
+
+    Args:
+        report: Report from this run
+        baseline: Earlier report
+        tolerance: Allowed relative slowdown (0.2 = 20%)
+        min_delta_s: Absolute change below which timing differences are treated as noise
+
+    Returns:
+        One line per regressed metric (empty when within tolerance)
+    """
+    current, previous = _metrics(report), _metrics(baseline)
+    regressions = []
+    for name, (value, higher_is_better) in current.items():
+        if name not in previous:
+            continue
+        base = previous[name][0]
+        if higher_is_better:
+            regressed = value < base * (1 - tolerance)
+        else:
+            regressed = value > base * (1 + tolerance) and (not name.endswith("_s") or value - base > min_delta_s)
+        if regressed:
+            regressions.append(f"{name}: {base} -> {value}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark and load test for the interview engine.")
+    parser.add_argument("--interviews", type=int, default=8, help="Scripted interviews to run")
+    parser.add_argument("--concurrency", type=int, default=4, help="Interviews running at the same time")
+    parser.add_argument("--script", help="JSON file with a list of candidate answers to replay")
+    parser.add_argument("--pdf-pages", default="1,10,50", help="Comma-separated page counts for the ingest benchmark")
+    parser.add_argument("--no-rag", action="store_true", help="Run interviews without JD/resume indexes")
+    parser.add_argument("--service", action="store_true", help="Drive interviews through the async service instead of threads")
+    parser.add_argument("--audio", action="store_true", help="Transcribe answers and synthesize questions with the fake audio backends")
+    parser.add_argument("--think-ms", type=float, default=0.0,
+                        help="Time the candidate takes to answer each question (lets prefetch run)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-ttft-ms", type=float, default=300.0, help="Median time to first token")
+    parser.add_argument("--llm-jitter", type=float, default=0.3, help="Log-normal sigma of the time to first token")
+    parser.add_argument("--llm-tokens-per-s", type=float, default=50.0)
+    parser.add_argument("--llm-output-tokens", type=int, default=40, help="Words per generated question")
+    parser.add_argument("--tier-speed", default="fast=0.4,standard=1,strong=2.5",
+                        help="Time-to-first-token multiplier (and token rate divisor) of each model tier")
+    parser.add_argument("--single-model", action="store_true",
+                        help="Serve every model tier with the standard-tier model (no tiering)")
+    parser.add_argument("--tool-call-rate", type=float, default=0.5, help="Share of interviewer turns that call retrieval tools")
+    parser.add_argument("--embed-ms", type=float, default=80.0, help="Median latency per embedding request")
+    parser.add_argument("--embed-per-text-ms", type=float, default=0.5)
+    parser.add_argument("--tts-ms", type=float, default=150.0, help="Latency per synthesized sentence")
+    parser.add_argument("--stt-ms", type=float, default=200.0, help="Median latency per transcription")
+    parser.add_argument("--stt-per-kb-ms", type=float, default=1.0, help="Upload time per KB of audio")
+    parser.add_argument("--stt-per-audio-s", type=float, default=0.05, help="Transcription time per second of audio")
+    parser.add_argument("--stt-raw", action="store_true", help="Upload recordings whole and unconverted (the old voice path)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--spans-jsonl", help="Also write every span to this JSONL file")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression against the baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="interview-bench-")
+    _configure_environment(workdir, args)
+
+    from app import telemetry
+    from app.graph import build_graph
+    from app.model_tiers import get_model_tiers
+    from app.prefetch import get_prefetcher
+    from app.providers import use_providers
+    from app.rag_utils import process_pdf
+    from app.stt import SpeechToText, TranscriptCache
+    from app.transcript_store import get_transcript_store
+    from app.tts import AudioCache, TTSEngine
+    from bench.fakes import FakeChatModel, FakeEmbeddings, FakeSTTBackend, FakeTTSBackend, LatencyProfile
+    from bench.pdfgen import lorem_pages, make_pdf
+
+    def chat_model(tier: str, speed: float):
+        return FakeChatModel(
+            model_name=f"fake-{tier}",
+            seed=args.seed,
+            ttft_ms=args.llm_ttft_ms * speed,
+            ttft_jitter=args.llm_jitter,
+            tokens_per_s=args.llm_tokens_per_s / speed,
+            output_tokens=args.llm_output_tokens,
+            tool_call_rate=args.tool_call_rate,
+            callbacks=[telemetry.TelemetryCallbackHandler()],
+        )
+
+    tier_speed = {tier: float(speed) for tier, speed in (part.split("=") for part in args.tier_speed.split(","))}
+    standard = chat_model("standard", tier_speed.get("standard", 1.0))
+    use_providers(
+        chat_model=standard,
+        tier_models=None if args.single_model else {
+            tier: chat_model(tier, speed) for tier, speed in tier_speed.items() if tier != "standard"
+        },
+        embeddings=FakeEmbeddings(latency=LatencyProfile(args.embed_ms, 0.2, args.embed_per_text_ms), seed=args.seed),
+    )
+    answers = DEFAULT_SCRIPT
+    if args.script:
+        with open(args.script) as f:
+            answers = json.load(f)
+
+    page_counts = [int(p) for p in args.pdf_pages.split(",") if p.strip()]
+    ingest = bench_ingest(page_counts)
+
+    jd_index_id = resume_index_id = None
+    if not args.no_rag:
+        jd_index_id = process_pdf(io.BytesIO(make_pdf(lorem_pages(2, seed=1001))))
+        resume_index_id = process_pdf(io.BytesIO(make_pdf(lorem_pages(1, seed=1002))))
+
+    tts_engine = stt = None
+    if args.audio:
+        tts_engine = TTSEngine(FakeTTSBackend(latency=args.tts_ms / 1000), AudioCache(os.path.join(workdir, "tts"), 1 << 30))
+        stt_backend = FakeSTTBackend(
+            latency=LatencyProfile(args.stt_ms, 0.2, args.stt_per_kb_ms), per_audio_s=args.stt_per_audio_s, seed=args.seed
+        )
+        stt = RawSpeechToText(stt_backend) if args.stt_raw else SpeechToText(stt_backend, TranscriptCache(256))
+
+    # Span percentiles cover the load test only; ingest has its own timings above
+    telemetry.recorder.clear()
+    if args.service:
+        load = bench_service_load(args.interviews, args.concurrency, answers, jd_index_id, resume_index_id,
+                                  args.think_ms / 1000)
+    else:
+        load = bench_load(build_graph(), args.interviews, args.concurrency, answers, jd_index_id, resume_index_id,
+                          tts_engine, stt, args.think_ms / 1000)
+
+    report = {
+        "config": vars(args),
+        "ingest": ingest,
+        "load": load,
+        "spans": telemetry.recorder.summary(),
+        "prefetch": get_prefetcher().stats(),
+        "models": get_model_tiers().stats(),
+        "transcript_store": _transcript_store_report(get_transcript_store()),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if load["completed"] < load["interviews"]:
+        print(f"{load['interviews'] - load['completed']} interview(s) did not reach the evaluation", file=sys.stderr)
+        return 1
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions beyond tolerance:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Rate-limit load test for the client pool (app/client_pool.py).
+
+Starts the throttling fake API from `bench.fake_openai`, points the real
+process-wide OpenAI clients at it and fires a burst of chat, embedding and
+speech requests (a share of them identical, to exercise coalescing). Reports
+client-side success and latency, server-side 429s and the pool's metrics.
+
+Usage:
+    python -m bench.throttle --requests 400 --threads 64 --server-concurrency 16
+    python -m bench.throttle --no-pool    # same burst straight to the API, SDK retries only
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from bench.fake_openai import ThrottlePolicy, start_in_thread
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Client pool load test against a throttling fake API.")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=64, help="Concurrent callers")
+    parser.add_argument("--duplicate-rate", type=float, default=0.3, help="Share of requests identical to another one")
+    parser.add_argument("--mix", default="chat=0.5,embeddings=0.4,audio=0.1", help="Request kinds and weights")
+    parser.add_argument("--server-concurrency", type=int, default=16)
+    parser.add_argument("--server-rpm", type=int, default=0, help="Server requests/minute limit (0 = none)")
+    parser.add_argument("--server-latency-ms", type=float, default=100.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.02, help="Probability of a spurious 429")
+    parser.add_argument("--no-pool", action="store_true", help="Disable the client pool")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    policy = ThrottlePolicy(args.server_concurrency, args.server_rpm, args.throttle_rate, args.server_latency_ms, args.seed)
+    base_url = start_in_thread(policy)
+    # Configure the real clients before app.config is imported
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_BASE"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+    os.environ["CLIENT_POOL_ENABLED"] = "false" if args.no_pool else "true"
+
+    from langchain_openai import OpenAIEmbeddings
+    from app.config import EMBEDDING_MODEL
+    from app.providers import get_llm, get_openai_client, get_transport, http_client
+
+    llm = get_llm()
+    # Token-array inputs need tiktoken data, which may not be available offline
+    embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL, http_client=http_client(), check_embedding_ctx_length=False,
+                                  max_retries=0 if get_transport() else 2)
+    audio = get_openai_client()
+
+    rng = random.Random(args.seed)
+    kinds, weights = zip(*((k, float(w)) for k, w in (part.split("=") for part in args.mix.split(","))))
+    jobs = []
+    for i in range(args.requests):
+        kind = rng.choices(kinds, weights)[0]
+        # Duplicates reuse a small set of payloads so they overlap in flight
+        payload = f"duplicate {rng.randrange(8)}" if rng.random() < args.duplicate_rate else f"request {i}"
+        jobs.append((kind, payload))
+
+    def call(job):
+        kind, payload = job
+        start = time.perf_counter()
+        try:
+            if kind == "chat":
+                llm.invoke(f"Ask one interview question about {payload}")
+            elif kind == "embeddings":
+                embeddings.embed_documents([f"{payload} chunk {j}" for j in range(4)])
+            else:
+                audio.audio.speech.create(model="tts-1", voice="alloy", input=f"Question about {payload}.").read()
+            return kind, time.perf_counter() - start, None
+        except Exception as e:
+            return kind, time.perf_counter() - start, type(e).__name__
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(call, jobs))
+    wall = time.perf_counter() - start
+
+    latencies = [latency for _, latency, error in results if error is None]
+    failures = {}
+    for _, _, error in results:
+        if error:
+            failures[error] = failures.get(error, 0) + 1
+    transport = get_transport()
+    report = {
+        "pool": not args.no_pool,
+        "requests": len(results),
+        "succeeded": len(latencies),
+        "failures": failures,
+        "wall_s": round(wall, 3),
+        "latency_p50_s": round(_percentile(latencies, 0.50), 4),
+        "latency_p95_s": round(_percentile(latencies, 0.95), 4),
+        "latency_p99_s": round(_percentile(latencies, 0.99), 4),
+        "server": httpx.get(base_url.rsplit("/v1", 1)[0] + "/stats").json(),
+        "client_pool": transport.stats() if transport else None,
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+Tests of the client pool (app/client_pool.py) against httpx.MockTransport: token
+buckets, the AIMD limiter, retries, coalescing, admission timeouts and slot accounting.
+
+Run with `python -m pytest tests`.
+"""
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.client_pool import AIMDLimiter, ClientPool, PooledTransport, TokenBucket
+
+API = "https://api.test/v1"
+
+
+def make_transport(handler, limit: int = 4, max_retries: int = 2, rpm: float = 60000):
+    """Pooled transport in front of a mock upstream, with one pool per request kind."""
+    pools = {
+        kind: ClientPool(kind, rpm, None, AIMDLimiter(limit, 1, 64))
+        for kind in ("chat", "embeddings", "audio")
+    }
+    mock = httpx.MockTransport(handler)
+    return PooledTransport(
+        pools, httpx.Limits(), max_retries=max_retries, backoff_base=0.001, backoff_max=0.01,
+        transport=mock, async_transport=mock,
+    )
+
+
+def chat(client: httpx.Client, temperature: float = 0.7, timeout=None) -> httpx.Response:
+    body = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "temperature": temperature}
+    kwargs = {} if timeout is None else {"timeout": timeout}
+    return client.post(f"{API}/chat/completions", json=body, **kwargs)
+
+
+def in_flight(transport: PooledTransport) -> int:
+    return sum(pool.in_flight for pool in transport.pools.values())
+
+
+# --- Token bucket and limiter ---
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(per_minute=60, capacity=2)
+    now = bucket.updated
+    assert bucket.wait_time(2, now) == 0.0
+    bucket.take(2)
+    # One token per second
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1.0) == 0.0
+
+
+def test_token_bucket_admits_oversized_request_when_full():
+    bucket = TokenBucket(per_minute=60, capacity=10)
+    assert bucket.wait_time(1000, bucket.updated) == 0.0
+
+
+def test_aimd_grows_on_success_and_halves_on_throttle():
+    limiter = AIMDLimiter(4, 1, 16)
+    for _ in range(8):
+        limiter.on_success(0.1)
+    assert limiter.limit > 5
+    before = limiter.limit
+    limiter.on_throttle()
+    assert limiter.limit == pytest.approx(before / 2)
+
+
+def test_aimd_shrinks_on_latency_spike_and_respects_bounds():
+    limiter = AIMDLimiter(4, 2, 16)
+    limiter.on_success(0.1)
+    limiter.on_success(10.0)
+    assert limiter.limit < 4
+    for _ in range(10):
+        limiter.on_throttle()
+    assert limiter.limit == 2
+
+
+# --- Retries and slot accounting ---
+
+def test_retries_throttled_responses_then_succeeds():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            return httpx.Response(429, headers={"retry-after": "0"})
+        return httpx.Response(200, json={"ok": True})
+
+    transport = make_transport(handler)
+    with httpx.Client(transport=transport) as client:
+        response = chat(client)
+    assert response.status_code == 200
+    assert len(calls) == 3
+    stats = transport.stats()["chat"]
+    assert stats["throttled"] == 2 and stats["retries"] == 2
+    assert in_flight(transport) == 0
+
+
+def test_gives_up_after_max_retries():
+    transport = make_transport(lambda request: httpx.Response(503), max_retries=2)
+    with httpx.Client(transport=transport) as client:
+        assert chat(client).status_code == 503
+    assert transport.stats()["chat"]["requests"] == 3
+    assert in_flight(transport) == 0
+
+
+def test_retries_connect_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={})
+
+    transport = make_transport(handler)
+    with httpx.Client(transport=transport) as client:
+        assert chat(client).status_code == 200
+    assert len(calls) == 2
+    assert in_flight(transport) == 0
+
+
+def test_does_not_retry_timeouts():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ReadTimeout("slow", request=request)
+
+    transport = make_transport(handler)
+    with httpx.Client(transport=transport) as client, pytest.raises(httpx.ReadTimeout):
+        chat(client)
+    assert len(calls) == 1
+    assert in_flight(transport) == 0
+
+
+def test_releases_slot_on_unexpected_error():
+    def handler(request):
+        raise ValueError("bug in the upstream transport")
+
+    transport = make_transport(handler, limit=1)
+    with httpx.Client(transport=transport) as client:
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                chat(client, timeout=1.0)
+    assert in_flight(transport) == 0
+
+
+def test_streamed_response_holds_slot_until_closed():
+    transport = make_transport(lambda request: httpx.Response(200, content=b"data: {}\n\n"))
+    body = {"model": "m", "messages": [], "stream": True}
+    with httpx.Client(transport=transport) as client:
+        with client.stream("POST", f"{API}/chat/completions", json=body) as response:
+            assert in_flight(transport) == 1
+            response.read()
+    assert in_flight(transport) == 0
+
+
+# --- Admission timeout ---
+
+def test_admission_wait_is_bounded_by_pool_timeout():
+    started, finish = threading.Event(), threading.Event()
+
+    def handler(request):
+        started.set()
+        finish.wait(5)
+        return httpx.Response(200, json={})
+
+    transport = make_transport(handler, limit=1)
+    with httpx.Client(transport=transport) as client:
+        holder = threading.Thread(target=chat, args=(client,))
+        holder.start()
+        started.wait(5)
+        with pytest.raises(httpx.PoolTimeout):
+            chat(client, timeout=httpx.Timeout(5.0, pool=0.1))
+        finish.set()
+        holder.join()
+    assert in_flight(transport) == 0
+    assert transport.pools["chat"].queue_depth == 0
+
+
+# --- Coalescing ---
+
+def _concurrent(func, n: int) -> list:
+    results = [None] * n
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, func())) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def _slow_counter():
+    calls = []
+    lock = threading.Lock()
+
+    def handler(request):
+        with lock:
+            calls.append(request)
+        # Long enough for the concurrent callers to find the request in flight
+        time.sleep(0.2)
+        return httpx.Response(200, json={"n": len(calls)})
+
+    return calls, handler
+
+
+def test_coalesces_identical_embedding_requests():
+    calls, handler = _slow_counter()
+    transport = make_transport(handler)
+    with httpx.Client(transport=transport) as client:
+        body = {"model": "e", "input": ["same chunk"]}
+        responses = _concurrent(lambda: client.post(f"{API}/embeddings", json=body), 4)
+    assert len(calls) == 1
+    assert all(r.json() == responses[0].json() for r in responses)
+    assert transport.stats()["embeddings"]["coalesced"] == 3
+
+
+def test_does_not_coalesce_sampled_chat_completions():
+    calls, handler = _slow_counter()
+    transport = make_transport(handler)
+    with httpx.Client(transport=transport) as client:
+        _concurrent(lambda: chat(client, temperature=0.7), 3)
+    assert len(calls) == 3
+    assert transport.stats()["chat"]["coalesced"] == 0
+
+
+def test_coalesces_chat_completions_at_temperature_zero():
+    calls, handler = _slow_counter()
+    transport = make_transport(handler)
+    with httpx.Client(transport=transport) as client:
+        _concurrent(lambda: chat(client, temperature=0), 3)
+    assert len(calls) == 1
+
+
+# --- Async path ---
+
+def test_async_retries_and_releases():
+    calls = []
+
+    def handler(request):
+        calls.append(json.loads(request.content))
+        if len(calls) == 1:
+            return httpx.Response(500)
+        if len(calls) == 2:
+            raise httpx.ReadTimeout("slow", request=request)
+        return httpx.Response(200, json={})
+
+    transport = make_transport(handler)
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            body = {"model": "m", "messages": [], "temperature": 0}
+            with pytest.raises(httpx.ReadTimeout):
+                await client.post(f"{API}/chat/completions", json=body)
+
+    asyncio.run(run())
+    # The 500 is retried, the timeout is not
+    assert len(calls) == 2
+    assert in_flight(transport) == 0
@@ -1,10 +1,29 @@
 import streamlit as st
-import os
+import uuid
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from openai import OpenAI
-from langchain_core.messages import HumanMessage, AIMessage
-from app.graph import app_graph
-from app.rag_utils import process_pdf
+from app.config import (
+    SERVICE_URL,
+    TTS_MODEL,
+    TTS_VOICE,
+    TTS_WORKERS,
+    TTS_CACHE_DIR,
+    TTS_CACHE_MAX_BYTES,
+    STT_MODEL,
+    STT_WORKERS,
+    STT_SAMPLE_RATE,
+    STT_UPLOAD_FORMAT,
+    STT_SEGMENT_S,
+    STT_MIN_SILENCE_MS,
+    STT_SILENCE_DB,
+    STT_CACHE_SIZE,
+)
+from app.stt import OpenAISTTBackend, SpeechToText, TranscriptCache
+from app.tts import KEEPALIVE_EXPIRY_S, AudioCache, OpenAITTSBackend, TTSEngine
+from app import telemetry
+from app.client import ServiceClient
+from app.providers import get_openai_client, get_transport
 
 load_dotenv()
 
@@ -12,14 +31,56 @@ load_dotenv()
 st.set_page_config(page_title="AI Interviewer", layout="wide")
 st.title("AI Interviewer (Streamlit + OpenAI)")
 
-# OpenAI client for audio (TTS/STT)
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# OpenAI client for audio (TTS/STT), admitted through the shared client pool
+client = get_openai_client()
+
+THANK_YOU_MSG = "Thank you for your time! This concludes our interview. I'll now generate your detailed evaluation report..."
+
+@st.cache_resource
+def get_tts_engine():
+    """Shared sentence-pipelined TTS engine with its on-disk audio cache."""
+    return TTSEngine(
+        # Warming is only needed without the pooled transport, which keeps its connections open
+        OpenAITTSBackend(client, warm_idle_s=None if get_transport() else KEEPALIVE_EXPIRY_S),
+        AudioCache(TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES),
+        voice=TTS_VOICE,
+        model=TTS_MODEL,
+        max_workers=TTS_WORKERS,
+    )
+
+@st.cache_resource
+def get_stt_engine():
+    """Shared speech-to-text pipeline: normalize, split at pauses, transcribe segments in parallel."""
+    return SpeechToText(
+        OpenAISTTBackend(client, STT_MODEL),
+        TranscriptCache(STT_CACHE_SIZE),
+        sample_rate=STT_SAMPLE_RATE,
+        upload_format=STT_UPLOAD_FORMAT,
+        segment_s=STT_SEGMENT_S,
+        min_silence_s=STT_MIN_SILENCE_MS / 1000,
+        silence_db=STT_SILENCE_DB,
+        max_workers=STT_WORKERS,
+    )
+
+@st.cache_resource
+def get_service():
+    """
+    Client for the interview service. Without SERVICE_URL an embedded service is
+    started once per Streamlit process and shared by all browser sessions.
+    """
+    if SERVICE_URL:
+        return ServiceClient(SERVICE_URL)
+    from app.service import start_in_thread
+    return ServiceClient(start_in_thread())
+
+service = get_service()
 
 # --- Session state initialization ---
 if "messages" not in st.session_state:
     st.session_state.messages = []
 if "thread_id" not in st.session_state:
-    st.session_state.thread_id = "session_1"
+    # Resume the interview named in the URL (e.g. after a worker restart), else start a new thread
+    st.session_state.thread_id = st.query_params.get("session") or uuid.uuid4().hex
 if "started" not in st.session_state:
     st.session_state.started = False
 if "req_code_input" not in st.session_state:
@@ -36,20 +97,50 @@ if "interview_status" not in st.session_state:
     st.session_state.interview_status = "active"
 if "detailed_evaluation" not in st.session_state:
     st.session_state.detailed_evaluation = None
+if "answer_scores" not in st.session_state:
+    st.session_state.answer_scores = None
 if "last_audio_processed" not in st.session_state:
     st.session_state.last_audio_processed = None
 if "audio_counter" not in st.session_state:
     st.session_state.audio_counter = 0
-if "vectorstore" not in st.session_state:
-    st.session_state.vectorstore = None
-if "resume_vectorstore" not in st.session_state:
-    st.session_state.resume_vectorstore = None
+if "jd_index_id" not in st.session_state:
+    st.session_state.jd_index_id = None
+if "resume_index_id" not in st.session_state:
+    st.session_state.resume_index_id = None
 if "code_editor_key" not in st.session_state:
     st.session_state.code_editor_key = 0
-if "last_pdf_name" not in st.session_state:
-    st.session_state.last_pdf_name = None
-if "last_resume_name" not in st.session_state:
-    st.session_state.last_resume_name = None
+if "last_pdf_digest" not in st.session_state:
+    st.session_state.last_pdf_digest = None
+if "last_resume_digest" not in st.session_state:
+    st.session_state.last_resume_digest = None
+if "last_jd_precompute" not in st.session_state:
+    st.session_state.last_jd_precompute = None
+
+def restore_from_checkpoint():
+    """Rebuild the chat from the graph checkpoint of this session's thread, if it has one."""
+    values = service.get_state(st.session_state.thread_id)
+    if not values.get("messages"):
+        return
+    st.session_state.messages = [m for m in values["messages"] if m["role"] in ("user", "assistant")]
+    st.session_state.started = True
+    st.session_state.interview_role = values.get("interview_role")
+    st.session_state.num_questions_asked = values.get("num_questions_asked", 0)
+    st.session_state.interview_status = values.get("interview_status", "active")
+    st.session_state.req_code_input = values.get("req_code_input", False)
+    st.session_state.detailed_evaluation = values.get("detailed_evaluation")
+    st.session_state.answer_scores = values.get("answer_scores")
+    st.session_state.jd_index_id = values.get("jd_index_id")
+    st.session_state.resume_index_id = values.get("resume_index_id")
+
+def new_thread():
+    """Drop the current interview thread's checkpoints and start a fresh thread."""
+    service.delete_session(st.session_state.thread_id)
+    st.session_state.thread_id = uuid.uuid4().hex
+    st.query_params["session"] = st.session_state.thread_id
+
+if not st.session_state.started and not st.session_state.messages:
+    restore_from_checkpoint()
+st.query_params["session"] = st.session_state.thread_id
 
 # --- Sidebar configuration ---
 with st.sidebar:
@@ -57,39 +148,124 @@ with st.sidebar:
     st.session_state.job_description = st.text_area("Job Description", st.session_state.job_description, height=100)
     st.session_state.candidate_details = st.text_area("Candidate Details", st.session_state.candidate_details, height=80)
     
-    # JD PDF uploader
+    # JD and resume PDF uploaders; new uploads are indexed concurrently. Reuse is keyed
+    # on the file content, and a changed file is diffed against the index of its previous version
     uploaded_pdf = st.file_uploader("Upload JD PDF", type=["pdf"], key="pdf_uploader")
-    if uploaded_pdf:
-        if st.session_state.last_pdf_name != uploaded_pdf.name:
-            with st.spinner("Processing JD PDF..."):
-                try:
-                    vectorstore = process_pdf(uploaded_pdf)
-                    st.session_state.vectorstore = vectorstore
-                    st.session_state.last_pdf_name = uploaded_pdf.name
-                    st.success(f"✅ Processed JD: {uploaded_pdf.name}")
-                except Exception as e:
-                    st.error(f"Error processing JD PDF: {e}")
-                    st.session_state.vectorstore = None
-        else:
-            st.info(f"✅ Using cached JD: {uploaded_pdf.name}")
-    
-    # Resume PDF uploader
     uploaded_resume = st.file_uploader("Upload Resume PDF", type=["pdf"], key="resume_uploader")
-    if uploaded_resume:
-        if st.session_state.last_resume_name != uploaded_resume.name:
-            with st.spinner("Processing Resume PDF..."):
-                try:
-                    resume_vectorstore = process_pdf(uploaded_resume)
-                    st.session_state.resume_vectorstore = resume_vectorstore
-                    st.session_state.last_resume_name = uploaded_resume.name
-                    st.success(f"✅ Processed Resume: {uploaded_resume.name}")
-                except Exception as e:
-                    st.error(f"Error processing Resume PDF: {e}")
-                    st.session_state.resume_vectorstore = None
-        else:
-            st.info(f"✅ Using cached Resume: {uploaded_resume.name}")
+    uploads = {
+        "JD": (uploaded_pdf, "last_pdf_digest", "jd_index_id"),
+        "Resume": (uploaded_resume, "last_resume_digest", "resume_index_id"),
+    }
+    digests = {
+        label: hashlib.sha256(upload.getvalue()).hexdigest()
+        for label, (upload, _, _) in uploads.items() if upload
+    }
+    pending = {
+        label: upload for label, (upload, digest_key, _) in uploads.items()
+        if upload and st.session_state[digest_key] != digests[label]
+    }
+    if pending:
+        with st.spinner(f"Processing {' and '.join(pending)} PDF..."):
+            with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+                futures = {
+                    label: pool.submit(service.upload_pdf, upload.getvalue(), st.session_state[uploads[label][2]])
+                    for label, upload in pending.items()
+                }
+    for label, (upload, digest_key, index_key) in uploads.items():
+        if not upload:
+            continue
+        if label not in pending:
+            st.info(f"✅ Using cached {label}: {upload.name}")
+            continue
+        try:
+            result = futures[label].result()
+            st.session_state[index_key] = result["index_id"]
+            st.session_state[digest_key] = digests[label]
+            st.success(f"✅ Processed {label}: {upload.name}")
+            ingest_stats = result["ingest_stats"]
+            if ingest_stats and (ingest_stats["hits"] or ingest_stats["misses"]):
+                st.caption(
+                    f"Embeddings: {ingest_stats['hits']} cached, {ingest_stats['misses']} new, "
+                    f"~{ingest_stats['saved_tokens']} tokens saved"
+                )
+            if ingest_stats and ingest_stats.get("reused_chunks") is not None:
+                st.caption(
+                    f"Updated from previous version: {ingest_stats['reused_chunks']} of {ingest_stats['chunks']} "
+                    f"chunks reused, {ingest_stats['new_chunks']} new, {ingest_stats['removed_chunks']} removed "
+                    f"({ingest_stats['total_s']:.2f}s)"
+                )
+            elif ingest_stats and ingest_stats.get("total_s") is not None:
+                st.caption(
+                    f"{ingest_stats['pages']} pages, {ingest_stats['chunks']} chunks: first chunk searchable "
+                    f"after {ingest_stats['first_chunk_s']:.2f}s, indexed in {ingest_stats['total_s']:.2f}s"
+                )
+        except Exception as e:
+            st.error(f"Error processing {label} PDF: {e}")
+            st.session_state[index_key] = None
+
+    # Route and digest the JD in the background as soon as it is known, so the first question doesn't wait on it
+    jd_inputs = (st.session_state.job_description, st.session_state.jd_index_id)
+    if jd_inputs != st.session_state.last_jd_precompute:
+        try:
+            service.precompute_jd(*jd_inputs)
+            st.session_state.last_jd_precompute = jd_inputs
+        except Exception as e:
+            print(f"JD precompute request failed: {e}")
+    
+    if uploaded_pdf or uploaded_resume:
+        service_stats = service.stats()
+        index_stats = service_stats["index_store"]
+        st.caption(
+            f"Index cache: {index_stats['hits']} hits / {index_stats['misses']} misses, "
+            f"{index_stats['entries']} indexes ({index_stats['bytes'] / 1e6:.1f} MB)"
+        )
+        registry_stats = service_stats["registry"]
+        st.caption(
+            f"Shared indexes in memory: {registry_stats['entries']} "
+            f"({registry_stats['bytes_in_use'] / 1e6:.1f} / {registry_stats['max_bytes'] / 1e6:.0f} MB)"
+        )
+    
+    if st.session_state.get("last_turn_timings"):
+        timings = st.session_state.last_turn_timings
+        st.caption(
+            f"Last turn ({timings['mode']} retrieval): {timings['total_s']:.2f}s total, "
+            f"{timings['llm_calls']} LLM call(s) {timings['llm_s']:.2f}s, "
+            f"{timings['tool_calls']} retrieval(s) {timings['retrieval_s']:.2f}s, "
+            f"prompt {timings['prompt_tokens']} tokens ({timings['prompt_tokens_uncompacted']} uncompacted)"
+        )
+    
+    if st.session_state.get("last_stt_stats"):
+        stt_stats = st.session_state.last_stt_stats
+        st.caption(
+            f"Last voice answer: {stt_stats['input_bytes'] / 1e3:.0f} KB recorded, "
+            f"{stt_stats['uploaded_bytes'] / 1e3:.0f} KB uploaded in {stt_stats['segments']} segment(s) "
+            f"({stt_stats['cached_segments']} cached), transcribed in {stt_stats['latency_s']:.2f}s"
+        )
+    
+    if telemetry.is_enabled():
+        with st.expander("⏱️ Performance"):
+            # Engine spans come from the service; audio spans are recorded in this process
+            service_telemetry = service.telemetry(st.session_state.thread_id)
+            perf_rows = service_telemetry["summary"] + telemetry.recorder.summary(st.session_state.thread_id)
+            if perf_rows:
+                st.dataframe(perf_rows, hide_index=True)
+            else:
+                st.caption("No spans recorded for this session yet.")
+            cache_stats = service_telemetry.get("retrieval_cache")
+            if cache_stats:
+                st.caption(
+                    f"Retrieval cache: {cache_stats['exact_hits']} exact + {cache_stats['semantic_hits']} "
+                    f"near-duplicate hits, {cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate)"
+                )
+            st.download_button(
+                "Spans (JSONL)",
+                service_telemetry["jsonl"] + telemetry.recorder.export_jsonl(st.session_state.thread_id),
+                file_name=f"spans-{st.session_state.thread_id}.jsonl",
+            )
+            st.download_button("Metrics (Prometheus)", service.metrics(), file_name="metrics.prom")
     
     if st.button("Start / Reset Interview"):
+        new_thread()
         st.session_state.messages = []
         st.session_state.started = False
         st.session_state.req_code_input = False
@@ -97,100 +273,161 @@ with st.sidebar:
         st.session_state.num_questions_asked = 0
         st.session_state.interview_status = "active"
         st.session_state.detailed_evaluation = None
+        st.session_state.answer_scores = None
         st.session_state.last_audio_processed = None
         st.session_state.audio_counter = 0
-        st.session_state.vectorstore = None
-        st.session_state.resume_vectorstore = None
-        st.session_state.last_pdf_name = None
-        st.session_state.last_resume_name = None
+        st.session_state.jd_index_id = None
+        st.session_state.resume_index_id = None
+        st.session_state.last_pdf_digest = None
+        st.session_state.last_resume_digest = None
         st.rerun()
 
 # --- Helper functions ---
+def speak(text, stream=None):
+    """
+    Queue TTS audio for `text`. If its sentences were already fed to a pipeline
+    while the text was streaming, only the remainder is synthesized here.
+    """
+    try:
+        pipeline = stream["tts"] if stream else None
+        if pipeline is not None and text.startswith(stream["tts_fed"]):
+            pipeline.feed(text[len(stream["tts_fed"]):])
+        else:
+            if pipeline is not None:
+                pipeline.cancel()
+            pipeline = get_tts_engine().pipeline()
+            pipeline.feed(text)
+        pipeline.close()
+        st.session_state["last_audio"] = pipeline.audio()
+    except Exception as e:
+        st.error(f"TTS Error: {e}")
+    finally:
+        if stream:
+            stream["tts"] = None
+            stream["tts_fed"] = ""
+
+def process_update(node, value, stream=None):
+    """Apply one graph node update (relayed by the service) to session state."""
+    if node == "main_agent":
+        if "interview_role" in value:
+            st.session_state.interview_role = value["interview_role"]
+        if "interview_status" in value:
+            st.session_state.interview_status = value["interview_status"]
+    elif node == "interviewer_agent":
+        if value.get("turn_timings"):
+            st.session_state.last_turn_timings = value["turn_timings"]
+        if "messages" in value:
+            msg_content = value["messages"][-1]["content"]
+            st.session_state.messages.append({"role": "assistant", "content": msg_content})
+            st.session_state.req_code_input = value.get("req_code_input", False)
+            if "num_questions_asked" in value:
+                st.session_state.num_questions_asked = value["num_questions_asked"]
+            if "interview_status" in value:
+                st.session_state.interview_status = value["interview_status"]
+            # TTS
+            speak(msg_content, stream)
+    elif node == "evaluation_agent":
+        st.session_state.messages.append({"role": "assistant", "content": THANK_YOU_MSG})
+        # TTS for thank you message (served from the audio cache after the first interview)
+        speak(THANK_YOU_MSG)
+        if "answer_scores" in value:
+            st.session_state.answer_scores = value["answer_scores"]
+        if "detailed_evaluation" in value:
+            st.session_state.detailed_evaluation = value["detailed_evaluation"]
+            st.session_state.messages.append({"role": "assistant", "content": f"DECISION: {value['detailed_evaluation']['decision']}"})
+        if "interview_status" in value:
+            st.session_state.interview_status = value["interview_status"]
+
+def render_token(stream, event):
+    """Render one streamed interviewer text delta into an incrementally updated chat message."""
+    # A new LLM call (e.g. the answer after a tool round trip) replaces the previous text
+    if event["message_id"] != stream["message_id"]:
+        stream["message_id"] = event["message_id"]
+        stream["text"] = ""
+        if stream["tts"] is not None:
+            stream["tts"].cancel()
+        stream["tts"] = get_tts_engine().pipeline()
+        stream["tts_fed"] = ""
+    if stream["placeholder"] is None:
+        stream["placeholder"] = st.chat_message("assistant").empty()
+    stream["text"] += event["text"]
+    stream["placeholder"].markdown(stream["text"] + "▌")
+    # Start synthesizing complete sentences while the rest is still generating
+    stream["tts"].feed(event["text"])
+    stream["tts_fed"] = stream["text"]
+
+def discard_stream(stream):
+    """The streamed message turned out to end the interview: remove it and stop its audio."""
+    if stream["placeholder"] is not None:
+        stream["placeholder"].empty()
+    if stream["tts"] is not None:
+        stream["tts"].cancel()
+        stream["tts"] = None
+        stream["tts_fed"] = ""
+
+def render_partial_evaluation(stream, values):
+    """Show the evaluation fields validated so far while the rest is still generating."""
+    if stream["evaluation"] is None:
+        stream["evaluation"] = st.chat_message("assistant").empty()
+    with stream["evaluation"].container():
+        st.caption("Evaluating the interview...")
+        ratings = [
+            (label, values[field]) for label, field in [
+                ("Overall", "overall_rating"),
+                ("Technical", "technical_rating"),
+                ("Communication", "communication_rating"),
+                ("Problem Solving", "problem_solving_rating"),
+            ] if field in values
+        ]
+        if ratings:
+            for col, (label, rating) in zip(st.columns(len(ratings)), ratings):
+                col.metric(label, f"{rating}/10")
+        if values.get("strengths"):
+            st.markdown("**💪 Strengths**\n" + "\n".join(f"- {s}" for s in values["strengths"]))
+        if values.get("areas_for_improvement"):
+            st.markdown("**📈 Areas for Improvement**\n" + "\n".join(f"- {a}" for a in values["areas_for_improvement"]))
+
 def process_response(events):
-    """Process LangGraph events and update session state/UI."""
+    """Process turn events from the service and update session state/UI."""
+    stream = {"placeholder": None, "message_id": None, "text": "", "tts": None, "tts_fed": "", "evaluation": None}
     try:
         for event in events:
-            for key, value in event.items():
-                if value is None:
-                    continue
-                if key == "main_agent":
-                    if "interview_role" in value:
-                        st.session_state.interview_role = value["interview_role"]
-                    if "interview_status" in value:
-                        st.session_state.interview_status = value["interview_status"]
-                elif key == "interviewer_agent":
-                    if "messages" in value:
-                        msg_content = value["messages"][-1].content
-                        st.session_state.messages.append({"role": "assistant", "content": msg_content})
-                        st.session_state.req_code_input = value.get("req_code_input", False)
-                        if "num_questions_asked" in value:
-                            st.session_state.num_questions_asked = value["num_questions_asked"]
-                        if "interview_status" in value:
-                            st.session_state.interview_status = value["interview_status"]
-                        # TTS
-                        try:
-                            resp = client.audio.speech.create(model="tts-1", voice="alloy", input=msg_content)
-                            st.session_state["last_audio"] = resp.content
-                        except Exception as e:
-                            st.error(f"TTS Error: {e}")
-                elif key == "evaluation_agent":
-                    thank_you_msg = "Thank you for your time! This concludes our interview. I'll now generate your detailed evaluation report..."
-                    st.session_state.messages.append({"role": "assistant", "content": thank_you_msg})
-                    # TTS for thank you message
-                    try:
-                        resp = client.audio.speech.create(model="tts-1", voice="alloy", input=thank_you_msg)
-                        st.session_state["last_audio"] = resp.content
-                    except Exception as e:
-                        st.error(f"TTS Error: {e}")
-                    if "detailed_evaluation" in value:
-                        st.session_state.detailed_evaluation = value["detailed_evaluation"]
-                        st.session_state.messages.append({"role": "assistant", "content": f"DECISION: {value['detailed_evaluation']['decision']}"})
-                    if "interview_status" in value:
-                        st.session_state.interview_status = value["interview_status"]
+            if event["type"] == "token":
+                render_token(stream, event)
+            elif event["type"] == "discard":
+                discard_stream(stream)
+            elif event["type"] == "partial":
+                render_partial_evaluation(stream, event["values"])
+            elif event["type"] == "update":
+                process_update(event["node"], event["values"], stream)
+            elif event["type"] == "error":
+                st.error(f"Processing error: {event['message']}")
     except Exception as e:
         st.error(f"Processing error: {e}")
         import traceback
         st.text(traceback.format_exc())
 
 def run_turn(user_text, code_snippet=None):
-    """Run one turn of the interview, sending the payload to the LangGraph."""
+    """Run one turn of the interview on the service, streaming its events into the UI."""
     full_input = user_text
     if code_snippet:
         full_input += f"\n\n### CANDIDATE CODE SUBMISSION:\n```\n{code_snippet}\n```"
     st.session_state.messages.append({"role": "user", "content": full_input})
-    config = {"configurable": {"thread_id": st.session_state.thread_id}}
+    # The connection for the next question's audio comes up while the question is generated
+    get_tts_engine().warm()
+    context = None
     if not st.session_state.started:
-        initial_state = {
-            "messages": [HumanMessage(content="Start the interview.")],
+        # The rest of the state is restored by the service from the thread's checkpoint
+        context = {
             "job_description": st.session_state.job_description,
             "candidate_details": st.session_state.candidate_details,
-            "interview_role": st.session_state.interview_role,
-            "num_questions_asked": st.session_state.num_questions_asked,
-            "interview_status": st.session_state.interview_status,
-            "retriever": st.session_state.vectorstore,
-            "resume_retriever": st.session_state.resume_vectorstore,
+            "jd_index_id": st.session_state.jd_index_id,
+            "resume_index_id": st.session_state.resume_index_id,
         }
         st.session_state.started = True
-        events = app_graph.stream(initial_state, config=config)
-    else:
-        # Build full history for stateless graph
-        history = []
-        for msg in st.session_state.messages:
-            if msg["role"] == "user":
-                history.append(HumanMessage(content=msg["content"]))
-            else:
-                history.append(AIMessage(content=msg["content"]))
-        events = app_graph.stream({
-            "messages": history,
-            "job_description": st.session_state.job_description,
-            "candidate_details": st.session_state.candidate_details,
-            "interview_role": st.session_state.interview_role,
-            "num_questions_asked": st.session_state.num_questions_asked,
-            "interview_status": st.session_state.interview_status,
-            "retriever": st.session_state.vectorstore,
-            "resume_retriever": st.session_state.resume_vectorstore,
-        }, config=config)
-    process_response(events)
+    events = service.run_turn(st.session_state.thread_id, user_text, code_snippet, context)
+    with telemetry.session(st.session_state.thread_id):
+        process_response(events)
     st.rerun()
 
 # --- UI Layout ---
@@ -227,8 +464,19 @@ if st.session_state.detailed_evaluation:
     st.divider()
     st.subheader("💡 Recommendations")
     st.write(eval_data.get('recommendations', "No recommendations provided."))
+    if st.session_state.get("answer_scores"):
+        with st.expander("🧾 Per-question scores"):
+            for score in sorted(st.session_state.answer_scores.values(), key=lambda s: s["question_number"]):
+                st.markdown(f"**Q{score['question_number']}.** {score['question']}")
+                st.caption(
+                    f"Technical {score['technical_rating']}/10 · Communication {score['communication_rating']}/10 · "
+                    f"Problem solving {score['problem_solving_rating']}/10 — {score['assessment']}"
+                )
+                for quote in score["evidence"]:
+                    st.markdown(f"> {quote}")
     st.divider()
     if st.button("🔄 Start New Interview", type="primary"):
+        new_thread()
         st.session_state.messages = []
         st.session_state.started = False
         st.session_state.req_code_input = False
@@ -236,12 +484,13 @@ if st.session_state.detailed_evaluation:
         st.session_state.num_questions_asked = 0
         st.session_state.interview_status = "active"
         st.session_state.detailed_evaluation = None
+        st.session_state.answer_scores = None
         st.session_state.last_audio_processed = None
         st.session_state.audio_counter = 0
-        st.session_state.vectorstore = None
-        st.session_state.resume_vectorstore = None
-        st.session_state.last_pdf_name = None
-        st.session_state.last_resume_name = None
+        st.session_state.jd_index_id = None
+        st.session_state.resume_index_id = None
+        st.session_state.last_pdf_digest = None
+        st.session_state.last_resume_digest = None
         st.rerun()
 else:
     # Chat history
@@ -286,11 +535,15 @@ else:
         # Voice input
         audio_value = st.audio_input("Voice Mode 🎤", key=f"audio_{st.session_state.audio_counter}")
         if audio_value and audio_value != st.session_state.last_audio_processed:
-            transcription = client.audio.transcriptions.create(model="whisper-1", file=audio_value)
+            with telemetry.session(st.session_state.thread_id):
+                transcript, st.session_state.last_stt_stats = get_stt_engine().transcribe(audio_value.getvalue())
             st.session_state.last_audio_processed = audio_value
             st.session_state.audio_counter += 1
-            code_to_submit = code_input if (code_input and code_input.strip()) else None
-            run_turn(transcription.text, code_snippet=code_to_submit)
+            if transcript:
+                code_to_submit = code_input if (code_input and code_input.strip()) else None
+                run_turn(transcript, code_snippet=code_to_submit)
+            else:
+                st.warning("No speech detected in the recording. Please try again.")
         # Text input
         user_input = st.chat_input("Type your answer...")
         if user_input: